@@ -0,0 +1,315 @@
+"""
+Dispatcher uchun to'liq (end-to-end) sintetik yuklama benchmarki.
+
+main.py dagidek Dispatcher yig'iladi: task, notification va admin routerlari,
+ThrottlingMiddleware va SubscriptionMiddleware, majburiy kanal va ikki admin.
+Bot API so'rovlari FakeSession ga boradi (har biri --latency sekund), baza
+vaqtinchalik faylda. Yangilanishlar polling kabi parallel beriladi (bir
+vaqtda ko'pi bilan --concurrency ta), bitta foydalanuvchining ketma-ket
+qadamlari (masalan, task yaratish) esa tartib bilan.
+
+Ssenariylar:
+    start      - yangi foydalanuvchilarning /start to'lqini
+    create     - task yaratish: menyu tugmasi, nom, sana, vaqt
+    list       - bajarilmagan va bajarilgan tasklar ro'yxati
+    complete   - eslatmadagi "✅ Bajardim" tugmalari
+    postpone   - eslatmadagi "+5 min" tugmalari
+
+Har bir ssenariy uchun: yangilanish/sekund, p50/p99 kechikish, bitta
+yangilanishga to'g'ri keladigan SQL so'rovlar (SQL profiler orqali) va Bot
+API chaqiruvlari. Vaqt o'lchovlari shovqinli bo'lgani uchun ssenariylar
+--rounds marta (har safar yangi foydalanuvchilar bilan) bajarilib, eng yaxshi
+natija olinadi. Natijalar saqlangan baseline bilan solishtiriladi: SQL va API
+soni deterministik, shuning uchun ular uchun chegara ancha qattiq.
+
+Ishga tushirish:
+    python -m benchmarks.bench_dispatcher --users 200
+    python -m benchmarks.bench_dispatcher --users 200 --save-baseline
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+from benchmarks.fake_session import BOT_USER, FAKE_TOKEN, FakeSession
+from database import db, setup_db
+from database.profiler import profiler
+from handlers import admin, notification, task
+from handlers.middleware import SubscriptionMiddleware, ThrottlingMiddleware
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline_dispatcher.json")
+
+# Baseline dan shuncha foiz yomonlashsa belgilanadi: vaqt o'lchovlari va
+# deterministik sanoqlar (SQL/API) uchun alohida
+TIMING_THRESHOLD = 0.25
+COUNT_THRESHOLD = 0.05
+
+# Ko'rsatkich -> (yomonlashish yo'nalishi: +1 oshishi, -1 kamayishi yomon; chegara)
+METRICS = {
+    "updates_per_sec": (-1, TIMING_THRESHOLD),
+    "p50_ms": (1, TIMING_THRESHOLD),
+    "p99_ms": (1, TIMING_THRESHOLD),
+    "sql_per_update": (1, COUNT_THRESHOLD),
+    "api_per_update": (1, COUNT_THRESHOLD),
+}
+
+# Foydalanuvchi ID lari shu qiymatdan boshlanadi (adminlar 1 va 2)
+FIRST_USER_ID = 1000
+
+_update_ids = iter(range(1, 10 ** 9))
+
+
+def make_user(user_id: int) -> User:
+    return User(id=user_id, is_bot=False, first_name="User", username=f"user{user_id}")
+
+
+def make_message(user_id: int, text: str) -> Update:
+    """Foydalanuvchidan kelgan matnli xabar"""
+    update_id = next(_update_ids)
+    return Update(update_id=update_id, message=Message(
+        message_id=update_id, date=datetime.now(), chat=Chat(id=user_id, type="private"),
+        from_user=make_user(user_id), text=text
+    ))
+
+
+def make_callback(user_id: int, data: str, text: str = "⏰ Task vaqti keldi") -> Update:
+    """Bot xabaridagi inline tugma bosilishi"""
+    update_id = next(_update_ids)
+    message = Message(
+        message_id=update_id, date=datetime.now(), chat=Chat(id=user_id, type="private"),
+        from_user=BOT_USER, text=text
+    )
+    return Update(update_id=update_id, callback_query=CallbackQuery(
+        id=str(update_id), from_user=make_user(user_id), chat_instance="bench", data=data, message=message
+    ))
+
+
+def build_dispatcher(bot: Bot) -> Dispatcher:
+    """main.py dagidek Dispatcher: middleware va routerlar, ikki admin"""
+    for router in (task.router, notification.router, admin.router):
+        router.bot = bot
+    admin.ADMIN_IDS = [1, 2]
+    admin.setup_digests(bot, 60, 20)
+
+    dp = Dispatcher(storage=MemoryStorage())
+    dp.message.outer_middleware(ThrottlingMiddleware(1, 5))
+    dp.callback_query.outer_middleware(ThrottlingMiddleware(2, 8))
+    dp.message.middleware(SubscriptionMiddleware())
+    dp.callback_query.middleware(SubscriptionMiddleware())
+    dp.include_router(task.router)
+    dp.include_router(notification.router)
+    dp.include_router(admin.router)
+    return dp
+
+
+class Runner:
+    """Yangilanish oqimlarini Dispatcher ga berib, o'lchovlarni yig'adi"""
+
+    def __init__(self, dp: Dispatcher, bot: Bot, session: FakeSession, concurrency: int):
+        self.dp = dp
+        self.bot = bot
+        self.session = session
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def feed(self, update: Update, latencies: List[float]) -> None:
+        async with self.semaphore:
+            started = time.perf_counter()
+            await self.dp.feed_update(self.bot, update)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    async def run(self, streams: List[List[Update]]) -> Dict[str, float]:
+        """
+        Oqimlarni parallel o'tkazish (har bir oqim ichida tartib bilan)
+
+        Args:
+            streams: Har bir foydalanuvchining yangilanishlari ketma-ketligi
+
+        Returns:
+            Dict: O'lchov natijalari
+        """
+        latencies: List[float] = []
+        statements = sum(s.calls for s in profiler.top())
+        calls = sum(self.session.calls.values())
+
+        async def run_stream(stream: List[Update]) -> None:
+            for update in stream:
+                await self.feed(update, latencies)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(run_stream(stream) for stream in streams))
+        elapsed = time.perf_counter() - started
+
+        # Fon rejimidagi ishlar (adminlarga xabar va h.k.) ham hisobga kirsin
+        if task._background_tasks:
+            await asyncio.gather(*list(task._background_tasks), return_exceptions=True)
+
+        count = len(latencies)
+        quantiles = statistics.quantiles(latencies, n=100)
+        return {
+            "updates": count,
+            "updates_per_sec": round(count / elapsed, 1),
+            "p50_ms": round(quantiles[49], 2),
+            "p99_ms": round(quantiles[98], 2),
+            "sql_per_update": round((sum(s.calls for s in profiler.top()) - statements) / count, 2),
+            "api_per_update": round((sum(self.session.calls.values()) - calls) / count, 2),
+        }
+
+
+async def get_user_task_ids(user_ids: List[int], status: str) -> Dict[int, List[int]]:
+    """Foydalanuvchilarning berilgan statusdagi task ID lari"""
+    result: Dict[int, List[int]] = {user_id: [] for user_id in user_ids}
+    async with db.get_read_pool().acquire() as conn:
+        cursor = await conn.execute(
+            f"SELECT user_id, id FROM tasks WHERE status = ? AND user_id BETWEEN ? AND ? ORDER BY id",
+            (status, min(user_ids), max(user_ids))
+        )
+        for user_id, task_id in await cursor.fetchall():
+            result[user_id].append(task_id)
+    return result
+
+
+async def run_scenarios(runner: Runner, first_user_id: int, users: int) -> Dict[str, Dict[str, float]]:
+    """Barcha ssenariylarni yangi foydalanuvchilar bilan tartib bilan bajarish"""
+    user_ids = list(range(first_user_id, first_user_id + users))
+    tomorrow = (datetime.now() + timedelta(days=1)).strftime("%d.%m.%y")
+    results = {}
+
+    results["start"] = await runner.run([[make_message(u, "/start")] for u in user_ids])
+
+    results["create"] = await runner.run([
+        [
+            make_message(u, "➕ Yangi Task yaratish"),
+            make_message(u, f"Non olish {u}"),
+            make_message(u, tomorrow),
+            make_message(u, "18:30"),
+        ]
+        for u in user_ids
+    ])
+
+    # Tugmalar uchun har bir foydalanuvchiga qo'shimcha tasklar
+    date = (datetime.now() + timedelta(days=2)).strftime("%Y-%m-%d")
+    for u in user_ids:
+        await db.add_tasks(u, [(f"Task {i}", date, f"{9 + i:02d}:00") for i in range(4)])
+
+    results["list"] = await runner.run([
+        [make_message(u, "⏳ Bajarilmagan Tasklar"), make_message(u, "✅ Bajarilgan Tasklar")]
+        for u in user_ids
+    ])
+
+    task_ids = await get_user_task_ids(user_ids, "active")
+    results["complete"] = await runner.run([
+        [make_callback(u, f"complete_{task_id}") for task_id in task_ids[u][:2]] for u in user_ids
+    ])
+    results["postpone"] = await runner.run([
+        [make_callback(u, f"postpone_{task_id}") for task_id in task_ids[u][2:4]] for u in user_ids
+    ])
+    return results
+
+
+def best_of(rounds: List[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """Har bir ssenariy va ko'rsatkich bo'yicha eng yaxshi natija"""
+    best = {}
+    for scenario in rounds[0]:
+        values = [r[scenario] for r in rounds]
+        best[scenario] = {"updates": values[0]["updates"]}
+        for key, (direction, _) in METRICS.items():
+            pick = min if direction > 0 else max
+            best[scenario][key] = pick(v[key] for v in values)
+    return best
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]]) -> None:
+    """Natijalarni baseline bilan solishtirish"""
+    regressions = []
+    print("\nBaseline bilan solishtirish:")
+    for scenario, values in results.items():
+        base = baseline.get(scenario)
+        if not base:
+            print(f"  {scenario:<10} baseline yo'q")
+            continue
+        parts = []
+        for key, (direction, threshold) in METRICS.items():
+            if not base.get(key):
+                continue
+            change = (values[key] - base[key]) / base[key]
+            mark = ""
+            if change * direction > threshold:
+                mark = " ⚠️"
+                regressions.append(f"{scenario}.{key}")
+            parts.append(f"{key} {change:+.0%}{mark}")
+        print(f"  {scenario:<10} " + ", ".join(parts))
+    if regressions:
+        print(f"\n⚠️ Yomonlashgan: {', '.join(regressions)}")
+    else:
+        print("\n✅ Sezilarli yomonlashish yo'q")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Natijalarni baseline sifatida saqlash")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    # SQL so'rovlarini sanash uchun (ulanishlar ochilishidan oldin)
+    profiler.configure(True, slow_ms=float("inf"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DATABASE_NAME = os.path.join(tmp, "bench.db")
+        await setup_db()
+        await db.set_config("REQUIRED_CHANNEL_ID", "@dinotasks")
+
+        session = FakeSession(latency=args.latency)
+        bot = Bot(FAKE_TOKEN, session=session)
+        dp = build_dispatcher(bot)
+        await bot.me()
+
+        try:
+            runner = Runner(dp, bot, session, args.concurrency)
+            print(f"{args.users} foydalanuvchi, Bot API kechikishi {args.latency * 1000:.0f} ms, "
+                  f"parallel {args.concurrency}")
+            rounds = []
+            for number in range(args.rounds):
+                rounds.append(await run_scenarios(runner, FIRST_USER_ID + number * args.users, args.users))
+            results = best_of(rounds)
+            await admin.close_digests()
+        finally:
+            await db.close_db()
+
+    print(f"\nEng yaxshi natija ({args.rounds} marta):")
+    print(f"{'ssenariy':<10} {'soni':>6} {'upd/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'SQL/upd':>8} {'API/upd':>8}")
+    for scenario, r in results.items():
+        print(f"{scenario:<10} {r['updates']:>6} {r['updates_per_sec']:>8} {r['p50_ms']:>8} {r['p99_ms']:>8} "
+              f"{r['sql_per_update']:>8} {r['api_per_update']:>8}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            params = {"users": args.users, "latency": args.latency, "concurrency": args.concurrency,
+                      "rounds": args.rounds}
+            json.dump({"params": params, "results": results}, f, indent=2)
+        print(f"\nBaseline saqlandi: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        params = {k: baseline["params"].get(k) for k in ("users", "latency", "concurrency")}
+        if params != {"users": args.users, "latency": args.latency, "concurrency": args.concurrency}:
+            print(f"\nEslatma: baseline boshqa parametrlar bilan olingan: {params}")
+        compare(results, baseline["results"])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
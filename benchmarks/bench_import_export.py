@@ -0,0 +1,96 @@
+"""
+Import/eksport o'tkazuvchanligi benchmarki.
+
+Bitta foydalanuvchiga N ta task yoziladi, keyin ular CSV va iCalendar
+formatlarida oqim sifatida eksport qilinadi (TaskExportFile.read) va
+boshqa foydalanuvchiga import qilinadi (import_task_stream). Har bir bosqich
+uchun qator/sekund va tracemalloc bo'yicha eng yuqori xotira ko'rsatiladi.
+
+Ishga tushirish:
+    python -m benchmarks.bench_import_export --rows 100000
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import AsyncIterator
+
+from database import db, setup_db
+from utils import transfer
+
+
+def seed(path: str, rows: int) -> None:
+    """Birinchi foydalanuvchiga kelajakdagi tasklarni yozish"""
+    conn = sqlite3.connect(path)
+    start = datetime.now() + timedelta(days=1)
+    data = []
+    for i in range(rows):
+        dt = start + timedelta(minutes=i)
+        data.append((1, f"Task {i}, muhim", dt.strftime("%H:%M"), dt.strftime("%Y-%m-%d %H:%M")))
+    conn.executemany(
+        "INSERT INTO tasks (user_id, task_name, task_time, task_datetime, status) VALUES (?, ?, ?, ?, 'active')",
+        data
+    )
+    conn.commit()
+    conn.close()
+
+
+async def read_file(path: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """Faylni Telegram yuklab olishiga o'xshab bo'laklab o'qish"""
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+            await asyncio.sleep(0)
+
+
+async def bench_export(fmt: str, path: str, rows: int) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    with open(path, "wb") as f:
+        async for chunk in transfer.TaskExportFile(1, fmt).read(None):
+            f.write(chunk)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = os.path.getsize(path) / 1024 / 1024
+    print(f"Eksport {fmt:<4}: {rows / elapsed:10.0f} qator/s  fayl={size:6.1f} MB  xotira cho'qqisi={peak / 1024 / 1024:6.2f} MB")
+
+
+async def bench_import(fmt: str, path: str, user_id: int) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = await transfer.import_task_stream(user_id, read_file(path), fmt)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Import  {fmt:<4}: {result['imported'] / elapsed:10.0f} qator/s  "
+          f"qo'shildi={result['imported']}  xotira cho'qqisi={peak / 1024 / 1024:6.2f} MB")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=transfer.IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+    transfer.IMPORT_BATCH_SIZE = args.batch
+    transfer.MAX_IMPORT_ROWS = max(transfer.MAX_IMPORT_ROWS, args.rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DATABASE_NAME = os.path.join(tmp, "bench.db")
+        await setup_db()
+        seed(db.DATABASE_NAME, args.rows)
+
+        for user_id, fmt in ((2, "csv"), (3, "ics")):
+            path = os.path.join(tmp, f"tasks.{fmt}")
+            await bench_export(fmt, path, args.rows)
+            await bench_import(fmt, path, user_id)
+
+        await db.close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
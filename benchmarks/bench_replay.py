@@ -0,0 +1,291 @@
+"""
+24 soatlik yuklama profilini virtual vaqtda qayta o'ynash (replay).
+
+Bot main.py dagidek yig'iladi (Dispatcher, middleware, routerlar) va barcha
+fon looplari - check_due_tasks, arxivlash, kunlik xizmat va ertalabki
+jamlanma - utils.clock.VirtualClock ostida ishga tushiriladi. Foydalanuvchi
+harakatlari sutkalik faollik profili (HOURLY_PROFILE) bo'yicha taqsimlanadi:
+task yaratish (menyu tugmasi, nom, sana, vaqt) va ro'yxatlarni ko'rish.
+Eslatma olgan foydalanuvchi 5-120 sekunddan keyin --complete-rate ehtimol
+bilan "✅ Bajardim", --snooze-rate ehtimol bilan "+5 min" bosadi, qolganlari
+takroriy eslatmalarni oladi.
+
+Har bir harakat virtual soatda o'z vaqtigacha uxlaydigan korutina, shuning
+uchun yangilanishlar, rejalashtiruvchi tekshiruvlari va eslatma looplari
+aynan virtual vaqt tartibida bajariladi, lekin sutka bir necha o'n
+sekundda o'tadi. Har bir soat uchun yangilanishlar, eslatmalar va haqiqiy
+sarflangan vaqt ko'rsatiladi.
+
+Oxirida eslatmalar vaqti tekshiriladi: har bir taskning birinchi eslatmasi
+vaqti kelgandan 0..LATE_AFTER sekund ichida chiqishi va vaqti oyna ichida
+kelgan birorta task eslatmasiz qolmasligi kerak.
+
+Ishga tushirish:
+    python -m benchmarks.bench_replay --users 500
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from aiogram import Bot, Dispatcher
+from aiogram.methods import TelegramMethod
+from aiogram.types import Message, Update
+
+from benchmarks.bench_dispatcher import FIRST_USER_ID, build_dispatcher, make_callback, make_message
+from benchmarks.fake_session import FAKE_TOKEN, FakeSession
+from database import db, setup_db
+from handlers import admin, notification
+from utils import clock, scheduler
+from utils.clock import VirtualClock
+
+# Soatlar bo'yicha nisbiy faollik (00:00 dan 23:00 gacha)
+HOURLY_PROFILE = [1, 0.5, 0.3, 0.3, 0.5, 1, 3, 6, 8, 6, 5, 5, 7, 6, 5, 5, 5, 6, 7, 8, 8, 6, 4, 2]
+
+# Birinchi eslatma task vaqtidan shuncha sekund kechiksa xato hisoblanadi
+# (tekshiruv har 30 sekundda, task vaqti daqiqa aniqligida)
+LATE_AFTER = 60
+
+NOTIFICATION_PREFIX = "⏰ Eslatma: "
+NOTIFICATION_SUFFIX = " taskni bajarish vaqti keldi!"
+
+# Ertalabki jamlanma soati (main.py dagi DIGEST_HOUR standart qiymati)
+DIGEST_HOUR = 8
+
+
+def pick_time(rng: random.Random, start: datetime) -> datetime:
+    """Sutka ichida faollik profili bo'yicha tasodifiy vaqt"""
+    hour = rng.choices(range(24), weights=HOURLY_PROFILE)[0]
+    return start + timedelta(hours=hour, seconds=rng.randrange(3600))
+
+
+def pick_due(rng: random.Random, created: datetime) -> datetime:
+    """Yaratilgan vaqtga nisbatan task vaqti (yarmi yaxlit soat yoki yarim soatga)"""
+    roll = rng.random()
+    if roll < 0.6:
+        minutes = rng.randint(10, 180)
+    elif roll < 0.9:
+        minutes = rng.randint(180, 720)
+    else:
+        minutes = rng.randint(720, 3 * 1440)
+    due = (created + timedelta(minutes=minutes)).replace(second=0, microsecond=0)
+    if rng.random() < 0.5:
+        due = due.replace(minute=30 if due.minute < 30 else 0)
+        if due.minute == 0:
+            due += timedelta(hours=1)
+    return due
+
+
+class Replay:
+    """Rejalashtirilgan harakatlarni virtual vaqtda bajarib, eslatmalarni kuzatadi"""
+
+    def __init__(self, dp: Dispatcher, bot: Bot, session: FakeSession, virtual: VirtualClock,
+                 complete_rate: float, snooze_rate: float, seed: int = 7):
+        self.dp = dp
+        self.bot = bot
+        self.session = session
+        self.clock = virtual
+        self.complete_rate = complete_rate
+        self.snooze_rate = snooze_rate
+        self.rng = random.Random(seed)
+        self.tasks: Set[asyncio.Task] = set()
+        # Task nomi -> vaqti va birinchi eslatma vaqti
+        self.due: Dict[str, datetime] = {}
+        self.first_notified: Dict[str, datetime] = {}
+        self.notifications: Counter = Counter()
+        self.reminders = 0
+        self.updates = 0
+        self.handler_seconds = 0.0
+        # Javobi rejalashtirilgan task ID lari (bitta tugma bir marta bosiladi)
+        self.answering: Set[int] = set()
+        session.responders["SendMessage"] = self.on_send_message
+
+    def at(self, moment: datetime, updates: List[Update], answered: Optional[int] = None) -> None:
+        """Yangilanishlarni virtual vaqtda ketma-ket berish"""
+        delay = (moment - clock.now()).total_seconds()
+        task = asyncio.create_task(self._feed_later(delay, updates, answered))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _feed_later(self, delay: float, updates: List[Update], answered: Optional[int]) -> None:
+        await clock.sleep(delay)
+        for update in updates:
+            started = time.perf_counter()
+            await self.dp.feed_update(self.bot, update)
+            self.handler_seconds += time.perf_counter() - started
+            self.updates += 1
+        # Kechiktirilgan task keyingi eslatmasida yana javob olishi mumkin
+        self.answering.discard(answered)
+
+    def plan(self, start: datetime, user_ids: List[int], tasks_per_user: float, views_per_user: float) -> None:
+        """Sutkalik harakatlarni rejalashtirish"""
+        for number in range(int(len(user_ids) * tasks_per_user)):
+            user_id = self.rng.choice(user_ids)
+            created = pick_time(self.rng, start)
+            due = pick_due(self.rng, created)
+            name = f"Replay {number}"
+            self.due[name] = due
+            self.at(created, [
+                make_message(user_id, "➕ Yangi Task yaratish"),
+                make_message(user_id, name),
+                make_message(user_id, due.strftime("%d.%m.%y")),
+                make_message(user_id, due.strftime("%H:%M")),
+            ])
+        for _ in range(int(len(user_ids) * views_per_user)):
+            user_id = self.rng.choice(user_ids)
+            self.at(pick_time(self.rng, start), [make_message(user_id, "⏳ Bajarilmagan Tasklar")])
+
+    def on_send_message(self, method: TelegramMethod) -> Message:
+        """FakeSession javobi: eslatmalarni yozib olish va foydalanuvchi javobini rejalashtirish"""
+        text = method.text or ""
+        if text.startswith(NOTIFICATION_PREFIX):
+            name = text[len(NOTIFICATION_PREFIX):].removesuffix(NOTIFICATION_SUFFIX)
+            self.notifications[name] += 1
+            self.first_notified.setdefault(name, clock.now())
+        elif "Hali ham bajarmadingiz" in text:
+            self.reminders += 1
+
+        task_id = self._notification_task_id(method)
+        if task_id is not None and task_id not in self.answering:
+            roll = self.rng.random()
+            action = None
+            if roll < self.complete_rate:
+                action = "complete"
+            elif roll < self.complete_rate + self.snooze_rate:
+                action = "postpone"
+            if action:
+                self.answering.add(task_id)
+                moment = clock.now() + timedelta(seconds=self.rng.randint(5, 120))
+                self.at(moment, [make_callback(method.chat_id, f"{action}_{task_id}")], answered=task_id)
+        return self.session._message(method.chat_id, method.text)
+
+    def _notification_task_id(self, method: TelegramMethod) -> Optional[int]:
+        """Eslatma klaviaturasidagi task ID (eslatma bo'lmasa None)"""
+        markup = method.reply_markup
+        for row in getattr(markup, "inline_keyboard", None) or []:
+            for button in row:
+                if button.callback_data and button.callback_data.startswith("complete_"):
+                    return int(button.callback_data.split("_", 1)[1])
+        return None
+
+    def check_timing(self, start: datetime, end: datetime) -> Tuple[List[float], List[str], List[str]]:
+        """
+        Eslatmalar vaqtini tekshirish
+
+        Returns:
+            Tuple: (birinchi eslatma kechikishlari, sekund; kechikkan yoki erta tasklar;
+            eslatmasiz qolgan tasklar)
+        """
+        lags = []
+        wrong = []
+        missed = []
+        # Oxirgi daqiqalardagilar uchun tekshiruv hali bo'lmagan bo'lishi mumkin
+        checked_until = end - timedelta(seconds=LATE_AFTER)
+        for name, due in self.due.items():
+            notified = self.first_notified.get(name)
+            if notified is None:
+                if start <= due <= checked_until:
+                    missed.append(name)
+                continue
+            lag = (notified - due).total_seconds()
+            lags.append(lag)
+            if not 0 <= lag <= LATE_AFTER:
+                wrong.append(f"{name} ({lag:+.0f} s)")
+        return lags, wrong, missed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--tasks-per-user", type=float, default=3.0)
+    parser.add_argument("--views-per-user", type=float, default=2.0)
+    parser.add_argument("--digest-share", type=float, default=0.3, help="Jamlanmaga obuna foydalanuvchilar ulushi")
+    parser.add_argument("--complete-rate", type=float, default=0.6)
+    parser.add_argument("--snooze-rate", type=float, default=0.25)
+    parser.add_argument("--offset", type=int, default=17,
+                        help="Bot yarim tundan necha sekund keyin ishga tushadi (tekshiruvlar daqiqa boshida emas)")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    end = start + timedelta(hours=args.hours)
+    # Jamlanma BulkSender orqali haqiqiy vaqtdagi tezlik chegarasi bilan yuboriladi
+    virtual = VirtualClock(start + timedelta(seconds=args.offset), settle_timeout=60)
+    previous = clock.set_clock(virtual)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DATABASE_NAME = os.path.join(tmp, "bench.db")
+        await setup_db()
+        await db.set_config("REQUIRED_CHANNEL_ID", "@dinotasks")
+
+        session = FakeSession(latency=0)
+        bot = Bot(FAKE_TOKEN, session=session)
+        dp = build_dispatcher(bot)
+        await bot.me()
+
+        rng = random.Random(42)
+        user_ids = list(range(FIRST_USER_ID, FIRST_USER_ID + args.users))
+        for user_id in user_ids:
+            await db.add_user(user_id, f"User {user_id}", f"user{user_id}")
+            if rng.random() < args.digest_share:
+                await db.toggle_digest(user_id)
+
+        replay = Replay(dp, bot, session, virtual, args.complete_rate, args.snooze_rate)
+        replay.plan(start, user_ids, args.tasks_per_user, args.views_per_user)
+        loops = [
+            virtual.start(scheduler.check_due_tasks(bot, notification.send_task_notification)),
+            virtual.start(scheduler.archive_completed_loop()),
+            virtual.start(scheduler.daily_maintenance_loop()),
+            virtual.start(scheduler.daily_digest_loop(bot, notification.send_daily_digest, DIGEST_HOUR)),
+        ]
+
+        print(f"{args.users} foydalanuvchi, {len(replay.due)} ta task yaratiladi, {args.hours} soat")
+        print(f"{'soat':<6} {'yangil.':>8} {'eslatma':>8} {'takroriy':>9} {'looplar':>8} {'haqiqiy s':>10}")
+        started = time.perf_counter()
+        try:
+            for hour in range(args.hours):
+                hour_started = time.perf_counter()
+                updates, notified, reminders = replay.updates, sum(replay.notifications.values()), replay.reminders
+                await virtual.advance(3600)
+                print(f"{hour:02d}:00  {replay.updates - updates:>8} "
+                      f"{sum(replay.notifications.values()) - notified:>8} {replay.reminders - reminders:>9} "
+                      f"{len(scheduler.active_notification_loops):>8} {time.perf_counter() - hour_started:>10.2f}")
+        finally:
+            elapsed = time.perf_counter() - started
+            for task in loops + list(replay.tasks):
+                task.cancel()
+            for key in list(scheduler.active_notification_loops):
+                task_id, user_id = key.split("_")
+                scheduler.stop_reminder_loop(int(user_id), int(task_id))
+            await asyncio.gather(*loops, return_exceptions=True)
+            await admin.close_digests()
+            clock.set_clock(previous)
+            await db.close_db()
+
+    lags, wrong, missed = replay.check_timing(start, end)
+    print(f"\n{args.hours} soat {elapsed:.1f} sekundda ({args.hours * 3600 / elapsed:.0f}x tezroq)")
+    print(f"Yangilanishlar: {replay.updates}, o'rtacha handler vaqti "
+          f"{replay.handler_seconds * 1000 / max(replay.updates, 1):.2f} ms")
+    print(f"Birinchi eslatmalar: {len(lags)}, takroriy eslatmalar: {replay.reminders}, "
+          f"bitta task vaqtiga o'rtacha {sum(replay.notifications.values()) / max(len(lags), 1):.2f} ta eslatma")
+    if lags:
+        print(f"Kechikish: o'rtacha {statistics.mean(lags):.1f} s, max {max(lags):.1f} s")
+    if wrong or missed:
+        if wrong:
+            print(f"⚠️ {len(wrong)} ta eslatma 0..{LATE_AFTER} s oralig'idan tashqarida: {', '.join(wrong[:10])}")
+        if missed:
+            print(f"⚠️ {len(missed)} ta task eslatmasiz qoldi: {', '.join(missed[:10])}")
+    else:
+        print("✅ Barcha eslatmalar o'z vaqtida")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,291 @@
+"""
+Rejalashtiruvchi (scheduler) masshtab benchmarki.
+
+Vaqtinchalik bazaga millionlab task real taqsimot bilan yoziladi:
+    65% bajarilgan   - oxirgi 3 kun ichida (bir qismi arxivlash chegarasidan eski)
+    34% aktiv        - 10% i o'tib ketgan, qolgani keyingi 7 kunda; vaqtlarning
+                       yarmi soat boshida, 20% i yarim soatda (odamlar yaxlit vaqt tanlaydi),
+                       5% i takrorlanuvchi
+     1% kechiktirilgan - benchmark oynasi ichida qaytadigan
+
+Keyin virtual soat (utils.clock.VirtualClock) bilan --ticks marta (har biri
+30 sekund) run_scheduler_tick bajariladi - xuddi check_due_tasks dagidek,
+faqat kutishsiz. Eslatmalar haqiqiy send_task_notification orqali FakeSession
+ga yuboriladi va haqiqiy eslatma looplari ochiladi; tekshiruvlar orasida
+soat 30 sekund suriladi, looplar esa virtual vaqt bo'yicha takroriy
+eslatmalarni yuborib, 5 daqiqadan keyin o'zi tugaydi. Eslatma olgan
+foydalanuvchilarning --complete-rate qismi keyingi tekshiruvgacha
+"✅ Bajardim", --snooze-rate qismi "+5 min" bosadi.
+Boshida va har --archive-every tekshiruvda clean_old_completed_tasks ishlaydi.
+
+Har bir tekshiruv uchun: umumiy vaqt, SQL vaqti (SQL profiler orqali),
+jarayon xotirasi (RSS), tirik eslatma looplari va ular yuborgan takroriy
+eslatmalar soni. --csv bilan har bir tekshiruv alohida faylga yoziladi.
+
+Ishga tushirish:
+    python -m benchmarks.bench_scheduler --tasks 1000000
+    python -m benchmarks.bench_scheduler --tasks 3000000 --ticks 240 --csv ticks.csv
+"""
+import argparse
+import asyncio
+import csv
+import logging
+import os
+import random
+import resource
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from aiogram import Bot
+
+from benchmarks.fake_session import FAKE_TOKEN, FakeSession
+from database import db, setup_db
+from database.profiler import profiler
+from database.recurrence import make_rule
+from handlers import notification
+from utils import clock, scheduler
+from utils.clock import VirtualClock
+
+# Tekshiruvlar orasidagi soxta vaqt (check_due_tasks dagidek)
+TICK_SECONDS = 30
+
+# Bir tranzaksiyada yoziladigan qatorlar
+SEED_BATCH = 50000
+
+
+def rss_mb() -> float:
+    """Jarayonning joriy xotirasi (MB); /proc bo'lmasa eng yuqori qiymat"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def random_time(rng: random.Random, start: datetime, minutes: int) -> datetime:
+    """start dan keyingi minutes daqiqa ichida tasodifiy vaqt (yaxlit vaqtlar ko'proq)"""
+    moment = start + timedelta(minutes=rng.randrange(minutes))
+    choice = rng.random()
+    if choice < 0.5:
+        return moment.replace(minute=0)
+    if choice < 0.7:
+        return moment.replace(minute=30)
+    return moment
+
+
+def generate_tasks(rng: random.Random, count: int, users: int, now: datetime):
+    """(user_id, nom, vaqt, sana-vaqt, status, qoida) qatorlari"""
+    week = 7 * 24 * 60
+    window = 3 * 24 * 60
+    for i in range(count):
+        user_id = rng.randint(1, users)
+        roll = rng.random()
+        recurrence = None
+        if roll < 0.65:
+            status = "completed"
+            moment = random_time(rng, now - timedelta(minutes=window), window)
+        elif roll < 0.99:
+            status = "active"
+            if rng.random() < 0.1:
+                moment = random_time(rng, now - timedelta(minutes=window), window)
+            else:
+                moment = random_time(rng, now, week)
+            if rng.random() < 0.05:
+                recurrence = make_rule("daily", moment)
+        else:
+            status = "snoozed"
+            moment = now + timedelta(minutes=rng.randrange(-10, 60))
+        yield user_id, f"Task {i}", moment.strftime("%H:%M"), moment.strftime("%Y-%m-%d %H:%M"), status, recurrence
+
+
+def seed(path: str, count: int, users: int, now: datetime) -> None:
+    """Tasklarni to'g'ridan-to'g'ri sqlite3 orqali yozish (triggerlar hisoblagich va FTS ni to'ldiradi)"""
+    rng = random.Random(42)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO users (user_id, full_name, username) VALUES (?, ?, ?)",
+        ((user_id, f"User {user_id}", f"user{user_id}") for user_id in range(1, users + 1))
+    )
+    batch = []
+    for row in generate_tasks(rng, count, users, now):
+        batch.append(row)
+        if len(batch) == SEED_BATCH:
+            conn.executemany(
+                "INSERT INTO tasks (user_id, task_name, task_time, task_datetime, status, recurrence) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                batch
+            )
+            conn.commit()
+            batch = []
+    conn.executemany(
+        "INSERT INTO tasks (user_id, task_name, task_time, task_datetime, status, recurrence) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        batch
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def sql_seconds() -> float:
+    """Profiler yig'gan umumiy SQL vaqti"""
+    return sum(s.total for s in profiler.top())
+
+
+class SchedulerBench:
+    """Virtual soat bilan rejalashtiruvchi tekshiruvlarini bajarib, o'lchaydi"""
+
+    def __init__(self, bot: Bot, session: FakeSession, virtual: VirtualClock,
+                 complete_rate: float, snooze_rate: float):
+        self.bot = bot
+        self.session = session
+        self.clock = virtual
+        self.tick = 0
+        self.complete_rate = complete_rate
+        self.snooze_rate = snooze_rate
+        self.rng = random.Random(7)
+        self.notified: List[Tuple[int, int]] = []
+
+    async def notify(self, bot: Bot, user_id: int, task_id: int, task_name: str) -> None:
+        await notification.send_task_notification(bot, user_id, task_id, task_name)
+        self.notified.append((user_id, task_id))
+
+    async def respond(self) -> Tuple[int, int]:
+        """Oldingi tekshiruvda eslatma olganlarning bir qismi tugmalarni bosadi"""
+        completed = snoozed = 0
+        for user_id, task_id in self.notified:
+            roll = self.rng.random()
+            if roll < self.complete_rate:
+                await db.mark_task_completed(task_id)
+                completed += 1
+            elif roll < self.complete_rate + self.snooze_rate:
+                await db.postpone_task(task_id, 5)
+                snoozed += 1
+            else:
+                continue
+            scheduler.stop_reminder_loop(user_id, task_id)
+        self.notified = []
+        return completed, snoozed
+
+    async def run_tick(self) -> Dict[str, float]:
+        """Bitta tekshiruv va uning o'lchovlari"""
+        completed, snoozed = await self.respond()
+
+        sql_before = sql_seconds()
+        started = time.perf_counter()
+        notified = await scheduler.run_scheduler_tick(self.bot, self.notify)
+        elapsed = time.perf_counter() - started
+
+        record = {
+            "tick": self.tick,
+            "now": clock.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "notified": notified,
+            "completed": completed,
+            "snoozed": snoozed,
+            "wall_ms": round(elapsed * 1000, 2),
+            "sql_ms": round((sql_seconds() - sql_before) * 1000, 2),
+            "rss_mb": round(rss_mb(), 1),
+            "live_loops": len(scheduler.active_notification_loops),
+        }
+
+        # Keyingi tekshiruvgacha vaqtni surish: eslatma looplari shu yerda ishlaydi
+        messages = self.session.calls["SendMessage"]
+        await self.clock.advance(TICK_SECONDS)
+        record["reminders"] = self.session.calls["SendMessage"] - messages
+        self.tick += 1
+        return record
+
+    async def archive(self) -> Dict[str, float]:
+        """clean_old_completed_tasks ni virtual vaqt bilan bajarish"""
+        sql_before = sql_seconds()
+        started = time.perf_counter()
+        moved = await db.clean_old_completed_tasks(days=3)
+        return {
+            "moved": moved,
+            "wall_ms": round((time.perf_counter() - started) * 1000, 1),
+            "sql_ms": round((sql_seconds() - sql_before) * 1000, 1),
+        }
+
+
+def summarize(label: str, values: List[float]) -> str:
+    p95 = statistics.quantiles(values, n=20)[18] if len(values) > 1 else values[0]
+    return (f"{label:<14} o'rtacha {statistics.mean(values):9.2f}   p50 {statistics.median(values):9.2f}   "
+            f"p95 {p95:9.2f}   max {max(values):9.2f}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--ticks", type=int, default=120, help="Tekshiruvlar soni (120 = 1 soat)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Bot API kechikishi (sekund)")
+    parser.add_argument("--complete-rate", type=float, default=0.5)
+    parser.add_argument("--snooze-rate", type=float, default=0.2)
+    parser.add_argument("--archive-every", type=int, default=360, help="Arxivlash oralig'i (tekshiruvlarda)")
+    parser.add_argument("--csv", help="Har bir tekshiruv natijasini CSV faylga yozish")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    # SQL vaqtini o'lchash uchun (ulanishlar ochilishidan oldin)
+    profiler.configure(True, slow_ms=float("inf"))
+    # Soat boshidan 10 sekund o'tgan payt - haqiqiy loopdagidek daqiqa o'rtasida emas
+    start = datetime.now().replace(hour=8, minute=0, second=10, microsecond=0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DATABASE_NAME = os.path.join(tmp, "bench.db")
+        await setup_db()
+
+        started = time.perf_counter()
+        seed(db.DATABASE_NAME, args.tasks, args.users, start)
+        size = os.path.getsize(db.DATABASE_NAME) / 2 ** 20
+        print(f"{args.tasks} ta task, {args.users} foydalanuvchi yozildi: "
+              f"{time.perf_counter() - started:.1f} s, baza {size:.0f} MB")
+
+        session = FakeSession(latency=args.latency)
+        bot = Bot(FAKE_TOKEN, session=session)
+        notification.router.bot = bot
+        virtual = VirtualClock(start)
+        previous = clock.set_clock(virtual)
+        bench = SchedulerBench(bot, session, virtual, args.complete_rate, args.snooze_rate)
+
+        records = []
+        archives = []
+        try:
+            for tick in range(args.ticks):
+                if tick % args.archive_every == 0:
+                    archives.append(await bench.archive())
+                records.append(await bench.run_tick())
+        finally:
+            for key in list(scheduler.active_notification_loops):
+                task_id, user_id = key.split("_")
+                scheduler.stop_reminder_loop(int(user_id), int(task_id))
+            clock.set_clock(previous)
+            await db.close_db()
+
+    minutes = args.ticks * TICK_SECONDS / 60
+    print(f"\n{args.ticks} tekshiruv ({minutes:.0f} daqiqa soxta vaqt), Bot API kechikishi "
+          f"{args.latency * 1000:.0f} ms")
+    print(f"Eslatmalar: {sum(r['notified'] for r in records)}, bajarildi: "
+          f"{sum(r['completed'] for r in records)}, kechiktirildi: {sum(r['snoozed'] for r in records)}")
+    print(summarize("tekshiruv ms", [r["wall_ms"] for r in records]))
+    print(summarize("SQL ms", [r["sql_ms"] for r in records]))
+    print(summarize("RSS MB", [r["rss_mb"] for r in records]))
+    print(summarize("tirik looplar", [r["live_loops"] for r in records]))
+    print(summarize("takroriy/tick", [r["reminders"] for r in records]))
+    for archive in archives:
+        print(f"Arxivlash: {archive['moved']} ta task, {archive['wall_ms']} ms (SQL {archive['sql_ms']} ms)")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(records[0]))
+            writer.writeheader()
+            writer.writerows(records)
+        print(f"\nTekshiruvlar: {args.csv}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""
+Task qidiruvi benchmarki: LIKE '%...%' skanerlash va FTS5 indeksi.
+
+N ta task U ta foydalanuvchiga taqsimlanadi (nomlar tasodifiy so'zlardan,
+tasklarning 10% i bitta "katta" foydalanuvchiga tegishli), keyin bir xil
+so'zlar bilan oddiy foydalanuvchi, katta foydalanuvchi va barcha tasklar
+bo'yicha qidiriladi. Har bir usul uchun o'rtacha so'rov vaqti ko'rsatiladi.
+
+Oddiy foydalanuvchida (yuzlab tasklar) idx_tasks_user_status orqali LIKE ham
+tez; FTS5 ning foydasi katta foydalanuvchilar va admin qidiruvida ko'rinadi.
+
+Ishga tushirish:
+    python -m benchmarks.bench_search --rows 1000000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from database import db, setup_db
+
+WORDS = [
+    "non", "olish", "sut", "dars", "uchrashuv", "hisobot", "qo'ng'iroq", "sport", "kitob",
+    "o'qish", "doktor", "to'lov", "bozor", "ish", "loyiha", "tayyorlash", "yozish", "tozalash",
+    "ota-ona", "mashina", "ta'mirlash", "kino", "sovg'a", "dori", "suv", "gullar", "reja",
+]
+
+# Ko'p uchraydigan so'zlar, bitta taskka xos raqam va mos kelmaydigan so'z
+QUERIES = ["non", "hisob", "ta'mir", "kitob o'qish", "doktor", "123457", "zilzila"]
+
+
+def seed(path: str, rows: int, users: int) -> None:
+    """Tasodifiy nomli tasklarni yozish (triggerlar FTS indeksini to'ldiradi)"""
+    rng = random.Random(42)
+    conn = sqlite3.connect(path)
+    batch = []
+    for i in range(rows):
+        name = " ".join(rng.sample(WORDS, rng.randint(2, 4))) + f" #{i}"
+        user_id = 1 if i % 10 == 0 else rng.randint(2, users)
+        batch.append((user_id, name, "09:00", "2030-01-01 09:00"))
+        if len(batch) == 50000:
+            conn.executemany(
+                "INSERT INTO tasks (user_id, task_name, task_time, task_datetime, status) VALUES (?, ?, ?, ?, 'active')",
+                batch
+            )
+            batch = []
+    conn.executemany(
+        "INSERT INTO tasks (user_id, task_name, task_time, task_datetime, status) VALUES (?, ?, ?, ?, 'active')",
+        batch
+    )
+    conn.commit()
+    conn.close()
+
+
+def bench_like(path: str, user_id, repeat: int) -> float:
+    """LIKE bilan qidiruvning o'rtacha vaqti (ms)"""
+    conn = sqlite3.connect(path)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            conditions = " AND ".join("task_name LIKE ?" for _ in query.split())
+            params = [f"%{term}%" for term in query.split()]
+            if user_id is not None:
+                conditions += " AND user_id = ?"
+                params.append(user_id)
+            conn.execute(f"SELECT id FROM tasks WHERE {conditions} LIMIT 10", params).fetchall()
+    conn.close()
+    return (time.perf_counter() - started) * 1000 / (repeat * len(QUERIES))
+
+
+async def bench_fts(user_id, repeat: int) -> float:
+    """search_tasks bilan qidiruvning o'rtacha vaqti (ms)"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            await db.search_tasks(query, user_id, limit=10)
+    return (time.perf_counter() - started) * 1000 / (repeat * len(QUERIES))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DATABASE_NAME = os.path.join(tmp, "bench.db")
+        await setup_db()
+        started = time.perf_counter()
+        seed(db.DATABASE_NAME, args.rows, args.users)
+        print(f"{args.rows} ta task yozildi (FTS triggerlari bilan): {time.perf_counter() - started:.1f} s")
+
+        try:
+            for label, user_id in (("oddiy foydalanuvchi", 2), ("katta foydalanuvchi", 1), ("barcha tasklar", None)):
+                like_ms = bench_like(db.DATABASE_NAME, user_id, args.repeat)
+                fts_ms = await bench_fts(user_id, args.repeat)
+                print(f"{label:<20}: LIKE {like_ms:9.2f} ms   FTS5 {fts_ms:7.2f} ms   ({like_ms / fts_ms:.1f}x)")
+        finally:
+            await db.close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
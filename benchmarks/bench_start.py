@@ -0,0 +1,116 @@
+"""
+/start javob vaqti benchmarki (soxta Bot API sessiyasi bilan).
+
+/start yangilanishlari haqiqiy Dispatcher, SubscriptionMiddleware va
+task.router orqali o'tkaziladi; Bot API so'rovlari FakeSession ga boradi,
+u har bir so'rovni --latency sekund kechiktiradi. Majburiy kanal va ikki
+admin sozlangan, jamlash o'chiq (har bir yangi foydalanuvchi haqida adminlarga
+darhol xabar ketadi) - ya'ni eng og'ir holat.
+
+Har bir holat uchun yangilanish boshidan foydalanuvchiga javob (SendMessage)
+yuborilgungacha bo'lgan vaqt o'lchanadi: o'rtacha va p95.
+
+Ishga tushirish:
+    python -m benchmarks.bench_start --updates 100 --latency 0.05
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from typing import List
+
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import Chat, Message, Update, User
+
+from benchmarks.fake_session import FAKE_TOKEN, FakeSession
+from database import db, setup_db
+from handlers import admin, task
+from handlers.middleware import SubscriptionMiddleware
+
+
+def make_start_update(update_id: int, user_id: int) -> Update:
+    """Foydalanuvchidan kelgan /start yangilanishi"""
+    user = User(id=user_id, is_bot=False, first_name="User", username=f"user{user_id}")
+    return Update(update_id=update_id, message=Message(
+        message_id=update_id, date=datetime.now(), chat=Chat(id=user_id, type="private"),
+        from_user=user, text="/start"
+    ))
+
+
+async def measure(dp: Dispatcher, bot: Bot, session: FakeSession, user_ids: List[int]) -> List[float]:
+    """Har bir /start uchun foydalanuvchi javob olguncha ketgan vaqt (ms)"""
+    latencies = []
+    answered = {}
+    original = session.make_request
+
+    async def make_request(bot, method, timeout=None):
+        # Foydalanuvchiga birinchi javob yuborilgan payt
+        if type(method).__name__ == "SendMessage" and method.chat_id not in answered:
+            answered[method.chat_id] = time.perf_counter()
+        return await original(bot, method, timeout)
+
+    session.make_request = make_request
+    try:
+        for update_id, user_id in enumerate(user_ids, start=1):
+            started = time.perf_counter()
+            await dp.feed_update(bot, make_start_update(update_id, user_id))
+            latencies.append((answered[user_id] - started) * 1000)
+        # Fon rejimidagi admin xabarlari tugashini kutish
+        await asyncio.sleep(session.latency * 3)
+    finally:
+        session.make_request = original
+    return latencies
+
+
+def report(label: str, latencies: List[float], session: FakeSession) -> None:
+    p95 = statistics.quantiles(latencies, n=20)[18]
+    calls = ", ".join(f"{name} {count}" for name, count in sorted(session.calls.items()))
+    print(f"{label:<24}: o'rtacha {statistics.mean(latencies):7.1f} ms   p95 {p95:7.1f} ms   [{calls}]")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DATABASE_NAME = os.path.join(tmp, "bench.db")
+        await setup_db()
+        await db.set_config("REQUIRED_CHANNEL_ID", "@dinotasks")
+
+        session = FakeSession(latency=args.latency)
+        bot = Bot(FAKE_TOKEN, session=session)
+        task.router.bot = bot
+        admin.router.bot = bot
+        admin.ADMIN_IDS = [1, 2]
+
+        dp = Dispatcher(storage=MemoryStorage())
+        dp.message.middleware(SubscriptionMiddleware())
+        dp.include_router(task.router)
+        # Command filtri bot.me() ni bir marta so'raydi - o'lchovdan oldin keshlanadi
+        await bot.me()
+
+        try:
+            new_users = list(range(1000, 1000 + args.updates))
+            print(f"{args.updates} ta /start, Bot API kechikishi {args.latency * 1000:.0f} ms")
+            for label, user_ids, subscribed in (
+                ("yangi foydalanuvchi", new_users, True),
+                ("qaytgan foydalanuvchi", new_users, True),
+                ("obuna bo'lmagan", new_users, False),
+            ):
+                session.subscribed = subscribed
+                session.reset_stats()
+                report(label, await measure(dp, bot, session, user_ids), session)
+        finally:
+            await db.close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
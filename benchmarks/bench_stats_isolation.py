@@ -0,0 +1,107 @@
+"""
+Statistika so'rovlari scheduler tickiga ta'sirini o'lchaydi.
+
+Katta `tasks` jadvalida scheduler ticki (snoozed tasklarni faollashtirish,
+vaqti kelgan tasklarni olish va yozuvlar) avval yolg'iz, keyin parallel
+ravishda `get_statistics` bilan bombardimon qilinganda o'lchanadi.
+
+Ishga tushirish:
+    python -m benchmarks.bench_stats_isolation --tasks 200000 --ticks 50 --hammers 4
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from database import db, setup_db
+
+
+def seed(path: str, tasks: int, users: int) -> None:
+    """Sinov ma'lumotlarini sinxron sqlite3 bilan tez yozish"""
+    conn = sqlite3.connect(path)
+    now = datetime.now()
+    statuses = ["active", "completed", "completed", "snoozed"]
+    rows = []
+    for i in range(tasks):
+        dt = now + timedelta(minutes=random.randint(-7 * 24 * 60, 7 * 24 * 60))
+        rows.append((i % users, f"Task {i}", dt.strftime("%H:%M"), dt.strftime("%Y-%m-%d %H:%M"), random.choice(statuses)))
+    conn.executemany(
+        "INSERT INTO tasks (user_id, task_name, task_time, task_datetime, status) VALUES (?, ?, ?, ?, ?)",
+        rows
+    )
+    conn.executemany(
+        "INSERT INTO users (user_id, full_name, username) VALUES (?, ?, ?)",
+        [(u, f"User {u}", None) for u in range(users)]
+    )
+    conn.commit()
+    conn.close()
+
+
+async def tick(max_id: int) -> None:
+    """Scheduler tickiga o'xshash ish yuklamasi"""
+    await db.reactivate_snoozed_tasks()
+    await db.get_due_tasks()
+    await db.postpone_task(random.randint(1, max_id), 5)
+    await db.mark_task_completed(random.randint(1, max_id))
+
+
+async def measure(ticks: int, max_id: int) -> List[float]:
+    """Har bir tick davomiyligini millisekundlarda qaytaradi"""
+    timings = []
+    for _ in range(ticks):
+        started = time.perf_counter()
+        await tick(max_id)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(name: str, timings: List[float]) -> None:
+    timings = sorted(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"{name:<28} p50={statistics.median(timings):8.2f} ms  p99={p99:8.2f} ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=200000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--ticks", type=int, default=50)
+    parser.add_argument("--hammers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DATABASE_NAME = os.path.join(tmp, "bench.db")
+        await setup_db()
+        seed(db.DATABASE_NAME, args.tasks, args.users)
+        # Birinchi tick barcha eski snoozed tasklarni faollashtiradi - o'lchovga kirmaydi
+        await tick(args.tasks)
+
+        report("Tick (yolg'iz)", await measure(args.ticks, args.tasks))
+
+        stop = asyncio.Event()
+        stats_calls = 0
+
+        async def hammer() -> None:
+            nonlocal stats_calls
+            while not stop.is_set():
+                await db.get_statistics()
+                stats_calls += 1
+
+        hammers = [asyncio.create_task(hammer()) for _ in range(args.hammers)]
+        timings = await measure(args.ticks, args.tasks)
+        stop.set()
+        await asyncio.gather(*hammers)
+        report(f"Tick (+{args.hammers} statistika oqimi)", timings)
+        print(f"Statistika so'rovlari: {stats_calls}")
+
+        await db.close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""
+Task yozuvlari benchmarki: `dict(aiosqlite.Row)` va `Task` (__slots__) ni
+xotira va CPU bo'yicha solishtiradi.
+
+Bir xil so'rov ikki usulda o'qiladi: eski usul (SELECT * va har bir qatordan
+dict) va yangi usul (faqat kerakli ustunlar va task_row_factory). Xotira
+tracemalloc bilan, vaqt esa bir necha takrorlarning eng yaxshisi sifatida
+o'lchanadi.
+
+Ishga tushirish:
+    python -m benchmarks.bench_task_record --rows 100000 --repeat 5
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from database.models import task_row_factory
+
+OLD_SQL = "SELECT * FROM tasks WHERE status = 'active' ORDER BY task_datetime"
+NEW_SQL = "SELECT id, task_name, task_time, task_datetime, status FROM tasks WHERE status = 'active' ORDER BY task_datetime"
+
+
+def seed(path: str, rows: int) -> None:
+    """Sinov jadvalini yaratish va to'ldirish"""
+    conn = sqlite3.connect(path)
+    conn.execute("""
+    CREATE TABLE tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        task_name TEXT NOT NULL,
+        task_time TEXT NOT NULL,
+        task_datetime TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        is_completed BOOLEAN DEFAULT FALSE,
+        status TEXT DEFAULT 'active'
+    )
+    """)
+    conn.executemany(
+        "INSERT INTO tasks (user_id, task_name, task_time, task_datetime) VALUES (?, ?, ?, ?)",
+        [(i % 1000, f"Task {i}", f"{i % 24:02d}:00", f"2030-01-{i % 28 + 1:02d} {i % 24:02d}:00") for i in range(rows)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def fetch_dicts(conn: sqlite3.Connection) -> list:
+    """Eski usul: sqlite3.Row dan dict"""
+    conn.row_factory = sqlite3.Row
+    return [dict(row) for row in conn.execute(OLD_SQL).fetchall()]
+
+
+def fetch_tasks(conn: sqlite3.Connection) -> list:
+    """Yangi usul: kerakli ustunlar va Task"""
+    conn.row_factory = task_row_factory
+    return conn.execute(NEW_SQL).fetchall()
+
+
+def measure(conn: sqlite3.Connection, fetch: Callable[[sqlite3.Connection], list], repeat: int) -> Tuple[float, int]:
+    """(eng yaxshi vaqt ms, natija egallagan xotira bayt)"""
+    timings: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fetch(conn)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    result = fetch(conn)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return min(timings), retained
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed(path, args.rows)
+        conn = sqlite3.connect(path)
+
+        old_time, old_mem = measure(conn, fetch_dicts, args.repeat)
+        new_time, new_mem = measure(conn, fetch_tasks, args.repeat)
+        conn.close()
+
+    print(f"dict(row) : {old_time:9.1f} ms  {old_mem / 1024 / 1024:8.1f} MB")
+    print(f"Task      : {new_time:9.1f} ms  {new_mem / 1024 / 1024:8.1f} MB")
+    print(f"Farq      : {old_time / new_time:9.2f}x  {old_mem / new_mem:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
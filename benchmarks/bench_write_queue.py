@@ -0,0 +1,62 @@
+"""
+Group commit benchmarki: har bir yozuv alohida commit qilinishi va
+yozuvchi navbat orqali paketlab commit qilinishini solishtiradi.
+
+Ishga tushirish:
+    python -m benchmarks.bench_write_queue --ops 1000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import aiosqlite
+
+from database import db, setup_db
+
+
+async def legacy_add_task(user_id: int, task_name: str, task_date: str, task_time: str) -> None:
+    """Eski usul: har bir chaqiruvda yangi ulanish va alohida commit"""
+    async with aiosqlite.connect(db.DATABASE_NAME) as conn:
+        await conn.execute(
+            "INSERT INTO tasks (user_id, task_name, task_time, task_datetime, status) VALUES (?, ?, ?, ?, 'active')",
+            (user_id, task_name, task_time, f"{task_date} {task_time}")
+        )
+        await conn.commit()
+
+
+async def run(add, ops: int, concurrency: int) -> float:
+    """ops ta yozuvni concurrency ta parallel chaqiruvchi bilan yozish, yozuv/sekund qaytaradi"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            await add(i % 1000, f"Task {i}", "2030-01-01", "12:00")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(ops)))
+    return ops / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DATABASE_NAME = os.path.join(tmp, "bench.db")
+        await setup_db()
+
+        legacy = await run(legacy_add_task, args.ops, args.concurrency)
+        grouped = await run(db.add_task, args.ops, args.concurrency)
+        await db.close_db()
+
+    print(f"Alohida commit : {legacy:10.1f} yozuv/s")
+    print(f"Group commit   : {grouped:10.1f} yozuv/s")
+    print(f"Tezlashish     : {grouped / legacy:10.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
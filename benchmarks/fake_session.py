@@ -0,0 +1,117 @@
+"""
+Benchmarklar uchun soxta Bot API sessiyasi.
+
+Tarmoqqa chiqmaydi: har bir so'rov `latency` sekund kutadi (Telegram'gacha
+bo'lgan yo'lni taqlid qiladi) va metod turiga mos tayyor javob qaytaradi.
+Chaqiruvlar soni va bir vaqtda bajarilgan so'rovlarning eng ko'p soni
+yoziladi, shuning uchun handlerlarning API chaqiruvlari ketma-ket yoki
+parallel ekanligini ham ko'rish mumkin.
+
+Foydalanish:
+    session = FakeSession(latency=0.05)
+    bot = Bot(FAKE_TOKEN, session=session)
+"""
+import asyncio
+from collections import Counter
+from datetime import datetime
+from typing import Any, AsyncGenerator, Callable, Dict, Optional
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.types import (
+    AcceptedGiftTypes, Chat, ChatFullInfo, ChatMemberMember, ChatMemberLeft, Message, MessageId, User
+)
+
+# Bot tokeni formatiga mos soxta token
+FAKE_TOKEN = "123456:FAKE-TOKEN-FOR-BENCHMARKS"
+
+BOT_USER = User(id=123456, is_bot=True, first_name="DinoTasks", username="dinotasks_bot")
+
+
+class FakeSession(BaseSession):
+    """
+    Bot API so'rovlarini xotirada javob beradigan sessiya.
+
+    Args:
+        latency: Har bir so'rovning soxta tarmoq kechikishi (sekund)
+        subscribed: get_chat_member foydalanuvchini obunachi deb qaytaradimi
+        responders: Metod nomi -> javob funksiyasi (standart javoblarni almashtirish uchun)
+    """
+
+    def __init__(self, latency: float = 0.05, subscribed: bool = True,
+                 responders: Optional[Dict[str, Callable[[TelegramMethod], Any]]] = None):
+        super().__init__()
+        self.latency = latency
+        self.subscribed = subscribed
+        self.responders = responders or {}
+        self.calls: Counter = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._message_id = 0
+
+    def reset_stats(self) -> None:
+        """Hisoblagichlarni nolga qaytarish"""
+        self.calls.clear()
+        self.max_in_flight = 0
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: Optional[int] = None) -> Any:
+        name = type(method).__name__
+        self.calls[name] += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            responder = self.responders.get(name) or getattr(self, f"_answer_{name}", None)
+            return responder(method) if responder else True
+        finally:
+            self.in_flight -= 1
+
+    async def stream_content(self, url: str, headers: Optional[Dict[str, Any]] = None, timeout: int = 30,
+                             chunk_size: int = 65536, raise_for_status: bool = True) -> AsyncGenerator[bytes, None]:
+        if False:
+            yield b""
+
+    async def close(self) -> None:
+        pass
+
+    # --- Standart javoblar ---
+
+    def _message(self, chat_id: Any, text: Optional[str] = None) -> Message:
+        self._message_id += 1
+        chat_type = "private" if isinstance(chat_id, int) and chat_id > 0 else "channel"
+        return Message(
+            message_id=self._message_id, date=datetime.now(),
+            chat=Chat(id=chat_id if isinstance(chat_id, int) else -100, type=chat_type), text=text
+        )
+
+    def _answer_GetMe(self, method: TelegramMethod) -> User:
+        return BOT_USER
+
+    def _answer_SendMessage(self, method: TelegramMethod) -> Message:
+        return self._message(method.chat_id, method.text)
+
+    def _answer_EditMessageText(self, method: TelegramMethod) -> Message:
+        return self._message(method.chat_id or 0, method.text)
+
+    def _answer_SendDocument(self, method: TelegramMethod) -> Message:
+        return self._message(method.chat_id)
+
+    def _answer_CopyMessage(self, method: TelegramMethod) -> MessageId:
+        self._message_id += 1
+        return MessageId(message_id=self._message_id)
+
+    def _answer_GetChatMember(self, method: TelegramMethod) -> Any:
+        user = User(id=method.user_id, is_bot=False, first_name="User")
+        if self.subscribed:
+            return ChatMemberMember(user=user)
+        return ChatMemberLeft(user=user)
+
+    def _answer_GetChat(self, method: TelegramMethod) -> ChatFullInfo:
+        return ChatFullInfo(
+            id=-1001, type="channel", title="Kanal", accent_color_id=0, max_reaction_count=0,
+            accepted_gift_types=AcceptedGiftTypes(
+                unlimited_gifts=False, limited_gifts=False, unique_gifts=False, premium_subscription=False
+            )
+        )
@@ -1,30 +1,53 @@
 from database.db import (
-    init_db, add_task, get_active_tasks, get_upcoming_tasks, 
+    init_db, add_task, add_tasks, get_active_tasks, get_upcoming_tasks, 
+    import_tasks, iter_user_tasks, set_task_recurrence, stop_task_recurrence, rollover_recurring_tasks,
     get_due_tasks, postpone_task, mark_task_completed, 
     reactivate_snoozed_tasks, get_all_upcoming_tasks,
+    create_archive_table, clean_old_completed_tasks, get_completed_tasks,
+    create_search_index, search_tasks,
     # Admin panel uchun funksiyalar
     create_users_table, create_config_table, create_post_channels_table,
-    add_user, get_user_count, get_completed_tasks_count, get_snoozed_tasks_count,
-    get_active_tasks_count, get_tasks_per_user, set_config, get_config,
-    add_post_channel, get_post_channels, remove_post_channel
+    create_stats_counters_table, reconcile_stats_counters,
+    create_rollup_tables, record_reminder_sent, get_rollups, prune_hourly_rollups,
+    add_user, toggle_digest, deactivate_users, iter_digest_groups, get_user_count, get_completed_tasks_count, get_snoozed_tasks_count,
+    get_active_tasks_count, get_tasks_per_user, get_statistics, set_config, get_config,
+    add_post_channel, get_post_channels, remove_post_channel,
+    get_sendable_post_channels, record_channel_success, record_channel_failure, resume_post_channel,
+    create_broadcasts_table, create_broadcast, get_broadcast, get_running_broadcasts,
+    get_broadcast_recipients, save_broadcast_progress, set_broadcast_status,
+    close_db
 )
 
 async def setup_db():
     """Barcha ma'lumotlar bazasi jadvallarini yaratish"""
     await init_db()
+    await create_archive_table()
     await create_users_table()
     await create_config_table()
     await create_post_channels_table()
+    await create_stats_counters_table()
+    await create_rollup_tables()
+    await create_search_index()
+    await create_broadcasts_table()
 
 __all__ = [
-    'init_db', 'add_task', 'get_active_tasks', 'get_upcoming_tasks',
+    'init_db', 'add_task', 'add_tasks', 'get_active_tasks', 'get_upcoming_tasks',
+    'import_tasks', 'iter_user_tasks', 'set_task_recurrence', 'stop_task_recurrence', 'rollover_recurring_tasks',
     'get_due_tasks', 'postpone_task', 'mark_task_completed',
     'reactivate_snoozed_tasks', 'get_all_upcoming_tasks',
+    'create_archive_table', 'clean_old_completed_tasks', 'get_completed_tasks',
+    'create_search_index', 'search_tasks',
     # Admin panel uchun funksiyalar
     'create_users_table', 'create_config_table', 'create_post_channels_table',
-    'add_user', 'get_user_count', 'get_completed_tasks_count', 'get_snoozed_tasks_count',
-    'get_active_tasks_count', 'get_tasks_per_user', 'set_config', 'get_config',
+    'create_stats_counters_table', 'reconcile_stats_counters',
+    'create_rollup_tables', 'record_reminder_sent', 'get_rollups', 'prune_hourly_rollups',
+    'add_user', 'toggle_digest', 'deactivate_users', 'iter_digest_groups', 'get_user_count', 'get_completed_tasks_count', 'get_snoozed_tasks_count',
+    'get_active_tasks_count', 'get_tasks_per_user', 'get_statistics', 'set_config', 'get_config',
     'add_post_channel', 'get_post_channels', 'remove_post_channel',
+    'get_sendable_post_channels', 'record_channel_success', 'record_channel_failure', 'resume_post_channel',
+    'create_broadcasts_table', 'create_broadcast', 'get_broadcast', 'get_running_broadcasts',
+    'get_broadcast_recipients', 'save_broadcast_progress', 'set_broadcast_status',
+    'close_db',
     # Yig'ilgan funksiyalar
     'setup_db'
 ] 
\ No newline at end of file
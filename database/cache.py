@@ -0,0 +1,185 @@
+import itertools
+import sys
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+from utils import clock
+
+# Keshda yo'q qiymatni None dan ajratish uchun belgi
+MISSING = object()
+
+
+class RenderCache:
+    """
+    Foydalanuvchi bo'yicha tayyor (render qilingan) sahifalar keshi.
+
+    Yozuvlar LRU tartibida saqlanadi va umumiy hajm max_bytes dan oshsa eng
+    eskisi chiqarib tashlanadi. Foydalanuvchining tasklari o'zgarganda
+    invalidate(user_id) uning barcha sahifalarini o'chiradi.
+
+    O'qish va yozuv bir vaqtda bo'lsa eskirgan sahifa saqlanib qolmasligi uchun
+    o'qishdan oldin begin() bilan belgi olinadi: agar shu orada foydalanuvchi
+    invalidate qilingan bo'lsa, put() natijani saqlamaydi.
+    """
+
+    # Har bir yozuvning qo'shimcha xotira narxi (kalit, klaviatura va h.k.)
+    ENTRY_OVERHEAD = 512
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024, max_tracked_users: int = 10000):
+        """
+        Args:
+            max_bytes: Keshning taxminiy maksimal hajmi (bayt)
+            max_tracked_users: Invalidatsiya belgilari saqlanadigan foydalanuvchilar soni
+        """
+        self.max_bytes = max_bytes
+        self.max_tracked_users = max_tracked_users
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        # (user_id, key) -> (qiymat, amal qilish muddati, hajm)
+        self._entries: "OrderedDict[Tuple[int, Hashable], Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._user_keys: Dict[int, Set[Hashable]] = {}
+        # Foydalanuvchi oxirgi marta invalidate qilingan belgi
+        self._invalidated: Dict[int, int] = {}
+        self._forgotten_upto = 0
+        self._ticks = itertools.count(1)
+
+    def begin(self) -> int:
+        """O'qishdan oldin olinadigan belgi (put() ga uzatiladi)"""
+        return next(self._ticks)
+
+    def get(self, user_id: int, key: Hashable) -> Any:
+        """Keshdagi qiymat yoki MISSING"""
+        entry = self._entries.get((user_id, key))
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        value, expires_at, _ = entry
+        if expires_at is not None and clock.timestamp() >= expires_at:
+            self._remove((user_id, key))
+            self.misses += 1
+            return MISSING
+
+        self._entries.move_to_end((user_id, key))
+        self.hits += 1
+        return value
+
+    def put(self, user_id: int, key: Hashable, value: Any, since: int,
+            expires_at: Optional[float] = None, size: Optional[int] = None) -> None:
+        """
+        Qiymatni keshga saqlash
+
+        Args:
+            user_id: Foydalanuvchi ID
+            key: Sahifa kaliti
+            value: Saqlanadigan qiymat
+            since: O'qishdan oldin begin() qaytargan belgi
+            expires_at: Qiymat eskiradigan vaqt (unix timestamp), None - cheksiz
+            size: Qiymat hajmi (bayt), berilmasa taxminan hisoblanadi
+        """
+        # O'qish davomida foydalanuvchi tasklari o'zgargan bo'lsa saqlamaymiz
+        if since <= self._forgotten_upto or self._invalidated.get(user_id, 0) >= since:
+            return
+
+        if size is None:
+            size = sys.getsizeof(value)
+        size += self.ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+
+        self._remove((user_id, key))
+        self._entries[(user_id, key)] = (value, expires_at, size)
+        self._user_keys.setdefault(user_id, set()).add(key)
+        self.size += size
+
+        # LRU: hajm oshib ketsa eng eskilarini chiqarish
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, user_id: int) -> None:
+        """Foydalanuvchining barcha sahifalarini o'chirish"""
+        for key in list(self._user_keys.get(user_id, ())):
+            self._remove((user_id, key))
+        self._invalidated[user_id] = next(self._ticks)
+
+        # Belgilar ro'yxatini cheklash: unutilgan belgilardan oldingi o'qishlar saqlanmaydi
+        if len(self._invalidated) > self.max_tracked_users:
+            self._forgotten_upto = max(self._invalidated.values())
+            self._invalidated.clear()
+
+    def clear(self) -> None:
+        """Butun keshni tozalash"""
+        self._entries.clear()
+        self._user_keys.clear()
+        self.size = 0
+        self._forgotten_upto = next(self._ticks)
+        self._invalidated.clear()
+
+    def _remove(self, entry_key: Tuple[int, Hashable]) -> None:
+        """Bitta yozuvni o'chirish"""
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:
+            return
+        self.size -= entry[2]
+        user_id, key = entry_key
+        keys = self._user_keys.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._user_keys[user_id]
+
+
+# Task ro'yxatlari sahifalari uchun umumiy kesh
+task_list_cache = RenderCache()
+
+
+class SeenUsers:
+    """
+    Yaqinda ko'rilgan foydalanuvchilar filtri.
+
+    /start har bosilganda foydalanuvchi bazaga yozilishi shart emas: ismi va
+    username o'zgarmagan aktiv foydalanuvchi shu yerda topilsa, bazaga umuman
+    murojaat qilinmaydi. Yozuvlar LRU tartibida saqlanadi va max_users dan
+    oshganda eng eskisi chiqariladi; foydalanuvchi nofaol deb belgilansa,
+    forget() bilan o'chiriladi.
+    """
+
+    def __init__(self, max_users: int = 20000):
+        """
+        Args:
+            max_users: Eslab qolinadigan foydalanuvchilar soni
+        """
+        self.max_users = max_users
+        self.hits = 0
+        self.misses = 0
+        # user_id -> (full_name, username)
+        self._users: "OrderedDict[int, Tuple[Optional[str], Optional[str]]]" = OrderedDict()
+
+    def check(self, user_id: int, full_name: Optional[str], username: Optional[str]) -> bool:
+        """Foydalanuvchi aynan shu ma'lumotlar bilan yaqinda ko'rilganmi"""
+        if self._users.get(user_id) == (full_name, username):
+            self._users.move_to_end(user_id)
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def remember(self, user_id: int, full_name: Optional[str], username: Optional[str]) -> None:
+        """Bazadagi holatga mos aktiv foydalanuvchini eslab qolish"""
+        self._users[user_id] = (full_name, username)
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+
+    def forget(self, user_id: int) -> None:
+        """Foydalanuvchini filtrdan o'chirish"""
+        self._users.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Butun filtrni tozalash"""
+        self._users.clear()
+
+
+# /start uchun yaqinda ko'rilgan foydalanuvchilar
+seen_users = SeenUsers()
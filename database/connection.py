@@ -0,0 +1,233 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+import aiosqlite
+
+from database.profiler import profiler
+
+# Loggerga sozlash
+logger = logging.getLogger(__name__)
+
+# Yozuvchi navbatiga yuboriladigan amal: ochiq ulanishni oladi va natija qaytaradi
+WriteJob = Callable[[aiosqlite.Connection], Awaitable[Any]]
+
+
+def connect(database: str, **kwargs: Any) -> aiosqlite.Connection:
+    """
+    aiosqlite ulanishini ochish (SQL profiler yoqilgan bo'lsa so'rovlari o'lchanadi)
+
+    Foydalanish:
+        async with connect(DATABASE_NAME) as db:
+            ...
+    """
+    return aiosqlite.connect(database, factory=profiler.connection_factory(), **kwargs)
+
+
+class WriteQueue:
+    """
+    Yagona yozuvchi (group commit).
+
+    Yozish amallari navbatga qo'yiladi, yozuvchi ularni bir necha millisekund
+    yig'adi va bitta tranzaksiyada commit qiladi. Har bir chaqiruvchi o'z
+    natijasini (yoki xatoligini) alohida kutadi.
+    """
+
+    def __init__(self, database: str, max_delay: float = 0.005, max_batch: int = 256):
+        """
+        Args:
+            database: Ma'lumotlar bazasi fayli
+            max_delay: Paket yig'ish uchun kutish vaqti (sekund)
+            max_batch: Bitta tranzaksiyadagi maksimal amallar soni
+        """
+        self.database = database
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Yozuvchi ishlayaptimi"""
+        return self._worker is not None and not self._worker.done()
+
+    @property
+    def depth(self) -> int:
+        """Navbatda kutayotgan amallar soni"""
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self) -> None:
+        """Yozuvchi ulanishini ochish va fon taskini ishga tushirish"""
+        # Bir vaqtda kelgan birinchi yozuvlar ikkinchi ulanish ochmasligi uchun
+        async with self._start_lock:
+            if self.running:
+                return
+
+            # Tranzaksiyalarni o'zimiz boshqaramiz (BEGIN/COMMIT)
+            self._conn = await connect(self.database, isolation_level=None)
+            await self._conn.execute("PRAGMA journal_mode=WAL")
+            await self._conn.execute("PRAGMA synchronous=NORMAL")
+            await self._conn.execute("PRAGMA busy_timeout=5000")
+
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+            logger.info(f"Yozuvchi navbat ishga tushdi: {self.database}")
+
+    async def stop(self) -> None:
+        """Navbatdagi barcha amallarni yozib, yozuvchini to'xtatish"""
+        if self.running:
+            await self._queue.put(None)
+            await self._worker
+        self._worker = None
+
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+        logger.info("Yozuvchi navbat to'xtatildi")
+
+    async def submit(self, job: WriteJob) -> Any:
+        """
+        Yozish amalini navbatga qo'yish va natijasini kutish
+
+        Args:
+            job: Ulanishni qabul qiladigan async funksiya
+
+        Returns:
+            Any: job qaytargan qiymat
+        """
+        if not self.running:
+            await self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((job, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Navbatdan amallarni paketlab olish va commit qilish"""
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            # Bir necha millisekund davomida boshqa amallarni yig'ish (haqiqiy vaqt:
+            # virtual soatda yozuvchi keyingi advance() gacha to'xtab qolardi)
+            if self.max_delay > 0:
+                await asyncio.sleep(self.max_delay)
+
+            batch = [item]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._commit_batch(batch)
+
+    async def _commit_batch(self, batch: List[Tuple[WriteJob, asyncio.Future]]) -> None:
+        """Paketdagi amallarni bitta tranzaksiyada bajarish"""
+        conn = self._conn
+        outcomes = []
+
+        try:
+            await conn.execute("BEGIN IMMEDIATE")
+            for job, future in batch:
+                # Har bir amal o'z savepointida - bittasining xatosi boshqalarga ta'sir qilmaydi
+                await conn.execute("SAVEPOINT job")
+                try:
+                    result = await job(conn)
+                except Exception as e:
+                    await conn.execute("ROLLBACK TO job")
+                    await conn.execute("RELEASE job")
+                    outcomes.append((future, None, e))
+                else:
+                    await conn.execute("RELEASE job")
+                    outcomes.append((future, result, None))
+            await conn.execute("COMMIT")
+        except Exception as e:
+            logger.error(f"Paketni commit qilishda xatolik ({len(batch)} ta amal): {e}")
+            try:
+                await conn.execute("ROLLBACK")
+            except Exception:
+                pass
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, result, error in outcomes:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+class ReadPool:
+    """
+    Faqat o'qish uchun ulanishlar havzasi (analitik so'rovlar uchun).
+
+    Ulanishlar `query_only` rejimida ochiladi, shuning uchun ular hech qachon
+    yozish qulfini olmaydi. WAL rejimida har bir so'rov o'z snapshotini o'qiydi
+    va yozuvchini kutmaydi.
+    """
+
+    def __init__(self, database: str, size: int = 2):
+        """
+        Args:
+            database: Ma'lumotlar bazasi fayli
+            size: Havzadagi maksimal ulanishlar soni
+        """
+        self.database = database
+        self.size = size
+        self._idle: List[aiosqlite.Connection] = []
+        self._opened = 0
+        self._available = asyncio.Condition()
+
+    async def _open(self) -> aiosqlite.Connection:
+        """Yangi faqat o'qish uchun ulanish ochish"""
+        conn = await connect(self.database)
+        await conn.execute("PRAGMA query_only=ON")
+        await conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Havzadan ulanish olish (bo'sh ulanish bo'lmasa kutish)"""
+        async with self._available:
+            while not self._idle and self._opened >= self.size:
+                await self._available.wait()
+            if self._idle:
+                conn = self._idle.pop()
+            else:
+                self._opened += 1
+                conn = None
+
+        if conn is None:
+            try:
+                conn = await self._open()
+            except Exception:
+                async with self._available:
+                    self._opened -= 1
+                    self._available.notify()
+                raise
+
+        try:
+            yield conn
+        finally:
+            async with self._available:
+                self._idle.append(conn)
+                self._available.notify()
+
+    async def close(self) -> None:
+        """Barcha bo'sh ulanishlarni yopish"""
+        async with self._available:
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+        for conn in idle:
+            await conn.close()
@@ -1,16 +1,63 @@
 import aiosqlite
+import asyncio
 import datetime
+import inspect
 import logging
-from typing import Dict, List, Any, Optional
+import re
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
+
+from database.cache import task_list_cache, seen_users
+from database.connection import WriteQueue, ReadPool, connect
+from database.models import Task, TASK_FIELDS, select_columns, task_row_factory
+from database.recurrence import make_rule, next_occurrence
+from utils import clock, metrics
 
 DATABASE_NAME = "tasks.db"
 
+# Ro'yxatlarning bitta sahifasidagi tasklar soni
+PAGE_SIZE = 10
+
+# Sahifa kursori: oxirgi ko'rsatilgan taskning (task_datetime, id) juftligi
+PageCursor = Tuple[str, int]
+
 # Loggerga sozlash
 logger = logging.getLogger(__name__)
 
+# Yagona yozuvchi navbat (birinchi yozishda yaratiladi)
+_writer: Optional[WriteQueue] = None
+# Analitik so'rovlar uchun faqat o'qish havzasi
+_read_pool: Optional[ReadPool] = None
+
+def get_writer() -> WriteQueue:
+    """Yozuvchi navbatni olish (kerak bo'lsa yaratish)"""
+    global _writer
+    if _writer is None:
+        _writer = WriteQueue(DATABASE_NAME)
+    return _writer
+
+def get_read_pool() -> ReadPool:
+    """Faqat o'qish havzasini olish (kerak bo'lsa yaratish)"""
+    global _read_pool
+    if _read_pool is None:
+        _read_pool = ReadPool(DATABASE_NAME)
+    return _read_pool
+
+async def close_db() -> None:
+    """Navbatdagi yozuvlarni yakunlab, barcha ulanishlarni yopish"""
+    global _writer, _read_pool
+    if _writer is not None:
+        await _writer.stop()
+        _writer = None
+    if _read_pool is not None:
+        await _read_pool.close()
+        _read_pool = None
+
 async def init_db():
     """Ma'lumotlar bazasini yaratish va jadvallarni sozlash"""
-    async with aiosqlite.connect(DATABASE_NAME) as db:
+    async with connect(DATABASE_NAME) as db:
+        # WAL rejimi - o'quvchilar yozuvchini kutib qolmaydi
+        await db.execute("PRAGMA journal_mode=WAL")
+        
         # Avval tasks jadvalining mavjudligini tekshirish
         cursor = await db.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='tasks'")
         table_exists = await cursor.fetchone()
@@ -26,7 +73,8 @@ async def init_db():
                 task_datetime TEXT NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 is_completed BOOLEAN DEFAULT FALSE,
-                status TEXT DEFAULT 'active'
+                status TEXT DEFAULT 'active',
+                recurrence TEXT
             )
             """)
             await db.commit()
@@ -35,7 +83,7 @@ async def init_db():
             try:
                 await db.execute("ALTER TABLE tasks ADD COLUMN task_datetime TEXT")
                 # Mavjud tasklar uchun task_datetime ni to'ldirish
-                today = datetime.datetime.now().strftime("%Y-%m-%d")
+                today = clock.now().strftime("%Y-%m-%d")
                 await db.execute(f"UPDATE tasks SET task_datetime = task_time || ' {today}'")
                 await db.commit()
                 logger.info("Jadvalga task_datetime ustuni qo'shildi va mavjud ma'lumotlar yangilandi")
@@ -44,8 +92,31 @@ async def init_db():
                     logger.info("task_datetime ustuni allaqachon mavjud")
                 else:
                     logger.error(f"Jadval o'zgartirishda xatolik: {e}")
+            
+            # Takrorlanish qoidasi ustuni (NULL - bir martalik task)
+            cursor = await db.execute("PRAGMA table_info(tasks)")
+            columns = [row[1] for row in await cursor.fetchall()]
+            if "recurrence" not in columns:
+                await db.execute("ALTER TABLE tasks ADD COLUMN recurrence TEXT")
+                await db.commit()
+                logger.info("Jadvalga recurrence ustuni qo'shildi")
+        
+        # Status va vaqt bo'yicha indeks (vaqti kelgan va eski bajarilgan tasklar uchun)
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_status_datetime ON tasks (status, task_datetime)"
+        )
+        # Foydalanuvchi va status bo'yicha indeks (foydalanuvchi ro'yxatlari va o'chirish uchun)
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_user_status ON tasks (user_id, status, task_datetime)"
+        )
+        # Takrorlanuvchi aktiv tasklar (o'tkazib yuborilgan takrorlanishlarni surish uchun)
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_recurring ON tasks (task_datetime) "
+            "WHERE recurrence IS NOT NULL AND status = 'active'"
+        )
+        await db.commit()
 
-async def add_task(user_id: int, task_name: str, task_date: str, task_time: str) -> None:
+async def add_task(user_id: int, task_name: str, task_date: str, task_time: str) -> int:
     """
     Yangi task qo'shish
     
@@ -54,266 +125,874 @@ async def add_task(user_id: int, task_name: str, task_date: str, task_time: str)
         task_name: Task nomi
         task_date: Task sanasi (YYYY-MM-DD formatda)
         task_time: Task vaqti (HH:MM formatda)
+    
+    Returns:
+        int: Yangi task ID
     """
     # Sana va vaqtni birlashtirish
     task_datetime = f"{task_date} {task_time}"
     
-    async with aiosqlite.connect(DATABASE_NAME) as db:
-        await db.execute(
+    async def job(db: aiosqlite.Connection) -> int:
+        cursor = await db.execute(
             "INSERT INTO tasks (user_id, task_name, task_time, task_datetime, status) VALUES (?, ?, ?, ?, 'active')",
             (user_id, task_name, task_time, task_datetime)
         )
-        await db.commit()
-        logger.info(f"Yangi task qo'shildi: {task_name}, {task_datetime}")
+        await _bump_rollups(db, "tasks_created")
+        return cursor.lastrowid
+    
+    task_id = await get_writer().submit(job)
+    task_list_cache.invalidate(user_id)
+    logger.info(f"Yangi task qo'shildi: {task_name}, {task_datetime}")
+    return task_id
 
-async def get_task_by_id(task_id: int) -> Optional[Dict[str, Any]]:
-    """Task ID bo'yicha tasklarni olish"""
-    async with aiosqlite.connect(DATABASE_NAME) as db:
-        db.row_factory = aiosqlite.Row
+async def add_tasks(user_id: int, tasks: List[Tuple[str, str, str]]) -> int:
+    """
+    Bir nechta taskni bitta tranzaksiyada qo'shish
+    
+    Args:
+        user_id: Foydalanuvchi ID
+        tasks: (task nomi, sana YYYY-MM-DD, vaqt HH:MM) ro'yxati
+    
+    Returns:
+        int: Qo'shilgan tasklar soni
+    """
+    if not tasks:
+        return 0
+    
+    rows = [
+        (user_id, task_name, task_time, f"{task_date} {task_time}")
+        for task_name, task_date, task_time in tasks
+    ]
+    
+    async def job(db: aiosqlite.Connection) -> None:
+        await db.executemany(
+            "INSERT INTO tasks (user_id, task_name, task_time, task_datetime, status) VALUES (?, ?, ?, ?, 'active')",
+            rows
+        )
+        await _bump_rollups(db, "tasks_created", len(rows))
+    
+    await get_writer().submit(job)
+    task_list_cache.invalidate(user_id)
+    logger.info(f"User {user_id} uchun {len(rows)} ta task birdaniga qo'shildi")
+    return len(rows)
+
+async def import_tasks(user_id: int, rows: List[Tuple[str, str, str, str]]) -> int:
+    """
+    Import qilingan tasklarni bitta tranzaksiyada qo'shish
+    
+    Foydalanuvchida aynan shu nom, vaqt va statusli task (yoki arxivda shu
+    nom va vaqtli task) bo'lsa qator o'tkazib yuboriladi, shuning uchun bir
+    faylni qayta import qilish dublikat yaratmaydi.
+    
+    Args:
+        user_id: Foydalanuvchi ID
+        rows: (task nomi, vaqt HH:MM, sana va vaqt "YYYY-MM-DD HH:MM", status) ro'yxati
+    
+    Returns:
+        int: Haqiqatda qo'shilgan tasklar soni
+    """
+    if not rows:
+        return 0
+    
+    params = [
+        (user_id, task_name, task_time, task_datetime, status,
+         user_id, status, task_datetime, task_name,
+         user_id, task_datetime, task_name, status)
+        for task_name, task_time, task_datetime, status in rows
+    ]
+    
+    async def job(db: aiosqlite.Connection) -> int:
+        cursor = await db.executemany(
+            """
+            INSERT INTO tasks (user_id, task_name, task_time, task_datetime, status)
+            SELECT ?, ?, ?, ?, ?
+            WHERE NOT EXISTS (
+                SELECT 1 FROM tasks
+                WHERE user_id = ? AND status = ? AND task_datetime = ? AND task_name = ?
+            )
+            AND NOT EXISTS (
+                SELECT 1 FROM tasks_archive
+                WHERE user_id = ? AND task_datetime = ? AND task_name = ? AND ? = 'completed'
+            )
+            """,
+            params
+        )
+        inserted = cursor.rowcount
+        if inserted:
+            await _bump_rollups(db, "tasks_created", inserted)
+        return inserted
+    
+    inserted = await get_writer().submit(job)
+    if inserted:
+        task_list_cache.invalidate(user_id)
+    return inserted
+
+async def iter_user_tasks(user_id: int, batch_size: int = 500) -> AsyncIterator[Task]:
+    """
+    Foydalanuvchining barcha tasklarini (arxiv bilan) kursor orqali oqim sifatida o'qish
+    
+    Natija xotirada to'liq yig'ilmaydi: qatorlar batch_size tadan olinadi.
+    Avval tasks jadvali (status va vaqt bo'yicha), keyin arxiv o'qiladi.
+    
+    Args:
+        user_id: Foydalanuvchi ID
+        batch_size: Bir marta o'qiladigan qatorlar soni
+    """
+    queries = [
+        ("SELECT id, task_name, task_time, task_datetime, status FROM tasks "
+         "WHERE user_id = ? ORDER BY status, task_datetime"),
+        ("SELECT id, task_name, substr(task_datetime, 12, 5) AS task_time, task_datetime, "
+         "'completed' AS status FROM tasks_archive WHERE user_id = ? ORDER BY task_datetime"),
+    ]
+    async with connect(DATABASE_NAME) as db:
+        db.row_factory = task_row_factory
+        for sql in queries:
+            async with db.execute(sql, (user_id,)) as cursor:
+                while True:
+                    tasks = await cursor.fetchmany(batch_size)
+                    if not tasks:
+                        break
+                    for task in tasks:
+                        yield task
+
+async def get_task_by_id(task_id: int, columns: Tuple[str, ...] = TASK_FIELDS) -> Optional[Task]:
+    """
+    Task ID bo'yicha taskni olish
+    
+    Args:
+        task_id: Task ID
+        columns: O'qiladigan ustunlar (qolganlari None bo'ladi)
+    
+    Returns:
+        Optional[Task]: Task yoki None
+    """
+    async with connect(DATABASE_NAME) as db:
+        db.row_factory = task_row_factory
         async with db.execute(
-            "SELECT * FROM tasks WHERE id = ?",
+            f"SELECT {select_columns(*columns)} FROM tasks WHERE id = ?",
             (task_id,)
         ) as cursor:
-            row = await cursor.fetchone()
-            return dict(row) if row else None
+            return await cursor.fetchone()
 
-async def get_active_tasks(user_id: int) -> List[Dict[str, Any]]:
+async def get_active_tasks(user_id: int) -> List[Task]:
     """Foydalanuvchining barcha aktiv tasklarini olish"""
-    async with aiosqlite.connect(DATABASE_NAME) as db:
-        db.row_factory = aiosqlite.Row
+    async with connect(DATABASE_NAME) as db:
+        db.row_factory = task_row_factory
         async with db.execute(
-            "SELECT * FROM tasks WHERE user_id = ? AND status = 'active' ORDER BY task_datetime",
+            "SELECT id, task_name, task_time, task_datetime, status FROM tasks "
+            "WHERE user_id = ? AND status = 'active' ORDER BY task_datetime",
             (user_id,)
         ) as cursor:
-            return [dict(row) for row in await cursor.fetchall()]
+            return await cursor.fetchall()
 
-async def get_upcoming_tasks(user_id: int) -> List[Dict[str, Any]]:
+async def get_upcoming_tasks(user_id: int) -> List[Task]:
     """Foydalanuvchining kelayotgan (vaqti hali kelmagan) tasklarini olish"""
-    current_datetime = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-    async with aiosqlite.connect(DATABASE_NAME) as db:
-        db.row_factory = aiosqlite.Row
+    current_datetime = clock.now().strftime("%Y-%m-%d %H:%M")
+    async with connect(DATABASE_NAME) as db:
+        db.row_factory = task_row_factory
         async with db.execute(
             """
-            SELECT * FROM tasks 
+            SELECT id, task_name, task_time, task_datetime, status, recurrence FROM tasks 
             WHERE user_id = ? AND status = 'active' AND task_datetime > ? 
             ORDER BY task_datetime
             """,
             (user_id, current_datetime)
         ) as cursor:
-            return [dict(row) for row in await cursor.fetchall()]
+            return await cursor.fetchall()
 
-async def get_all_upcoming_tasks(user_id: int) -> List[Dict[str, Any]]:
+async def get_all_upcoming_tasks(user_id: int) -> List[Task]:
     """Foydalanuvchining kelayotgan barcha tasklarini olish (active va snoozed)"""
-    current_datetime = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-    async with aiosqlite.connect(DATABASE_NAME) as db:
-        db.row_factory = aiosqlite.Row
+    current_datetime = clock.now().strftime("%Y-%m-%d %H:%M")
+    async with connect(DATABASE_NAME) as db:
+        db.row_factory = task_row_factory
         async with db.execute(
             """
-            SELECT * FROM tasks 
+            SELECT id, task_name, task_time, task_datetime, status, recurrence FROM tasks 
             WHERE user_id = ? AND (status = 'active' OR status = 'snoozed') AND task_datetime > ? 
             ORDER BY task_datetime
             """,
             (user_id, current_datetime)
         ) as cursor:
-            tasks = await cursor.fetchall()
-            result = [dict(row) for row in tasks]
+            result = await cursor.fetchall()
             logger.info(f"User {user_id} uchun {len(result)} ta upcoming task topildi")
             return result
 
-async def get_due_tasks() -> List[Dict[str, Any]]:
+async def get_due_tasks() -> List[Task]:
     """Vaqti kelgan tasklarni olish"""
     # Hozirgi vaqt
-    now = datetime.datetime.now()
+    now = clock.now()
     current_datetime = now.strftime("%Y-%m-%d %H:%M")
     
     # Bir daqiqa oldingi vaqt
     one_minute_ago = now - datetime.timedelta(minutes=1)
     one_minute_ago_str = one_minute_ago.strftime("%Y-%m-%d %H:%M")
     
-    async with aiosqlite.connect(DATABASE_NAME) as db:
-        db.row_factory = aiosqlite.Row
+    async with connect(DATABASE_NAME) as db:
+        db.row_factory = task_row_factory
         async with db.execute(
             """
-            SELECT * FROM tasks 
+            SELECT id, user_id, task_name, task_datetime FROM tasks 
             WHERE status = 'active' 
             AND task_datetime >= ? 
             AND task_datetime <= ?
             """,
             (one_minute_ago_str, current_datetime)
         ) as cursor:
-            tasks = await cursor.fetchall()
-            result = [dict(row) for row in tasks]
+            result = await cursor.fetchall()
             
             # Agar vaqti kelgan tasklar topilsa log yozish
             if result:
-                task_ids = [t['id'] for t in result]
+                task_ids = [t.id for t in result]
                 logger.info(f"Vaqti kelgan tasklar topildi, IDs: {task_ids}")
             
             return result
 
 async def postpone_task(task_id: int, minutes: int = 5) -> None:
     """Taskni ma'lum vaqtga kechiktirish"""
-    # Avval task mavjudligini tekshirish
-    task = await get_task_by_id(task_id)
-    if not task:
-        logger.warning(f"Task ID {task_id} topilmadi, kechiktirishni o'tkazib yuborildi")
-        return
-    
-    logger.info(f"Task ID {task_id} {minutes} daqiqaga kechiktirilmoqda. Oldingi status: {task['status']}")
-    
-    async with aiosqlite.connect(DATABASE_NAME) as db:
-        try:
-            # Task datetimeni olish va yangi vaqtni hisoblash
-            task_datetime_str = task['task_datetime'] if 'task_datetime' in task else None
-            task_time_str = task['task_time'] if 'task_time' in task else None
-            
-            if task_datetime_str:
-                # task_datetime mavjud bo'lsa, undan foydalanish
-                task_dt = datetime.datetime.strptime(task_datetime_str, "%Y-%m-%d %H:%M")
-                new_dt = task_dt + datetime.timedelta(minutes=minutes)
-                new_datetime_str = new_dt.strftime("%Y-%m-%d %H:%M")
-                new_time_str = new_dt.strftime("%H:%M")
-            elif task_time_str:
-                # Faqat task_time mavjud bo'lsa
-                current_date = datetime.datetime.now().strftime("%Y-%m-%d")
-                task_datetime_str = f"{current_date} {task_time_str}"
-                task_dt = datetime.datetime.strptime(task_datetime_str, "%Y-%m-%d %H:%M")
-                new_dt = task_dt + datetime.timedelta(minutes=minutes)
-                new_datetime_str = new_dt.strftime("%Y-%m-%d %H:%M")
-                new_time_str = new_dt.strftime("%H:%M")
-            else:
-                # Ikkovi ham yo'q bo'lsa
-                logger.error(f"Task ID {task_id} vaqtni olishda xatolik - task_datetime va task_time yo'q")
-                return
-            
-            # Task vaqti va statusini yangilash
-            await db.execute(
-                "UPDATE tasks SET task_time = ?, task_datetime = ?, status = 'snoozed', is_completed = FALSE WHERE id = ?",
-                (new_time_str, new_datetime_str, task_id)
-            )
-            await db.commit()
-            
+    async def job(db: aiosqlite.Connection) -> Optional[Tuple[int, str]]:
+        # Task mavjudligini shu tranzaksiya ichida tekshirish
+        cursor = await db.execute(
+            "SELECT status, task_time, task_datetime, user_id FROM tasks WHERE id = ?",
+            (task_id,)
+        )
+        task = await cursor.fetchone()
+        if not task:
+            logger.warning(f"Task ID {task_id} topilmadi, kechiktirishni o'tkazib yuborildi")
+            return None
+        
+        status, task_time_str, task_datetime_str, user_id = task
+        logger.info(f"Task ID {task_id} {minutes} daqiqaga kechiktirilmoqda. Oldingi status: {status}")
+        
+        # Task datetimeni olish va yangi vaqtni hisoblash
+        if task_datetime_str:
+            # task_datetime mavjud bo'lsa, undan foydalanish
+            task_dt = datetime.datetime.strptime(task_datetime_str, "%Y-%m-%d %H:%M")
+        elif task_time_str:
+            # Faqat task_time mavjud bo'lsa
+            current_date = clock.now().strftime("%Y-%m-%d")
+            task_dt = datetime.datetime.strptime(f"{current_date} {task_time_str}", "%Y-%m-%d %H:%M")
+        else:
+            # Ikkovi ham yo'q bo'lsa
+            logger.error(f"Task ID {task_id} vaqtni olishda xatolik - task_datetime va task_time yo'q")
+            return None
+        
+        new_dt = task_dt + datetime.timedelta(minutes=minutes)
+        new_datetime_str = new_dt.strftime("%Y-%m-%d %H:%M")
+        new_time_str = new_dt.strftime("%H:%M")
+        
+        # Task vaqti va statusini yangilash
+        await db.execute(
+            "UPDATE tasks SET task_time = ?, task_datetime = ?, status = 'snoozed', is_completed = FALSE WHERE id = ?",
+            (new_time_str, new_datetime_str, task_id)
+        )
+        await _bump_rollups(db, "tasks_snoozed")
+        return user_id, new_datetime_str
+    
+    try:
+        result = await get_writer().submit(job)
+        if result:
+            user_id, new_datetime_str = result
+            task_list_cache.invalidate(user_id)
             logger.info(f"Task ID {task_id} muvaffaqiyatli kechiktirildi. Yangi vaqt: {new_datetime_str}")
-        except Exception as e:
-            logger.error(f"Task ID {task_id} kechiktirishda xatolik: {e}")
+    except Exception as e:
+        logger.error(f"Task ID {task_id} kechiktirishda xatolik: {e}")
 
-async def mark_task_completed(task_id: int) -> None:
-    """Taskni bajarilgan deb belgilash"""
-    # Avval task mavjudligini tekshirish
-    task = await get_task_by_id(task_id)
-    if not task:
-        logger.warning(f"Task ID {task_id} topilmadi, bajarilgan deb belgilashni o'tkazib yuborildi")
-        return
+async def mark_task_completed(task_id: int) -> Optional[str]:
+    """
+    Taskni bajarilgan deb belgilash
     
-    logger.info(f"Task ID {task_id} bajarilgan deb belgilanmoqda. Oldingi status: {task['status']}")
+    Takrorlanuvchi task yopilmaydi: o'sha qatorning o'zi keyingi takrorlanish
+    vaqtiga suriladi va yana 'active' bo'ladi.
     
-    async with aiosqlite.connect(DATABASE_NAME) as db:
+    Returns:
+        Optional[str]: Takrorlanuvchi task uchun keyingi vaqt ("YYYY-MM-DD HH:MM"), aks holda None
+    """
+    async def job(db: aiosqlite.Connection) -> Optional[Tuple[int, Optional[str]]]:
+        # Task mavjudligini shu tranzaksiya ichida tekshirish
+        cursor = await db.execute(
+            "SELECT status, user_id, task_datetime, recurrence FROM tasks WHERE id = ?", (task_id,)
+        )
+        task = await cursor.fetchone()
+        if not task:
+            logger.warning(f"Task ID {task_id} topilmadi, bajarilgan deb belgilashni o'tkazib yuborildi")
+            return None
+        
+        status, user_id, task_datetime_str, recurrence = task
+        logger.info(f"Task ID {task_id} bajarilgan deb belgilanmoqda. Oldingi status: {status}")
+        await _bump_rollups(db, "tasks_completed")
+        
+        if not recurrence:
+            await db.execute(
+                "UPDATE tasks SET status = 'completed', is_completed = TRUE WHERE id = ?",
+                (task_id,)
+            )
+            return user_id, None
+        
+        now = clock.now()
+        current = datetime.datetime.strptime(task_datetime_str, "%Y-%m-%d %H:%M")
+        # Keyingi takrorlanish allaqachon surilgan bo'lsa (eski eslatmadagi tugma) uni o'tkazib yubormaymiz
+        next_dt = current if current > now else next_occurrence(recurrence, current, now)
+        next_str = next_dt.strftime("%Y-%m-%d %H:%M")
         await db.execute(
-            "UPDATE tasks SET status = 'completed', is_completed = TRUE WHERE id = ?",
-            (task_id,)
+            "UPDATE tasks SET task_time = ?, task_datetime = ?, status = 'active', is_completed = FALSE WHERE id = ?",
+            (next_dt.strftime("%H:%M"), next_str, task_id)
         )
-        await db.commit()
+        return user_id, next_str
+    
+    result = await get_writer().submit(job)
+    if result is None:
+        return None
+    
+    user_id, next_str = result
+    task_list_cache.invalidate(user_id)
+    if next_str:
+        logger.info(f"Takrorlanuvchi task ID {task_id} bajarildi, keyingi vaqt: {next_str}")
+    else:
         logger.info(f"Task ID {task_id} muvaffaqiyatli bajarilgan deb belgilandi")
+    return next_str
+
+async def set_task_recurrence(task_id: int, user_id: int, kind: Optional[str],
+                              hours: Optional[int] = None) -> Optional[str]:
+    """
+    Taskning takrorlanish qoidasini o'rnatish yoki o'chirish
+    
+    Qoida taskning joriy vaqtidan olinadi (soat, hafta kuni, oy kuni).
+    
+    Args:
+        task_id: Task ID
+        user_id: Task egasi (boshqa foydalanuvchi taskini o'zgartirib bo'lmaydi)
+        kind: Takrorlanish turi (None - takrorlanishni o'chirish)
+        hours: "hours" turi uchun oraliq (soat)
+    
+    Returns:
+        Optional[str]: O'rnatilgan qoida, o'chirilganda "", task topilmasa None
+    """
+    async def job(db: aiosqlite.Connection) -> Optional[str]:
+        cursor = await db.execute(
+            "SELECT task_datetime FROM tasks WHERE id = ? AND user_id = ? AND status != 'completed'",
+            (task_id, user_id)
+        )
+        task = await cursor.fetchone()
+        if not task:
+            return None
+        
+        rule = make_rule(kind, datetime.datetime.strptime(task[0], "%Y-%m-%d %H:%M"), hours) if kind else None
+        await db.execute("UPDATE tasks SET recurrence = ? WHERE id = ?", (rule, task_id))
+        return rule or ""
+    
+    rule = await get_writer().submit(job)
+    if rule is not None:
+        task_list_cache.invalidate(user_id)
+        logger.info(f"Task ID {task_id} takrorlanish qoidasi: {rule or '-'}")
+    return rule
+
+async def stop_task_recurrence(task_id: int, user_id: int) -> bool:
+    """
+    Takrorlanishni o'chirish va taskni yopish
+    
+    Joriy takrorlanish mark_task_completed da allaqachon hisoblangan, shuning
+    uchun tasks_completed rollupi qayta oshirilmaydi - faqat status o'zgaradi.
+    
+    Args:
+        task_id: Task ID
+        user_id: Task egasi
+    
+    Returns:
+        bool: Task topilib yopilgan bo'lsa True
+    """
+    async def job(db: aiosqlite.Connection) -> bool:
+        cursor = await db.execute(
+            """
+            UPDATE tasks SET recurrence = NULL, status = 'completed', is_completed = TRUE
+            WHERE id = ? AND user_id = ? AND status != 'completed'
+            """,
+            (task_id, user_id)
+        )
+        return cursor.rowcount > 0
+    
+    stopped = await get_writer().submit(job)
+    if stopped:
+        task_list_cache.invalidate(user_id)
+        logger.info(f"Task ID {task_id} takrorlanishi to'xtatildi va yopildi")
+    return stopped
 
 async def reactivate_snoozed_tasks() -> None:
     """Kechiktirilgan tasklarni faollashtirish, agar ular vaqti kelgan bo'lsa"""
-    current_datetime = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+    current_datetime = clock.now().strftime("%Y-%m-%d %H:%M")
     
-    async with aiosqlite.connect(DATABASE_NAME) as db:
-        # Kechiktirilgan tasklarni olish
-        db.row_factory = aiosqlite.Row
-        async with db.execute(
-            "SELECT id, task_datetime FROM tasks WHERE status = 'snoozed'"
-        ) as cursor:
-            tasks = await cursor.fetchall()
-            # sqlite3.Row ni dict ga konvert qilish
-            tasks = [dict(row) for row in tasks]
+    async def job(db: aiosqlite.Connection) -> List[Tuple[int, int]]:
+        # Vaqti kelgan yoki o'tib ketgan kechiktirilgan tasklar
+        cursor = await db.execute(
+            "SELECT id, user_id FROM tasks WHERE status = 'snoozed' AND task_datetime <= ?",
+            (current_datetime,)
+        )
+        tasks = await cursor.fetchall()
         
+        # Hammasini bitta UPDATE bilan 'active' holatiga o'tkazish
         if tasks:
-            task_ids = [t['id'] for t in tasks]
-            logger.debug(f"Kechiktirilgan tasklar tekshirilmoqda: {task_ids}")
-            
-        for task in tasks:
-            task_id = task['id']
-            # get() o'rniga to'g'ridan-to'g'ri indeks bilan olish
-            task_datetime = task.get('task_datetime')
-            
-            if not task_datetime:
-                logger.warning(f"Task ID {task_id} uchun task_datetime mavjud emas")
-                continue
-            
-            try:
-                # Task vaqtini datetime obyektiga aylantirish
-                task_dt = datetime.datetime.strptime(task_datetime, "%Y-%m-%d %H:%M")
-                current_dt = datetime.datetime.now()
-                
-                # Vaqtni tekshirish - agar taskning vaqti kelgan bo'lsa yoki o'tib ketgan bo'lsa
-                if current_dt >= task_dt:
-                    logger.info(f"Task ID {task_id} vaqti keldi, 'active' holatiga o'tkazilmoqda")
-                    await db.execute(
-                        "UPDATE tasks SET status = 'active' WHERE id = ?",
-                        (task_id,)
-                    )
-                    await db.commit()
-            except Exception as e:
-                # Vaqtni konvert qilishda xatolik
-                logger.error(f"Task ID {task_id} vaqtini konvert qilishda xatolik: {e}")
-                pass
-
-async def delete_completed_tasks() -> int:
-    """
-    Bajarilgan (completed) tasklarni ma'lumotlar bazasidan o'chiradi
+            await db.execute(
+                "UPDATE tasks SET status = 'active' WHERE status = 'snoozed' AND task_datetime <= ?",
+                (current_datetime,)
+            )
+        return tasks
+    
+    tasks = await get_writer().submit(job)
+    for user_id in {user_id for _, user_id in tasks}:
+        task_list_cache.invalidate(user_id)
+    
+    task_ids = [task_id for task_id, _ in tasks]
+    if task_ids:
+        logger.info(f"Vaqti kelgan kechiktirilgan tasklar 'active' holatiga o'tkazildi: {task_ids}")
+
+async def rollover_recurring_tasks(grace_minutes: int = 10) -> int:
+    """
+    Vaqti o'tib ketgan, lekin bajarilmagan takrorlanuvchi tasklarni keyingi takrorlanishga surish
+    
+    Eslatma yuborilgandan keyin grace_minutes ichida javob bo'lmasa (yoki bot
+    o'chiq turgan bo'lsa) task o'tmishda qolib ketmasligi uchun. O'tkazib
+    yuborilgan takrorlanishlar uchun qator yaratilmaydi.
+    
+    Args:
+        grace_minutes: Eslatmadan keyin javob kutiladigan vaqt (daqiqa)
     
     Returns:
-        int: O'chirilgan tasklar soni
+        int: Surilgan tasklar soni
     """
-    async with aiosqlite.connect(DATABASE_NAME) as db:
+    now = clock.now()
+    cutoff = (now - datetime.timedelta(minutes=grace_minutes)).strftime("%Y-%m-%d %H:%M")
+    
+    async def job(db: aiosqlite.Connection) -> List[int]:
+        # idx_tasks_recurring qisman indeksi bo'yicha: faqat takrorlanuvchi aktiv tasklar o'qiladi
         cursor = await db.execute(
-            "DELETE FROM tasks WHERE status = 'completed'"
+            "SELECT id, user_id, task_datetime, recurrence FROM tasks INDEXED BY idx_tasks_recurring "
+            "WHERE recurrence IS NOT NULL AND status = 'active' AND task_datetime < ?",
+            (cutoff,)
+        )
+        updates = []
+        user_ids = []
+        for task_id, user_id, task_datetime_str, recurrence in await cursor.fetchall():
+            current = datetime.datetime.strptime(task_datetime_str, "%Y-%m-%d %H:%M")
+            next_dt = next_occurrence(recurrence, current, now)
+            updates.append((next_dt.strftime("%H:%M"), next_dt.strftime("%Y-%m-%d %H:%M"), task_id))
+            user_ids.append(user_id)
+        
+        if updates:
+            await db.executemany("UPDATE tasks SET task_time = ?, task_datetime = ? WHERE id = ?", updates)
+        return user_ids
+    
+    user_ids = await get_writer().submit(job)
+    for user_id in set(user_ids):
+        task_list_cache.invalidate(user_id)
+    
+    if user_ids:
+        logger.info(f"{len(user_ids)} ta takrorlanuvchi task keyingi takrorlanishga surildi")
+    return len(user_ids)
+
+async def delete_completed_tasks(user_id: int, chunk_size: int = 500) -> int:
+    """
+    Foydalanuvchining bajarilgan (completed) tasklarini, arxivdagilari bilan
+    birga, ma'lumotlar bazasidan o'chiradi
+    
+    O'chirish (user_id, status) indeksi orqali kichik bo'laklarda bajariladi,
+    boshqa foydalanuvchilarning ma'lumotlariga tegmaydi.
+    
+    Args:
+        user_id: Foydalanuvchi ID
+        chunk_size: Bitta tranzaksiyada o'chiriladigan tasklar soni
+    
+    Returns:
+        int: O'chirilgan tasklar soni
+    """
+    async def delete_chunk(sql: str) -> int:
+        async def job(db: aiosqlite.Connection) -> int:
+            cursor = await db.execute(sql, (user_id, chunk_size))
+            return cursor.rowcount
+        return await get_writer().submit(job)
+    
+    deleted_count = 0
+    for sql in (
+        "DELETE FROM tasks WHERE id IN "
+        "(SELECT id FROM tasks WHERE user_id = ? AND status = 'completed' LIMIT ?)",
+        "DELETE FROM tasks_archive WHERE id IN "
+        "(SELECT id FROM tasks_archive WHERE user_id = ? LIMIT ?)",
+    ):
+        while True:
+            deleted = await delete_chunk(sql)
+            deleted_count += deleted
+            if deleted < chunk_size:
+                break
+    
+    task_list_cache.invalidate(user_id)
+    if deleted_count > 0:
+        logger.info(f"User {user_id} uchun {deleted_count} ta bajarilgan task o'chirildi")
+    
+    return deleted_count
+
+async def create_archive_table():
+    """Bajarilgan tasklar arxivi jadvalini yaratish"""
+    async with connect(DATABASE_NAME) as db:
+        # Ixcham arxiv: faqat tarix uchun kerakli ustunlar, month - oy bo'yicha bo'lak
+        await db.execute("""
+        CREATE TABLE IF NOT EXISTS tasks_archive (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            month TEXT NOT NULL,
+            task_name TEXT NOT NULL,
+            task_datetime TEXT,
+            created_at TIMESTAMP,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_archive_user ON tasks_archive (user_id, task_datetime)"
+        )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_archive_month ON tasks_archive (month)"
         )
-        deleted_count = cursor.rowcount
         await db.commit()
+
+async def archive_completed_tasks_chunk(cutoff_datetime: str, chunk_size: int = 500) -> int:
+    """
+    Eski bajarilgan tasklarning bitta bo'lagini arxivga ko'chirish
+    
+    Args:
+        cutoff_datetime: Shu vaqtdan oldingi tasklar ko'chiriladi ("YYYY-MM-DD HH:MM")
+        chunk_size: Bitta tranzaksiyada ko'chiriladigan tasklar soni
         
-        if deleted_count > 0:
-            logger.info(f"{deleted_count} ta bajarilgan task o'chirildi")
+    Returns:
+        int: Ko'chirilgan tasklar soni
+    """
+    async def job(db: aiosqlite.Connection) -> int:
+        cursor = await db.execute(
+            """
+            SELECT id FROM tasks
+            WHERE status = 'completed' AND task_datetime < ?
+            ORDER BY task_datetime
+            LIMIT ?
+            """,
+            (cutoff_datetime, chunk_size)
+        )
+        task_ids = [row[0] for row in await cursor.fetchall()]
+        if not task_ids:
+            return 0
         
-        return deleted_count
+        placeholders = ", ".join("?" for _ in task_ids)
+        await db.execute(
+            f"""
+            INSERT OR IGNORE INTO tasks_archive (id, user_id, month, task_name, task_datetime, created_at)
+            SELECT id, user_id, substr(task_datetime, 1, 7), task_name, task_datetime, created_at
+            FROM tasks WHERE id IN ({placeholders})
+            """,
+            task_ids
+        )
+        await db.execute(f"DELETE FROM tasks WHERE id IN ({placeholders})", task_ids)
+        return len(task_ids)
+    
+    return await get_writer().submit(job)
 
-async def clean_old_completed_tasks(days: int = 3) -> int:
+async def clean_old_completed_tasks(days: int = 3, chunk_size: int = 500,
+                                    time_budget: float = 0.05, pause: float = 0.1) -> int:
     """
-    Ma'lum kundan oldin bajarilgan tasklarni o'chiradi
+    Ma'lum kundan oldin bajarilgan tasklarni kichik bo'laklarda arxivga ko'chiradi
+    
+    Har bir bo'lak alohida tranzaksiya bo'lib, yozish qulfi qisqa vaqt ushlanadi.
+    Bo'lak vaqt byudjetidan oshsa, keyingi bo'lak kichraytiriladi.
     
     Args:
-        days: Necha kundan oldingi bajarilgan tasklarni o'chirish (default: 3)
+        days: Necha kundan oldingi bajarilgan tasklarni ko'chirish (default: 3)
+        chunk_size: Boshlang'ich bo'lak hajmi
+        time_budget: Bitta bo'lak uchun vaqt byudjeti (sekund)
+        pause: Bo'laklar orasidagi tanaffus (sekund)
         
     Returns:
-        int: O'chirilgan tasklar soni
+        int: Arxivga ko'chirilgan tasklar soni
     """
-    # Xozirgi vaqtdan N kun oldingi sanani hisoblash
-    cutoff_date = (datetime.datetime.now() - datetime.timedelta(days=days)).strftime("%Y-%m-%d")
+    # N kun oldingi sananing oxirigacha bo'lgan tasklar (shu kun ham kiradi)
+    cutoff_date = (clock.now() - datetime.timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    cutoff_datetime = f"{cutoff_date} 00:00"
+    max_chunk = chunk_size
+    archived_count = 0
     
-    async with aiosqlite.connect(DATABASE_NAME) as db:
-        cursor = await db.execute(
+    while True:
+        # Haqiqiy vaqt (utils.clock emas): byudjet SQL ishining davomiyligi uchun,
+        # tanaffus esa shu zahoti kutayotgan yozuvchilarga navbat berish uchun
+        started = asyncio.get_running_loop().time()
+        moved = await archive_completed_tasks_chunk(cutoff_datetime, chunk_size)
+        elapsed = asyncio.get_running_loop().time() - started
+        archived_count += moved
+        
+        if moved < chunk_size:
+            break
+        
+        # Bo'lak hajmini vaqt byudjetiga moslashtirish
+        if elapsed > time_budget:
+            chunk_size = max(50, chunk_size // 2)
+        elif elapsed < time_budget / 2:
+            chunk_size = min(max_chunk, chunk_size * 2)
+        
+        # Boshqa yozuvchilarga (eslatmalar, tugmalar) navbat berish
+        await asyncio.sleep(pause)
+    
+    if archived_count > 0:
+        logger.info(f"{archived_count} ta eski bajarilgan task ({days} kundan oldingi) arxivga ko'chirildi")
+    
+    return archived_count
+
+async def get_completed_tasks(user_id: int) -> List[Task]:
+    """Foydalanuvchining bajarilgan tasklari, arxivdagilari bilan birga (yangidan eskiga)"""
+    async with connect(DATABASE_NAME) as db:
+        db.row_factory = task_row_factory
+        async with db.execute(
             """
-            DELETE FROM tasks 
-            WHERE status = 'completed' 
-            AND substr(task_datetime, 1, 10) <= ?
+            SELECT id, user_id, task_name, task_datetime FROM tasks
+            WHERE user_id = ? AND status = 'completed'
+            UNION ALL
+            SELECT id, user_id, task_name, task_datetime FROM tasks_archive
+            WHERE user_id = ?
+            ORDER BY task_datetime DESC
             """,
-            (cutoff_date,)
+            (user_id, user_id)
+        ) as cursor:
+            return await cursor.fetchall()
+
+async def _fetch_keyset_page(
+    sources: List[Tuple[str, tuple]],
+    descending: bool,
+    cursor: Optional[PageCursor],
+    backward: bool,
+    limit: int
+) -> Tuple[List[Task], bool, bool]:
+    """
+    (task_datetime, id) bo'yicha keyset sahifalash
+    
+    Har bir manba (FROM ... WHERE ...) o'z indeksi bo'yicha tartiblangan holda
+    LIMIT bilan o'qiladi va natijalar UNION ALL orqali birlashtiriladi, shuning
+    uchun sahifa narxi foydalanuvchi tasklari soniga bog'liq emas.
+    
+    Args:
+        sources: (FROM va WHERE qismi, parametrlar) ro'yxati
+        descending: Ro'yxat yangidan eskiga tartiblanganmi
+        cursor: Oldingi sahifaning chegaraviy taski (None - birinchi sahifa)
+        backward: Oldingi sahifaga qaytishmi
+        limit: Sahifadagi tasklar soni
+    
+    Returns:
+        Tuple: (tasklar, oldingi sahifa bormi, keyingi sahifa bormi)
+    """
+    # Qidiruv yo'nalishi: ro'yxat tartibi va orqaga/oldinga yurishdan kelib chiqadi
+    scan_desc = descending != backward
+    op = "<" if scan_desc else ">"
+    order = "DESC" if scan_desc else "ASC"
+    first_page = cursor is None
+    if cursor is None:
+        cursor = ("9999", 0) if scan_desc else ("", 0)
+    
+    parts = []
+    params: list = []
+    for source, source_params in sources:
+        parts.append(
+            f"SELECT * FROM (SELECT id, task_name, task_time, task_datetime, status, recurrence {source} "
+            f"AND (task_datetime, id) {op} (?, ?) "
+            f"ORDER BY task_datetime {order}, id {order} LIMIT ?)"
         )
-        deleted_count = cursor.rowcount
-        await db.commit()
+        params += [*source_params, cursor[0], cursor[1], limit + 1]
+    sql = " UNION ALL ".join(parts) + f" ORDER BY task_datetime {order}, id {order} LIMIT ?"
+    params.append(limit + 1)
+    
+    async with connect(DATABASE_NAME) as db:
+        db.row_factory = task_row_factory
+        async with db.execute(sql, params) as db_cursor:
+            rows = await db_cursor.fetchall()
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backward:
+        rows.reverse()
+        return rows, has_more, True
+    return rows, not first_page, has_more
+
+async def get_upcoming_tasks_page(user_id: int, cursor: Optional[PageCursor] = None,
+                                  backward: bool = False, limit: int = PAGE_SIZE
+                                  ) -> Tuple[List[Task], bool, bool]:
+    """Foydalanuvchining kelayotgan tasklari (active va snoozed) bitta sahifasi"""
+    current_datetime = clock.now().strftime("%Y-%m-%d %H:%M")
+    sources = [
+        (f"FROM tasks WHERE user_id = ? AND status = '{status}' AND task_datetime > ?",
+         (user_id, current_datetime))
+        for status in ("active", "snoozed")
+    ]
+    return await _fetch_keyset_page(sources, False, cursor, backward, limit)
+
+async def get_completed_tasks_page(user_id: int, cursor: Optional[PageCursor] = None,
+                                   backward: bool = False, limit: int = PAGE_SIZE
+                                   ) -> Tuple[List[Task], bool, bool]:
+    """Foydalanuvchining bajarilgan tasklari (arxiv bilan) bitta sahifasi, yangidan eskiga"""
+    sources = [
+        ("FROM tasks WHERE user_id = ? AND status = 'completed'", (user_id,)),
+        ("FROM (SELECT id, user_id, task_name, NULL AS task_time, task_datetime, "
+         "'completed' AS status, NULL AS recurrence FROM tasks_archive) WHERE user_id = ?", (user_id,)),
+    ]
+    return await _fetch_keyset_page(sources, True, cursor, backward, limit)
+
+# --- Qidiruv ---
+
+# Qidiruv so'rovidagi so'zlar soni chegarasi
+MAX_SEARCH_TERMS = 8
+
+async def create_search_index():
+    """
+    Task nomlari bo'yicha FTS5 qidiruv indeksi va uni sinxronlovchi triggerlarni yaratish
+    
+    Jadval "contentless": matn tasks (yoki tasks_archive) jadvalida qoladi,
+    indeksda faqat so'zlar saqlanadi. owner ustuni ("u<user_id>" tokeni) bitta
+    foydalanuvchi natijalarini indeks ichida ajratib olish uchun kerak.
+    
+    Arxivga ko'chirilgan task indeksda qoladi (id lar AUTOINCREMENT, shuning
+    uchun tasks va tasks_archive da takrorlanmaydi): tasks dan o'chirishda
+    yozuv faqat task arxivda bo'lmasa olib tashlanadi, arxivdan o'chirishda esa
+    alohida trigger ishlaydi.
+    """
+    async with connect(DATABASE_NAME) as db:
+        cursor = await db.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='tasks_fts'")
+        index_exists = await cursor.fetchone()
+        cursor = await db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='trigger' AND name='tasks_archive_fts_delete'"
+        )
+        archive_indexed = await cursor.fetchone()
+        if index_exists and not archive_indexed:
+            # Eski trigger arxivga ko'chirilgan tasklarni ham indeksdan o'chirardi
+            await db.execute("DROP TRIGGER IF EXISTS tasks_fts_delete")
         
-        if deleted_count > 0:
-            logger.info(f"{deleted_count} ta eski bajarilgan task ({days} kundan oldingi) o'chirildi")
+        await db.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            task_name, owner, content='', prefix='2 3 4 5 6',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """)
+        await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks
+        BEGIN
+            INSERT INTO tasks_fts (rowid, task_name, owner) VALUES (NEW.id, NEW.task_name, 'u' || NEW.user_id);
+        END
+        """)
+        await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks
+        WHEN NOT EXISTS (SELECT 1 FROM tasks_archive WHERE id = OLD.id)
+        BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, task_name, owner)
+            VALUES ('delete', OLD.id, OLD.task_name, 'u' || OLD.user_id);
+        END
+        """)
+        await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF task_name, user_id ON tasks
+        BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, task_name, owner)
+            VALUES ('delete', OLD.id, OLD.task_name, 'u' || OLD.user_id);
+            INSERT INTO tasks_fts (rowid, task_name, owner) VALUES (NEW.id, NEW.task_name, 'u' || NEW.user_id);
+        END
+        """)
+        await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_archive_fts_delete AFTER DELETE ON tasks_archive
+        BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, task_name, owner)
+            VALUES ('delete', OLD.id, OLD.task_name, 'u' || OLD.user_id);
+        END
+        """)
         
-        return deleted_count
+        if not index_exists:
+            # Mavjud tasklarni indeksga bir marta yozish
+            await db.execute(
+                "INSERT INTO tasks_fts (rowid, task_name, owner) SELECT id, task_name, 'u' || user_id FROM tasks"
+            )
+            logger.info("Tasklar uchun qidiruv indeksi yaratildi")
+        if not archive_indexed:
+            # Avval arxivga ko'chirilib, indeksdan tushib qolgan tasklar
+            await db.execute(
+                "INSERT INTO tasks_fts (rowid, task_name, owner) "
+                "SELECT id, task_name, 'u' || user_id FROM tasks_archive"
+            )
+        await db.commit()
+
+def build_match_query(text: str, user_id: Optional[int] = None) -> Optional[str]:
+    """
+    Foydalanuvchi matnidan xavfsiz FTS5 MATCH ifodasini yasash
+    
+    Har bir so'z qo'shtirnoq ichiga olinadi (FTS5 operatorlari ishlamaydi).
+    Faqat oxirgi (hali yozilayotgan) so'z prefiks sifatida qidiriladi, shuning
+    uchun "non ol" "Non olish" ni topadi. Prefiks uzunligi 2-6 bo'lsa FTS5 tayyor
+    prefiks indeksidan foydalanadi; bitta harfli prefiks esa deyarli barcha
+    so'zlarni birlashtirishni talab qilgani uchun aniq so'z sifatida qidiriladi.
+    
+    Args:
+        text: Qidiruv matni
+        user_id: Faqat shu foydalanuvchi tasklari (None bo'lsa hammasi)
+    
+    Returns:
+        Optional[str]: MATCH ifodasi yoki so'z bo'lmasa None
+    """
+    terms = re.findall(r"\w+", text.lower())[:MAX_SEARCH_TERMS]
+    if not terms:
+        return None
+    
+    phrases = [f'"{term}"' for term in terms]
+    if len(terms[-1]) > 1:
+        phrases[-1] += "*"
+    match = "task_name : (" + " AND ".join(phrases) + ")"
+    if user_id is not None:
+        match = f'owner : "u{user_id}" AND {match}'
+    return match
+
+async def search_tasks(text: str, user_id: Optional[int] = None, limit: int = PAGE_SIZE,
+                       offset: int = 0) -> List[Task]:
+    """
+    Task nomlari bo'yicha to'liq matnli qidiruv (eng yangi tasklar birinchi)
+    
+    Arxivdagi bajarilgan tasklar ham topiladi.
+    
+    Natijalar bm25 bo'yicha emas, rowid bo'yicha tartiblanadi: FTS5 ularni
+    tartiblamasdan indeks tartibida qaytaradi va LIMIT ga yetganda to'xtaydi,
+    shuning uchun ko'p uchraydigan so'zlar ham barcha mosliklarni baholashni talab qilmaydi.
+    
+    Args:
+        text: Qidiruv matni
+        user_id: Faqat shu foydalanuvchi tasklari (None - admin uchun barcha tasklar)
+        limit: Natijalar soni
+        offset: Nechta natija o'tkazib yuboriladi (sahifalash uchun)
+    
+    Returns:
+        List[Task]: Topilgan tasklar
+    """
+    match = build_match_query(text, user_id)
+    if match is None:
+        return []
+    
+    # Har bir tugma bosishda chaqiriladi (inline qidiruv) - o'qish havzasidan
+    async with get_read_pool().acquire() as db:
+        async with db.execute(
+            """
+            SELECT f.rowid AS id, COALESCE(t.user_id, a.user_id) AS user_id,
+                   COALESCE(t.task_name, a.task_name) AS task_name,
+                   COALESCE(t.task_time, substr(a.task_datetime, 12, 5)) AS task_time,
+                   COALESCE(t.task_datetime, a.task_datetime) AS task_datetime,
+                   COALESCE(t.status, 'completed') AS status, t.recurrence
+            FROM tasks_fts f
+            LEFT JOIN tasks t ON t.id = f.rowid
+            LEFT JOIN tasks_archive a ON a.id = f.rowid
+            WHERE tasks_fts MATCH ? AND (t.id IS NOT NULL OR a.id IS NOT NULL)
+            ORDER BY f.rowid DESC
+            LIMIT ? OFFSET ?
+            """,
+            (match, limit, offset)
+        ) as cursor:
+            # Havzadagi ulanish umumiy - row factory faqat shu kursor uchun
+            cursor.row_factory = task_row_factory
+            return await cursor.fetchall()
 
 # --- Admin panel uchun funksiyalar ---
 
 async def create_users_table():
     """Foydalanuvchilar jadvalini yaratish"""
-    async with aiosqlite.connect(DATABASE_NAME) as db:
+    async with connect(DATABASE_NAME) as db:
         # Avval users jadvalining mavjudligini tekshirish
         cursor = await db.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
         table_exists = await cursor.fetchone()
@@ -326,15 +1005,29 @@ async def create_users_table():
                 full_name TEXT,
                 username TEXT,
                 join_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_active BOOLEAN DEFAULT TRUE
+                is_active BOOLEAN DEFAULT TRUE,
+                digest_enabled BOOLEAN DEFAULT FALSE
             )
             """)
-            await db.commit()
             logger.info("Users jadvali yaratildi")
+        else:
+            # Eski jadvalga ertalabki jamlanma ustunini qo'shish
+            cursor = await db.execute("PRAGMA table_info(users)")
+            columns = [column[1] for column in await cursor.fetchall()]
+            if "digest_enabled" not in columns:
+                await db.execute("ALTER TABLE users ADD COLUMN digest_enabled BOOLEAN DEFAULT FALSE")
+                logger.info("Users jadvaliga digest_enabled ustuni qo'shildi")
+        
+        # Jamlanmaga obuna bo'lganlar odatda kam: faqat ularni indekslash
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_users_digest ON users (user_id) "
+            "WHERE digest_enabled AND is_active"
+        )
+        await db.commit()
 
 async def create_config_table():
     """Konfiguratsiya jadvalini yaratish"""
-    async with aiosqlite.connect(DATABASE_NAME) as db:
+    async with connect(DATABASE_NAME) as db:
         # Avval config jadvalining mavjudligini tekshirish
         cursor = await db.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='config'")
         table_exists = await cursor.fetchone()
@@ -351,9 +1044,25 @@ async def create_config_table():
             await db.commit()
             logger.info("Config jadvali yaratildi")
 
+# Kanal holati ustunlari (eski jadvallarni yangilash uchun)
+CHANNEL_HEALTH_COLUMNS = (
+    ("fail_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("last_error", "TEXT"),
+    ("retry_after", "TEXT"),
+    ("suspended", "BOOLEAN NOT NULL DEFAULT FALSE"),
+    ("last_success", "TEXT"),
+)
+
+# Ketma-ket shuncha doimiy xatodan keyin kanal to'xtatiladi
+CHANNEL_SUSPEND_AFTER = 3
+
+# Xatodan keyingi kutish: 1 daq, 2, 4, ... eng ko'pi 6 soat
+CHANNEL_BACKOFF_BASE = 60
+CHANNEL_BACKOFF_MAX = 6 * 3600
+
 async def create_post_channels_table():
     """Post kanallar jadvalini yaratish"""
-    async with aiosqlite.connect(DATABASE_NAME) as db:
+    async with connect(DATABASE_NAME) as db:
         # Avval jadvalning mavjudligini tekshirish
         cursor = await db.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='post_channels'")
         table_exists = await cursor.fetchone()
@@ -365,11 +1074,220 @@ async def create_post_channels_table():
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 channel_id TEXT UNIQUE,
                 channel_name TEXT,
-                added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                fail_count INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                retry_after TEXT,
+                suspended BOOLEAN NOT NULL DEFAULT FALSE,
+                last_success TEXT
             )
             """)
             await db.commit()
             logger.info("Post kanallar jadvali yaratildi")
+        else:
+            # Eski jadvalga kanal holati ustunlarini qo'shish
+            cursor = await db.execute("PRAGMA table_info(post_channels)")
+            columns = [column[1] for column in await cursor.fetchall()]
+            for column, definition in CHANNEL_HEALTH_COLUMNS:
+                if column not in columns:
+                    await db.execute(f"ALTER TABLE post_channels ADD COLUMN {column} {definition}")
+                    logger.info(f"post_channels jadvaliga {column} ustuni qo'shildi")
+            await db.commit()
+
+# Admin statistikasi uchun hisoblagichlar (triggerlar orqali aniq saqlanadi)
+STATS_COUNTERS = ("users_active", "tasks_total", "tasks_active", "tasks_snoozed", "tasks_completed")
+
+async def create_stats_counters_table():
+    """Statistika hisoblagichlari jadvali va uni yangilovchi triggerlarni yaratish"""
+    async with connect(DATABASE_NAME) as db:
+        await db.execute("""
+        CREATE TABLE IF NOT EXISTS stats_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        """)
+        
+        # tasks: jami va har bir status bo'yicha
+        await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_counters_insert AFTER INSERT ON tasks
+        BEGIN
+            UPDATE stats_counters SET value = value + 1
+            WHERE name IN ('tasks_total', 'tasks_' || NEW.status);
+        END
+        """)
+        await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_counters_delete AFTER DELETE ON tasks
+        BEGIN
+            UPDATE stats_counters SET value = value - 1
+            WHERE name IN ('tasks_total', 'tasks_' || OLD.status);
+        END
+        """)
+        await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_counters_update AFTER UPDATE OF status ON tasks
+        WHEN OLD.status IS NOT NEW.status
+        BEGIN
+            UPDATE stats_counters SET value = value - 1 WHERE name = 'tasks_' || OLD.status;
+            UPDATE stats_counters SET value = value + 1 WHERE name = 'tasks_' || NEW.status;
+        END
+        """)
+        
+        # users: faqat aktiv foydalanuvchilar
+        await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS users_counters_insert AFTER INSERT ON users
+        WHEN NEW.is_active
+        BEGIN
+            UPDATE stats_counters SET value = value + 1 WHERE name = 'users_active';
+        END
+        """)
+        await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS users_counters_delete AFTER DELETE ON users
+        WHEN OLD.is_active
+        BEGIN
+            UPDATE stats_counters SET value = value - 1 WHERE name = 'users_active';
+        END
+        """)
+        await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS users_counters_update AFTER UPDATE OF is_active ON users
+        WHEN OLD.is_active IS NOT NEW.is_active
+        BEGIN
+            UPDATE stats_counters SET value = value + (CASE WHEN NEW.is_active THEN 1 ELSE -1 END)
+            WHERE name = 'users_active';
+        END
+        """)
+        await db.commit()
+    
+    # Boshlang'ich qiymatlarni haqiqiy jadvallardan olish
+    await reconcile_stats_counters()
+
+async def reconcile_stats_counters() -> Dict[str, int]:
+    """
+    Hisoblagichlarni haqiqiy jadvallar bilan solishtirish va tuzatish
+    
+    Hisoblash yozuvchi tranzaksiyasi ichida bajariladi, shuning uchun
+    bir vaqtda kelgan yozuvlar natijani buzmaydi.
+    
+    Returns:
+        Dict[str, int]: Tuzatilgan hisoblagichlar va ularning farqi
+    """
+    async def job(db: aiosqlite.Connection) -> Dict[str, int]:
+        cursor = await db.execute(
+            """
+            SELECT
+                (SELECT COUNT(*) FROM users WHERE is_active = TRUE),
+                (SELECT COUNT(*) FROM tasks),
+                (SELECT COUNT(*) FROM tasks WHERE status = 'active'),
+                (SELECT COUNT(*) FROM tasks WHERE status = 'snoozed'),
+                (SELECT COUNT(*) FROM tasks WHERE status = 'completed')
+            """
+        )
+        actual = dict(zip(STATS_COUNTERS, await cursor.fetchone()))
+        
+        cursor = await db.execute("SELECT name, value FROM stats_counters")
+        stored = {name: value for name, value in await cursor.fetchall()}
+        
+        drift = {}
+        for name, value in actual.items():
+            if stored.get(name) != value:
+                # Yangi hisoblagich shunchaki to'ldiriladi, mavjudining farqi qayd etiladi
+                if name in stored:
+                    drift[name] = value - stored[name]
+                await db.execute(
+                    "INSERT INTO stats_counters (name, value) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+                    (name, value)
+                )
+        return drift
+    
+    drift = await get_writer().submit(job)
+    if drift:
+        logger.warning(f"Statistika hisoblagichlari tuzatildi: {drift}")
+    return drift
+
+# Vaqt bo'yicha yig'indilar (rollup) uchun metrikalar
+ROLLUP_METRICS = ("tasks_created", "tasks_completed", "tasks_snoozed", "reminders_sent", "new_users")
+
+async def create_rollup_tables():
+    """Soatlik va kunlik yig'indilar jadvallarini yaratish"""
+    async with connect(DATABASE_NAME) as db:
+        # bucket: soatlik uchun 'YYYY-MM-DD HH', kunlik uchun 'YYYY-MM-DD'
+        for table in ("stats_hourly", "stats_daily"):
+            await db.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                metric TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                value INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (metric, bucket)
+            ) WITHOUT ROWID
+            """)
+        await db.commit()
+
+async def _bump_rollups(db: aiosqlite.Connection, metric: str, amount: int = 1) -> None:
+    """
+    Hodisani soatlik va kunlik yig'indilarga qo'shish
+    
+    Yozuvchi tranzaksiyasi ichida chaqiriladi, shuning uchun hodisa bilan
+    birga atomik tarzda commit qilinadi.
+    """
+    now = clock.now()
+    for table, bucket in (
+        ("stats_hourly", now.strftime("%Y-%m-%d %H")),
+        ("stats_daily", now.strftime("%Y-%m-%d")),
+    ):
+        await db.execute(
+            f"INSERT INTO {table} (metric, bucket, value) VALUES (?, ?, ?) "
+            "ON CONFLICT(metric, bucket) DO UPDATE SET value = value + excluded.value",
+            (metric, bucket, amount)
+        )
+
+async def record_reminder_sent() -> None:
+    """Yuborilgan eslatmani yig'indilarga qo'shish"""
+    async def job(db: aiosqlite.Connection) -> None:
+        await _bump_rollups(db, "reminders_sent")
+    
+    await get_writer().submit(job)
+
+async def get_rollups(period: str = "day", count: int = 14) -> Dict[str, List[int]]:
+    """
+    Oxirgi N ta kun yoki soat uchun har bir metrikaning qiymatlari
+    
+    Args:
+        period: 'day' yoki 'hour'
+        count: Nechta oxirgi bucket
+    
+    Returns:
+        Dict[str, List[int]]: Metrika -> eskidan yangiga qiymatlar (bo'sh bucketlar 0)
+    """
+    now = clock.now()
+    if period == "hour":
+        table, fmt, step = "stats_hourly", "%Y-%m-%d %H", datetime.timedelta(hours=1)
+    else:
+        table, fmt, step = "stats_daily", "%Y-%m-%d", datetime.timedelta(days=1)
+    buckets = [(now - step * i).strftime(fmt) for i in range(count - 1, -1, -1)]
+    
+    placeholders = ", ".join("?" for _ in ROLLUP_METRICS)
+    async with get_read_pool().acquire() as db:
+        cursor = await db.execute(
+            f"SELECT metric, bucket, value FROM {table} WHERE metric IN ({placeholders}) AND bucket >= ?",
+            (*ROLLUP_METRICS, buckets[0])
+        )
+        rows = await cursor.fetchall()
+    
+    index = {bucket: i for i, bucket in enumerate(buckets)}
+    series = {metric: [0] * count for metric in ROLLUP_METRICS}
+    for metric, bucket, value in rows:
+        if bucket in index:
+            series[metric][index[bucket]] = value
+    return series
+
+async def prune_hourly_rollups(days: int = 30) -> int:
+    """Eski soatlik yig'indilarni o'chirish (kunliklari saqlanadi)"""
+    cutoff = (clock.now() - datetime.timedelta(days=days)).strftime("%Y-%m-%d %H")
+    
+    async def job(db: aiosqlite.Connection) -> int:
+        cursor = await db.execute("DELETE FROM stats_hourly WHERE bucket < ?", (cutoff,))
+        return cursor.rowcount
+    
+    return await get_writer().submit(job)
 
 async def add_user(user_id: int, full_name: str, username: str = None) -> bool:
     """
@@ -382,104 +1300,247 @@ async def add_user(user_id: int, full_name: str, username: str = None) -> bool:
     
     Returns:
         bool: True agar yangi foydalanuvchi qo'shilgan bo'lsa, False agar foydalanuvchi yangilangan bo'lsa
+    
+    Yaqinda ko'rilgan va ma'lumotlari o'zgarmagan foydalanuvchi uchun bazaga
+    murojaat qilinmaydi (seen_users). Aks holda avval o'qish havzasida
+    tekshiriladi va yozuvchiga faqat yangi yoki o'zgargan foydalanuvchi boradi.
     """
-    async with aiosqlite.connect(DATABASE_NAME) as db:
-        # Foydalanuvchi mavjudligini tekshirish
-        user_exists = await db.execute("SELECT 1 FROM users WHERE user_id = ?", (user_id,))
-        user_exists = await user_exists.fetchone()
+    if seen_users.check(user_id, full_name, username):
+        return False
+    
+    async with get_read_pool().acquire() as db:
+        cursor = await db.execute(
+            "SELECT full_name, username, is_active FROM users WHERE user_id = ?", (user_id,)
+        )
+        row = await cursor.fetchone()
+    
+    if row and row[2] and (row[0], row[1]) == (full_name, username):
+        seen_users.remember(user_id, full_name, username)
+        return False
+    
+    async def job(db: aiosqlite.Connection) -> Optional[bool]:
+        # Yozuvchi tranzaksiyasi ichida - o'qish havzasidagi tekshiruvdan keyin qo'shilgan bo'lishi mumkin
+        cursor = await db.execute("SELECT 1 FROM users WHERE user_id = ?", (user_id,))
+        exists = await cursor.fetchone() is not None
         
-        if user_exists:
-            # Mavjud foydalanuvchini yangilash
-            await db.execute(
-                "UPDATE users SET full_name = ?, username = ?, is_active = TRUE WHERE user_id = ?",
-                (full_name, username, user_id)
-            )
-            await db.commit()
-            logger.info(f"Mavjud foydalanuvchi {user_id} ma'lumotlari yangilandi")
-            return False
-        else:
-            # Yangi foydalanuvchi qo'shish
+        # Bitta UPSERT: mavjud foydalanuvchi faqat biror narsa o'zgargan bo'lsa yoziladi,
+        # aks holda RETURNING qator qaytarmaydi
+        cursor = await db.execute(
+            """
+            INSERT INTO users (user_id, full_name, username) VALUES (?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                full_name = excluded.full_name, username = excluded.username, is_active = TRUE
+            WHERE users.full_name IS NOT excluded.full_name
+                OR users.username IS NOT excluded.username
+                OR NOT users.is_active
+            RETURNING user_id
+            """,
+            (user_id, full_name, username)
+        )
+        if await cursor.fetchone() is None:
+            return None
+        if not exists:
+            await _bump_rollups(db, "new_users")
+        return not exists
+    
+    # None - o'zgarish yo'q, True - yangi foydalanuvchi, False - ma'lumotlari yangilandi
+    result = await get_writer().submit(job)
+    seen_users.remember(user_id, full_name, username)
+    if result:
+        logger.info(f"Yangi foydalanuvchi qo'shildi: {user_id} ({full_name})")
+    elif result is not None:
+        logger.info(f"Mavjud foydalanuvchi {user_id} ma'lumotlari yangilandi")
+    return bool(result)
+
+async def toggle_digest(user_id: int) -> bool:
+    """
+    Foydalanuvchining ertalabki jamlanma obunasini almashtirish
+    
+    Args:
+        user_id: Foydalanuvchi ID
+    
+    Returns:
+        bool: True agar jamlanma endi yoqilgan bo'lsa
+    """
+    async def job(db: aiosqlite.Connection) -> bool:
+        cursor = await db.execute(
+            "UPDATE users SET digest_enabled = NOT digest_enabled WHERE user_id = ? RETURNING digest_enabled",
+            (user_id,)
+        )
+        row = await cursor.fetchone()
+        if row is None:
+            # /start bosmasdan kelgan foydalanuvchi
             await db.execute(
-                "INSERT INTO users (user_id, full_name, username) VALUES (?, ?, ?)",
-                (user_id, full_name, username)
+                "INSERT INTO users (user_id, digest_enabled) VALUES (?, TRUE)",
+                (user_id,)
             )
-            await db.commit()
-            logger.info(f"Yangi foydalanuvchi qo'shildi: {user_id} ({full_name})")
+            await _bump_rollups(db, "new_users")
             return True
+        return bool(row[0])
+    
+    enabled = await get_writer().submit(job)
+    logger.info(f"User {user_id} ertalabki jamlanmasi: {enabled}")
+    return enabled
 
-async def get_user_count() -> int:
-    """Foydalanuvchilar sonini olish"""
-    async with aiosqlite.connect(DATABASE_NAME) as db:
-        cursor = await db.execute("SELECT COUNT(*) FROM users WHERE is_active = TRUE")
+async def deactivate_users(user_ids: List[int]) -> int:
+    """
+    Botni bloklagan foydalanuvchilarni nofaol deb belgilash
+    
+    Args:
+        user_ids: Foydalanuvchi ID lari
+    
+    Returns:
+        int: Belgilangan foydalanuvchilar soni
+    """
+    if not user_ids:
+        return 0
+    
+    async def job(db: aiosqlite.Connection) -> int:
+        cursor = await db.executemany(
+            "UPDATE users SET is_active = FALSE WHERE user_id = ? AND is_active",
+            [(user_id,) for user_id in user_ids]
+        )
+        return cursor.rowcount
+    
+    count = await get_writer().submit(job)
+    for user_id in user_ids:
+        seen_users.forget(user_id)
+    logger.info(f"{count} ta foydalanuvchi nofaol deb belgilandi")
+    return count
+
+async def iter_digest_groups(day: datetime.date, users_per_page: int = 500) -> AsyncIterator[Tuple[int, List[Task]]]:
+    """
+    Ertalabki jamlanma uchun obunachilarning shu kungi tasklarini guruhlab o'qish
+    
+    Har bir foydalanuvchiga alohida so'rov yuborilmaydi: obunachilar user_id
+    bo'yicha keyset sahifalarga bo'linadi va har bir sahifa uchun bitta
+    guruhlangan so'rov (idx_tasks_user_status orqali) bajariladi. Sahifalar
+    qisqa o'qish tranzaksiyalari bo'lgani uchun uzoq davom etadigan yuborish
+    vaqtida WAL checkpoint to'sib qo'yilmaydi.
+    
+    Args:
+        day: Jamlanma kuni
+        users_per_page: Bitta sahifadagi obunachilar soni
+    
+    Yields:
+        Tuple: (user_id, shu kungi tasklar vaqt bo'yicha tartiblangan)
+    """
+    day_start = day.strftime("%Y-%m-%d 00:00")
+    day_end = (day + datetime.timedelta(days=1)).strftime("%Y-%m-%d 00:00")
+    # Telegram foydalanuvchi ID lari musbat
+    last_user_id = 0
+    
+    while True:
+        async with get_read_pool().acquire() as db:
+            cursor = await db.execute(
+                "SELECT user_id FROM users INDEXED BY idx_users_digest "
+                "WHERE digest_enabled AND is_active AND user_id > ? ORDER BY user_id LIMIT ?",
+                (last_user_id, users_per_page)
+            )
+            user_ids = [row[0] for row in await cursor.fetchall()]
+            if not user_ids:
+                return
+            
+            db.row_factory = task_row_factory
+            try:
+                cursor = await db.execute(
+                    """
+                    SELECT t.user_id, t.id, t.task_name, t.task_time, t.task_datetime, t.status, t.recurrence
+                    FROM users u INDEXED BY idx_users_digest
+                    CROSS JOIN tasks t INDEXED BY idx_tasks_user_status ON t.user_id = u.user_id
+                    WHERE u.digest_enabled AND u.is_active AND u.user_id BETWEEN ? AND ?
+                    AND t.status IN ('active', 'snoozed')
+                    AND t.task_datetime >= ? AND t.task_datetime < ?
+                    ORDER BY t.user_id, t.task_datetime
+                    """,
+                    (user_ids[0], user_ids[-1], day_start, day_end)
+                )
+                tasks = await cursor.fetchall()
+            finally:
+                db.row_factory = None
+        
+        last_user_id = user_ids[-1]
+        group: List[Task] = []
+        for task in tasks:
+            if group and group[0].user_id != task.user_id:
+                yield group[0].user_id, group
+                group = []
+            group.append(task)
+        if group:
+            yield group[0].user_id, group
+        
+        if len(user_ids) < users_per_page:
+            return
+
+async def _read_counter(name: str) -> int:
+    """Bitta hisoblagich qiymatini o'qish"""
+    async with get_read_pool().acquire() as db:
+        cursor = await db.execute("SELECT value FROM stats_counters WHERE name = ?", (name,))
         count = await cursor.fetchone()
         return count[0] if count else 0
 
+async def get_user_count() -> int:
+    """Foydalanuvchilar sonini olish"""
+    return await _read_counter("users_active")
+
 async def get_completed_tasks_count() -> int:
     """Bajarilgan tasklar sonini olish"""
-    async with aiosqlite.connect(DATABASE_NAME) as db:
-        cursor = await db.execute("SELECT COUNT(*) FROM tasks WHERE status = 'completed'")
-        count = await cursor.fetchone()
-        return count[0] if count else 0
+    return await _read_counter("tasks_completed")
 
 async def get_snoozed_tasks_count() -> int:
     """Kechiktirilgan tasklar sonini olish"""
-    async with aiosqlite.connect(DATABASE_NAME) as db:
-        cursor = await db.execute("SELECT COUNT(*) FROM tasks WHERE status = 'snoozed'")
-        count = await cursor.fetchone()
-        return count[0] if count else 0
+    return await _read_counter("tasks_snoozed")
 
 async def get_active_tasks_count() -> int:
     """Aktiv tasklar sonini olish"""
-    async with aiosqlite.connect(DATABASE_NAME) as db:
-        cursor = await db.execute("SELECT COUNT(*) FROM tasks WHERE status = 'active'")
-        count = await cursor.fetchone()
-        return count[0] if count else 0
+    return await _read_counter("tasks_active")
 
 async def get_tasks_per_user() -> float:
     """Har bir foydalanuvchiga o'rtacha task sonini hisoblash"""
-    async with aiosqlite.connect(DATABASE_NAME) as db:
-        # Barcha tasklar soni
-        cursor = await db.execute("SELECT COUNT(*) FROM tasks")
-        task_count = await cursor.fetchone()
-        task_count = task_count[0] if task_count else 0
-        
-        # Foydalanuvchilar soni
-        cursor = await db.execute("SELECT COUNT(*) FROM users WHERE is_active = TRUE")
-        user_count = await cursor.fetchone()
-        user_count = user_count[0] if user_count else 0
-        
-        # O'rtacha hisoblash
-        if user_count > 0:
-            return round(task_count / user_count, 2)
-        else:
-            return 0.0
+    stats = await get_statistics()
+    return stats["tasks_per_user"]
+
+async def get_statistics() -> Dict[str, Any]:
+    """
+    Admin statistikasini hisoblagichlar jadvalidan bitta o'qishda olish
+    
+    Jadvallarni skanerlamaydi: qiymatlar triggerlar orqali saqlanadi.
+    Faqat o'qish havzasidan foydalaniladi va yozish qulfini olmaydi.
+    
+    Returns:
+        Dict: user_count, completed_tasks, snoozed_tasks, active_tasks,
+              total_tasks va tasks_per_user
+    """
+    async with get_read_pool().acquire() as db:
+        cursor = await db.execute("SELECT name, value FROM stats_counters")
+        counters = {name: value for name, value in await cursor.fetchall()}
+    
+    user_count = counters.get("users_active", 0)
+    total = counters.get("tasks_total", 0)
+    return {
+        "user_count": user_count,
+        "completed_tasks": counters.get("tasks_completed", 0),
+        "snoozed_tasks": counters.get("tasks_snoozed", 0),
+        "active_tasks": counters.get("tasks_active", 0),
+        "total_tasks": total,
+        "tasks_per_user": round(total / user_count, 2) if user_count > 0 else 0.0,
+    }
 
 async def set_config(key: str, value: str) -> None:
     """Konfiguratsiya qiymatini o'rnatish yoki yangilash"""
-    async with aiosqlite.connect(DATABASE_NAME) as db:
-        # Mavjudligini tekshirish
-        cursor = await db.execute("SELECT 1 FROM config WHERE key = ?", (key,))
-        exists = await cursor.fetchone()
-        
-        if exists:
-            # Yangilash
-            await db.execute(
-                "UPDATE config SET value = ?, updated_at = CURRENT_TIMESTAMP WHERE key = ?",
-                (value, key)
-            )
-        else:
-            # Yangi qo'shish
-            await db.execute(
-                "INSERT INTO config (key, value) VALUES (?, ?)",
-                (key, value)
-            )
-        
-        await db.commit()
-        logger.info(f"Konfiguratsiya yangilandi: {key} = {value}")
+    async def job(db: aiosqlite.Connection) -> None:
+        await db.execute(
+            "INSERT INTO config (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = CURRENT_TIMESTAMP",
+            (key, value)
+        )
+    
+    await get_writer().submit(job)
+    logger.info(f"Konfiguratsiya yangilandi: {key} = {value}")
 
 async def get_config(key: str) -> Optional[str]:
     """Konfiguratsiya qiymatini olish"""
-    async with aiosqlite.connect(DATABASE_NAME) as db:
+    async with connect(DATABASE_NAME) as db:
         cursor = await db.execute("SELECT value FROM config WHERE key = ?", (key,))
         result = await cursor.fetchone()
         return result[0] if result else None
@@ -495,54 +1556,286 @@ async def add_post_channel(channel_id: str, channel_name: str = None) -> bool:
     Returns:
         bool: True agar muvaffaqiyatli qo'shilgan bo'lsa
     """
-    async with aiosqlite.connect(DATABASE_NAME) as db:
-        try:
-            # Kanal mavjud emasligini tekshirish
-            cursor = await db.execute("SELECT 1 FROM post_channels WHERE channel_id = ?", (channel_id,))
-            exists = await cursor.fetchone()
-            
-            if exists:
-                # Yangilash
-                await db.execute(
-                    "UPDATE post_channels SET channel_name = ? WHERE channel_id = ?",
-                    (channel_name, channel_id)
-                )
-                await db.commit()
-                logger.info(f"Post kanali yangilandi: {channel_id}")
-                return True
-            else:
-                # Yangi qo'shish
-                await db.execute(
-                    "INSERT INTO post_channels (channel_id, channel_name) VALUES (?, ?)",
-                    (channel_id, channel_name)
-                )
-                await db.commit()
-                logger.info(f"Yangi post kanali qo'shildi: {channel_id}")
-                return True
-        except Exception as e:
-            logger.error(f"Post kanali qo'shishda xatolik: {e}")
-            return False
+    async def job(db: aiosqlite.Connection) -> bool:
+        cursor = await db.execute("SELECT 1 FROM post_channels WHERE channel_id = ?", (channel_id,))
+        exists = await cursor.fetchone() is not None
+        # Qayta qo'shilgan kanal uchun xato holati ham tozalanadi
+        await db.execute(
+            """
+            INSERT INTO post_channels (channel_id, channel_name) VALUES (?, ?)
+            ON CONFLICT(channel_id) DO UPDATE SET
+                channel_name = excluded.channel_name, fail_count = 0, last_error = NULL,
+                retry_after = NULL, suspended = FALSE
+            """,
+            (channel_id, channel_name)
+        )
+        return exists
+    
+    try:
+        exists = await get_writer().submit(job)
+    except Exception as e:
+        logger.error(f"Post kanali qo'shishda xatolik: {e}")
+        return False
+    
+    if exists:
+        logger.info(f"Post kanali yangilandi: {channel_id}")
+    else:
+        logger.info(f"Yangi post kanali qo'shildi: {channel_id}")
+    return True
 
 async def get_post_channels() -> List[Dict[str, Any]]:
     """Barcha post kanallarini olish"""
-    async with aiosqlite.connect(DATABASE_NAME) as db:
+    async with connect(DATABASE_NAME) as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute("SELECT * FROM post_channels ORDER BY added_at DESC")
         channels = await cursor.fetchall()
         return [dict(row) for row in channels]
 
+async def get_sendable_post_channels() -> List[Dict[str, Any]]:
+    """To'xtatilmagan va kutish vaqti tugagan post kanallarini olish"""
+    now = clock.now().strftime("%Y-%m-%d %H:%M:%S")
+    async with connect(DATABASE_NAME) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(
+            "SELECT channel_id, channel_name, fail_count, retry_after FROM post_channels "
+            "WHERE NOT suspended AND (retry_after IS NULL OR retry_after <= ?)",
+            (now,)
+        )
+        return [dict(row) for row in await cursor.fetchall()]
+
+async def record_channel_success(channel_id: str) -> None:
+    """
+    Kanalga muvaffaqiyatli yuborilgandan keyin xato holatini tozalash
+    
+    Faqat xato holatidagi kanal uchun chaqiriladi, shuning uchun last_success
+    kanal oxirgi marta xatodan tiklangan vaqtni bildiradi.
+    """
+    async def job(db: aiosqlite.Connection) -> None:
+        await db.execute(
+            "UPDATE post_channels SET fail_count = 0, last_error = NULL, retry_after = NULL, "
+            "last_success = ? WHERE channel_id = ?",
+            (clock.now().strftime("%Y-%m-%d %H:%M:%S"), channel_id)
+        )
+    
+    await get_writer().submit(job)
+
+async def record_channel_failure(channel_id: str, error: str, permanent: bool,
+                                 retry_seconds: Optional[int] = None) -> bool:
+    """
+    Kanalga yuborishdagi xatoni qayd etish va keyingi urinish vaqtini belgilash
+    
+    Har bir ketma-ket xatoda kutish vaqti ikki baravar oshadi. Doimiy xatolar
+    (bot kanaldan chiqarilgan, kanal topilmadi) CHANNEL_SUSPEND_AFTER marta
+    takrorlansa, kanal admin qayta yoqmaguncha to'xtatiladi.
+    
+    Args:
+        channel_id: Kanal ID
+        error: Xato matni
+        permanent: Xato doimiy (qayta urinish yordam bermaydigan) ekanligi
+        retry_seconds: Telegram aytgan kutish vaqti (RetryAfter), bo'lsa
+    
+    Returns:
+        bool: True agar kanal to'xtatilgan bo'lsa
+    """
+    async def job(db: aiosqlite.Connection) -> bool:
+        cursor = await db.execute(
+            "SELECT fail_count FROM post_channels WHERE channel_id = ?", (channel_id,)
+        )
+        row = await cursor.fetchone()
+        if row is None:
+            return False
+        
+        if retry_seconds is not None:
+            # Tezlik chegarasi kanal nosozligi emas: faqat kutish
+            fail_count, delay = row[0], retry_seconds
+        else:
+            fail_count = row[0] + 1
+            delay = min(CHANNEL_BACKOFF_BASE * 2 ** (fail_count - 1), CHANNEL_BACKOFF_MAX)
+        suspended = permanent and fail_count >= CHANNEL_SUSPEND_AFTER
+        retry_after = clock.now() + datetime.timedelta(seconds=delay)
+        
+        await db.execute(
+            "UPDATE post_channels SET fail_count = ?, last_error = ?, retry_after = ?, "
+            "suspended = suspended OR ? WHERE channel_id = ?",
+            (fail_count, error[:200], retry_after.strftime("%Y-%m-%d %H:%M:%S"), suspended, channel_id)
+        )
+        return suspended
+    
+    suspended = await get_writer().submit(job)
+    if suspended:
+        logger.warning(f"Post kanali {channel_id} ketma-ket xatolar sababli to'xtatildi: {error}")
+    return suspended
+
+async def resume_post_channel(channel_id: str) -> bool:
+    """To'xtatilgan post kanalini qayta yoqish"""
+    async def job(db: aiosqlite.Connection) -> bool:
+        cursor = await db.execute(
+            "UPDATE post_channels SET fail_count = 0, last_error = NULL, retry_after = NULL, "
+            "suspended = FALSE WHERE channel_id = ?",
+            (channel_id,)
+        )
+        return cursor.rowcount > 0
+    
+    resumed = await get_writer().submit(job)
+    if resumed:
+        logger.info(f"Post kanali qayta yoqildi: {channel_id}")
+    return resumed
+
 async def remove_post_channel(channel_id: str) -> bool:
     """Post kanalini o'chirish"""
-    async with aiosqlite.connect(DATABASE_NAME) as db:
-        try:
-            cursor = await db.execute("DELETE FROM post_channels WHERE channel_id = ?", (channel_id,))
-            deleted = cursor.rowcount > 0
-            await db.commit()
-            
-            if deleted:
-                logger.info(f"Post kanali o'chirildi: {channel_id}")
-            
-            return deleted
-        except Exception as e:
-            logger.error(f"Post kanalini o'chirishda xatolik: {e}")
-            return False 
\ No newline at end of file
+    async def job(db: aiosqlite.Connection) -> bool:
+        cursor = await db.execute("DELETE FROM post_channels WHERE channel_id = ?", (channel_id,))
+        return cursor.rowcount > 0
+    
+    try:
+        deleted = await get_writer().submit(job)
+    except Exception as e:
+        logger.error(f"Post kanalini o'chirishda xatolik: {e}")
+        return False
+    
+    if deleted:
+        logger.info(f"Post kanali o'chirildi: {channel_id}")
+    return deleted
+
+# --- Ommaviy xabar (broadcast) ---
+
+async def create_broadcasts_table():
+    """Ommaviy xabarlar va ularning yuborish holati (checkpoint) jadvalini yaratish"""
+    async with connect(DATABASE_NAME) as db:
+        await db.execute("""
+        CREATE TABLE IF NOT EXISTS broadcasts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            admin_id INTEGER NOT NULL,
+            from_chat_id INTEGER NOT NULL,
+            message_id INTEGER NOT NULL,
+            progress_message_id INTEGER,
+            status TEXT NOT NULL DEFAULT 'running',
+            total INTEGER NOT NULL DEFAULT 0,
+            last_user_id INTEGER NOT NULL DEFAULT 0,
+            sent INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            blocked INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        await db.commit()
+
+async def create_broadcast(admin_id: int, from_chat_id: int, message_id: int,
+                           progress_message_id: int) -> int:
+    """
+    Yangi ommaviy xabar yaratish
+    
+    Args:
+        admin_id: Yuboruvchi admin ID
+        from_chat_id: Nusxalanadigan xabar turgan chat
+        message_id: Nusxalanadigan xabar ID
+        progress_message_id: Admin chatidagi jarayon xabari ID
+    
+    Returns:
+        int: Ommaviy xabar ID
+    """
+    async def job(db: aiosqlite.Connection) -> int:
+        # Qabul qiluvchilar soni ETA uchun hisoblagichdan olinadi
+        cursor = await db.execute("SELECT value FROM stats_counters WHERE name = 'users_active'")
+        total = await cursor.fetchone()
+        cursor = await db.execute(
+            "INSERT INTO broadcasts (admin_id, from_chat_id, message_id, progress_message_id, total) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (admin_id, from_chat_id, message_id, progress_message_id, total[0] if total else 0)
+        )
+        return cursor.lastrowid
+    
+    broadcast_id = await get_writer().submit(job)
+    logger.info(f"Ommaviy xabar #{broadcast_id} yaratildi (admin {admin_id})")
+    return broadcast_id
+
+async def get_broadcast(broadcast_id: int) -> Optional[Dict[str, Any]]:
+    """Ommaviy xabar holatini olish"""
+    async with connect(DATABASE_NAME) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute("SELECT * FROM broadcasts WHERE id = ?", (broadcast_id,))
+        row = await cursor.fetchone()
+        return dict(row) if row else None
+
+async def get_running_broadcasts() -> List[int]:
+    """Tugallanmagan (qayta ishga tushirilishi kerak bo'lgan) ommaviy xabarlar ID lari"""
+    async with connect(DATABASE_NAME) as db:
+        cursor = await db.execute("SELECT id FROM broadcasts WHERE status = 'running' ORDER BY id")
+        return [row[0] for row in await cursor.fetchall()]
+
+async def get_broadcast_recipients(after_user_id: int, limit: int = 100) -> List[int]:
+    """
+    Ommaviy xabar qabul qiluvchilarining keyingi sahifasi (user_id bo'yicha keyset)
+    
+    Args:
+        after_user_id: Oldingi sahifadagi oxirgi user_id
+        limit: Sahifa hajmi
+    
+    Returns:
+        List[int]: Aktiv foydalanuvchilar ID lari (o'sish tartibida)
+    """
+    async with get_read_pool().acquire() as db:
+        cursor = await db.execute(
+            "SELECT user_id FROM users WHERE is_active AND user_id > ? ORDER BY user_id LIMIT ?",
+            (after_user_id, limit)
+        )
+        return [row[0] for row in await cursor.fetchall()]
+
+async def save_broadcast_progress(broadcast_id: int, last_user_id: int, sent: int, failed: int,
+                                  blocked_user_ids: List[int]) -> Optional[str]:
+    """
+    Yuborilgan sahifadan keyin checkpoint saqlash
+    
+    Hisoblagichlar, oxirgi user_id va botni bloklaganlarni nofaol qilish bitta
+    tranzaksiyada yoziladi: qayta ishga tushganda yuborish aynan shu joydan davom etadi.
+    
+    Args:
+        broadcast_id: Ommaviy xabar ID
+        last_user_id: Sahifadagi oxirgi user_id
+        sent: Sahifada yuborilganlar soni
+        failed: Sahifada xato bo'lganlar soni
+        blocked_user_ids: Botni bloklagan foydalanuvchilar
+    
+    Returns:
+        Optional[str]: Ommaviy xabarning joriy statusi (masalan, admin to'xtatgan bo'lsa 'cancelled')
+    """
+    async def job(db: aiosqlite.Connection) -> Optional[str]:
+        if blocked_user_ids:
+            await db.executemany(
+                "UPDATE users SET is_active = FALSE WHERE user_id = ? AND is_active",
+                [(user_id,) for user_id in blocked_user_ids]
+            )
+        cursor = await db.execute(
+            """
+            UPDATE broadcasts SET last_user_id = ?, sent = sent + ?, failed = failed + ?,
+                blocked = blocked + ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? RETURNING status
+            """,
+            (last_user_id, sent, failed, len(blocked_user_ids), broadcast_id)
+        )
+        row = await cursor.fetchone()
+        return row[0] if row else None
+    
+    status = await get_writer().submit(job)
+    for user_id in blocked_user_ids:
+        seen_users.forget(user_id)
+    return status
+
+async def set_broadcast_status(broadcast_id: int, status: str) -> None:
+    """Ommaviy xabar statusini o'zgartirish ('running', 'cancelled', 'done')"""
+    async def job(db: aiosqlite.Connection) -> None:
+        await db.execute(
+            "UPDATE broadcasts SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (status, broadcast_id)
+        )
+    
+    await get_writer().submit(job)
+    logger.info(f"Ommaviy xabar #{broadcast_id} statusi: {status}")
+
+# --- Metrikalar ---
+# Ochiq async funksiyalarni vaqt o'lchagich bilan o'rash: modul ichidagi
+# chaqiruvlar ham, `from database import ...` orqali olinganlar ham o'lchanadi
+for _name, _function in list(globals().items()):
+    if not _name.startswith("_") and inspect.iscoroutinefunction(_function) and _function.__module__ == __name__:
+        globals()[_name] = metrics.timed(_function)
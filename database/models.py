@@ -0,0 +1,67 @@
+import sqlite3
+from typing import Any, Optional, Tuple
+
+# tasks jadvali ustunlari (jadvaldagi tartibda)
+TASK_FIELDS = (
+    "id", "user_id", "task_name", "task_time", "task_datetime",
+    "created_at", "is_completed", "status", "recurrence"
+)
+
+
+class Task:
+    """
+    tasks jadvalining ixcham yozuvi.
+
+    __slots__ tufayli har bir yozuv uchun dict yaratilmaydi. So'rovda
+    tanlanmagan ustunlar None bo'ladi.
+    """
+
+    __slots__ = TASK_FIELDS
+
+    def __init__(self, id: Optional[int] = None, user_id: Optional[int] = None,
+                 task_name: Optional[str] = None, task_time: Optional[str] = None,
+                 task_datetime: Optional[str] = None, created_at: Optional[str] = None,
+                 is_completed: Optional[bool] = None, status: Optional[str] = None,
+                 recurrence: Optional[str] = None):
+        self.id = id
+        self.user_id = user_id
+        self.task_name = task_name
+        self.task_time = task_time
+        self.task_datetime = task_datetime
+        self.created_at = created_at
+        self.is_completed = is_completed
+        self.status = status
+        self.recurrence = recurrence
+
+    def __repr__(self) -> str:
+        return f"Task(id={self.id}, user_id={self.user_id}, status={self.status!r}, task_datetime={self.task_datetime!r})"
+
+
+def select_columns(*columns: str) -> str:
+    """So'rov uchun ustunlar ro'yxati (faqat tasks jadvali ustunlari)"""
+    for column in columns:
+        if column not in TASK_FIELDS:
+            raise ValueError(f"Noma'lum ustun: {column}")
+    return ", ".join(columns)
+
+
+# Oxirgi so'rov ustunlari va ularning Task slotlaridagi o'rni
+_last_layout: Tuple[Any, Tuple[Optional[int], ...]] = ((), ())
+
+
+def task_row_factory(cursor: sqlite3.Cursor, row: tuple) -> Task:
+    """
+    sqlite3 uchun row factory: qatorni Task obyektiga aylantiradi.
+
+    Ustunlar joylashuvi har bir so'rov uchun bir marta hisoblanadi
+    (cursor.description obyekti o'zgarmaguncha qayta ishlatiladi).
+    """
+    global _last_layout
+    description = cursor.description
+    layout_description, layout = _last_layout
+    if description is not layout_description:
+        names = [column[0] for column in description]
+        layout = tuple(names.index(field) if field in names else None for field in TASK_FIELDS)
+        _last_layout = (description, layout)
+
+    return Task(*[row[index] if index is not None else None for index in layout])
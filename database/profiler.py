@@ -0,0 +1,345 @@
+import logging
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Loggerga sozlash
+logger = logging.getLogger(__name__)
+
+# Reja (EXPLAIN QUERY PLAN) olinadigan so'rov turlari
+PLAN_STATEMENTS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+
+# Kuzatiladigan turli so'rovlarning maksimal soni (xotira cheklovi)
+MAX_STATEMENTS = 500
+
+# Shundan kam qatorli jadvalni to'liq skanerlash muammo deb belgilanmaydi
+# (stats_counters, config, post_channels kabi kichik jadvallar)
+SCAN_MIN_ROWS = 1000
+
+# Bir xil so'rovning turli uzunlikdagi IN (?, ?, ...) ro'yxatlarini bitta deb hisoblash
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """So'rov matnini statistika kaliti uchun bir xil ko'rinishga keltirish"""
+    return _PLACEHOLDER_LIST.sub("?, ...", _WHITESPACE.sub(" ", sql).strip())
+
+
+def is_full_scan(detail: str) -> bool:
+    """Reja qatori jadvalni indekssiz to'liq skanerlashni bildiradimi"""
+    return (detail.startswith("SCAN ") and " INDEX" not in detail
+            and "VIRTUAL TABLE" not in detail and "CONSTANT ROW" not in detail
+            # Sxema tekshiruvlari (sqlite_master) har doim skanerlanadi
+            and not detail.startswith("SCAN sqlite_"))
+
+
+def scanned_table(detail: str, sql: str) -> str:
+    """
+    "SCAN <nom>" qatoridagi jadval nomi (rejada taxallus ko'rsatilsa, so'rovdan topiladi)
+
+    Args:
+        detail: Reja qatori
+        sql: So'rov matni
+
+    Returns:
+        str: Jadval nomi yoki topilmasa taxallusning o'zi
+    """
+    name = detail[len("SCAN "):]
+    match = re.search(rf'(?:FROM|JOIN)\s+"?(\w+)"?\s+(?:AS\s+)?{re.escape(name)}\b', sql, re.IGNORECASE)
+    return match.group(1) if match else name
+
+
+def is_large_table(conn: sqlite3.Connection, table: str) -> bool:
+    """
+    Jadvalda SCAN_MIN_ROWS dan ko'p qator bormi (noma'lum nom - ehtiyot uchun True)
+
+    COUNT(*) o'rniga OFFSET bilan tekshiriladi: katta jadvalda ham ko'pi bilan
+    SCAN_MIN_ROWS qator o'qiladi.
+    """
+    cursor = sqlite3.Cursor(conn)
+    if cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is None:
+        return True
+    quoted = table.replace('"', '""')
+    row = cursor.execute(f'SELECT 1 FROM "{quoted}" LIMIT 1 OFFSET ?', (SCAN_MIN_ROWS,)).fetchone()
+    return row is not None
+
+
+class StatementStats:
+    """Bitta (normallashtirilgan) so'rov bo'yicha yig'ilgan statistika"""
+
+    __slots__ = ("sql", "calls", "total", "max", "rows", "slow", "plan", "full_scan")
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.slow = 0
+        self.plan: Optional[List[str]] = None
+        self.full_scan = False
+
+
+class QueryProfiler:
+    """
+    SQL so'rovlar profileri.
+
+    Har bir so'rovning bajarilish vaqti (execute va fetch birga), qaytargan
+    yoki o'zgartirgan qatorlari va chaqiruvlar soni yig'iladi. slow_ms dan
+    uzoq davom etgan bajarilishlar logga yoziladi. Har bir yangi so'rov uchun
+    bir marta EXPLAIN QUERY PLAN olinadi va SCAN_MIN_ROWS dan katta jadvalni
+    indekssiz to'liq skanerlash (SCAN jadval) bo'lsa so'rov belgilanadi.
+
+    O'lchov sqlite3 darajasida (aiosqlite ishchi oqimida) bajariladi, shuning
+    uchun natijaga event loop navbatida kutish vaqti qo'shilmaydi.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_ms = 100.0
+        self.dropped = 0
+        # So'rov vaqtlari (perf_counter) kabi haqiqiy vaqt: profiler import paytida
+        # yaratiladi, virtual soat esa keyin o'rnatilishi mumkin
+        self.started_at = time.time()
+        self._stats: Dict[str, StatementStats] = {}
+        # Xom so'rov matni -> statistika (normallashtirishni har safar qilmaslik uchun)
+        self._by_sql: Dict[str, StatementStats] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, enabled: bool, slow_ms: Optional[float] = None) -> None:
+        """
+        Profilerni yoqish/o'chirish (yangi ochilgan ulanishlarga ta'sir qiladi)
+
+        Args:
+            enabled: So'rovlarni o'lchash
+            slow_ms: Sekin so'rov chegarasi (millisekund)
+        """
+        self.enabled = enabled
+        if slow_ms is not None:
+            self.slow_ms = slow_ms
+
+    def connection_factory(self) -> type:
+        """sqlite3.connect uchun ulanish klassi"""
+        return ProfiledConnection if self.enabled else sqlite3.Connection
+
+    def reset(self) -> None:
+        """Yig'ilgan statistikani tozalash"""
+        with self._lock:
+            self._stats.clear()
+            self._by_sql.clear()
+            self.dropped = 0
+            self.started_at = time.time()
+
+    def lookup(self, sql: str, conn: sqlite3.Connection, parameters: Any) -> Optional[StatementStats]:
+        """So'rov statistikasini olish; yangi so'rov bo'lsa rejasini ham olish"""
+        stats = self._by_sql.get(sql)
+        if stats is not None:
+            return stats
+
+        key = normalize_sql(sql)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= MAX_STATEMENTS:
+                    self.dropped += 1
+                    return None
+                stats = self._stats[key] = StatementStats(key)
+            if len(self._by_sql) < MAX_STATEMENTS * 4:
+                self._by_sql[sql] = stats
+
+        if stats.plan is None:
+            self._capture_plan(stats, sql, conn, parameters)
+        return stats
+
+    def _capture_plan(self, stats: StatementStats, sql: str, conn: sqlite3.Connection, parameters: Any) -> None:
+        """EXPLAIN QUERY PLAN natijasini saqlash"""
+        stats.plan = []
+        if not stats.sql.lstrip("( ").upper().startswith(PLAN_STATEMENTS):
+            return
+        try:
+            # Oddiy kursor: EXPLAIN ning o'zi statistikaga tushmasligi uchun
+            rows = sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+        except (sqlite3.Error, ValueError) as e:
+            logger.debug(f"So'rov rejasini olib bo'lmadi: {e}")
+            return
+        stats.plan = [row[-1] for row in rows]
+        try:
+            stats.full_scan = any(
+                is_full_scan(detail) and is_large_table(conn, scanned_table(detail, sql)) for detail in stats.plan
+            )
+        except sqlite3.Error as e:
+            logger.debug(f"Jadval hajmini tekshirib bo'lmadi: {e}")
+            stats.full_scan = any(is_full_scan(detail) for detail in stats.plan)
+        if stats.full_scan:
+            logger.warning(f"To'liq skanerlash: {stats.sql} -> {'; '.join(stats.plan)}")
+
+    def record(self, stats: StatementStats, elapsed: float, rows: int, call: bool) -> None:
+        """Bajarilish bo'lagini (execute yoki fetch) statistikaga qo'shish"""
+        with self._lock:
+            if call:
+                stats.calls += 1
+            stats.total += elapsed
+            stats.rows += rows
+
+    def finish(self, stats: StatementStats, elapsed: float, rows: int) -> None:
+        """Bitta bajarilishning umumiy vaqtini tekshirish (sekin so'rovlar logi)"""
+        if elapsed > stats.max:
+            stats.max = elapsed
+        if elapsed * 1000 >= self.slow_ms:
+            stats.slow += 1
+            logger.warning(f"Sekin so'rov ({elapsed * 1000:.1f} ms, {rows} qator): {stats.sql}")
+
+    def top(self, limit: Optional[int] = None) -> List[StatementStats]:
+        """So'rovlar umumiy vaqt bo'yicha kamayish tartibida"""
+        with self._lock:
+            items = sorted(self._stats.values(), key=lambda s: s.total, reverse=True)
+        return items[:limit] if limit else items
+
+    def report(self, limit: Optional[int] = None, sql_width: Optional[int] = 300, plans: bool = False) -> str:
+        """
+        Matnli hisobot
+
+        Args:
+            limit: Ko'rsatiladigan so'rovlar soni (None - hammasi)
+            sql_width: So'rov matni uzunligi chegarasi (None - to'liq)
+            plans: So'rov rejalarini ham qo'shish
+
+        Returns:
+            str: Hisobot matni
+        """
+        items = self.top()
+        minutes = (time.time() - self.started_at) / 60
+        lines = [
+            f"🐢 SQL profiler: {len(items)} ta so'rov, {minutes:.0f} daqiqa davomida "
+            f"(sekin chegarasi {self.slow_ms:.0f} ms)",
+        ]
+        scans = sum(1 for s in items if s.full_scan)
+        if scans:
+            lines.append(f"⚠️ To'liq skanerlash: {scans} ta so'rov")
+        if self.dropped:
+            lines.append(f"Kuzatilmagan yangi so'rovlar: {self.dropped}")
+
+        for number, stats in enumerate(items[:limit] if limit else items, start=1):
+            avg = stats.total / stats.calls if stats.calls else 0
+            flags = " ⚠️SCAN" if stats.full_scan else ""
+            if stats.slow:
+                flags += f" 🐢{stats.slow}"
+            sql = stats.sql
+            if sql_width and len(sql) > sql_width:
+                sql = sql[:sql_width] + "…"
+            lines.append("")
+            lines.append(
+                f"{number}. {stats.total * 1000:.1f} ms | {stats.calls} marta | o'rtacha {avg * 1000:.2f} ms | "
+                f"max {stats.max * 1000:.1f} ms | {stats.rows} qator{flags}"
+            )
+            lines.append(sql)
+            if plans and stats.plan:
+                lines.extend(f"    {detail}" for detail in stats.plan)
+        return "\n".join(lines)
+
+
+# Umumiy profiler (main.py dan sozlanadi)
+profiler = QueryProfiler()
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Bajarilish va fetch vaqtlarini profilerga yozadigan kursor"""
+
+    _stats: Optional[StatementStats] = None
+    _elapsed = 0.0
+    _rows = 0
+
+    def execute(self, sql: str, parameters: Any = ()) -> "ProfiledCursor":
+        stats = profiler.lookup(sql, self.connection, parameters)
+        started = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        finally:
+            self._start(stats, time.perf_counter() - started)
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> "ProfiledCursor":
+        # Reja birinchi parametrlar to'plami bilan olinadi (generator bo'lsa ro'yxatga aylantiriladi)
+        if not isinstance(seq_of_parameters, (list, tuple)):
+            seq_of_parameters = list(seq_of_parameters)
+        if not seq_of_parameters:
+            return super().executemany(sql, seq_of_parameters)
+        stats = profiler.lookup(sql, self.connection, seq_of_parameters[0])
+        started = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        finally:
+            self._start(stats, time.perf_counter() - started)
+        return self
+
+    def fetchone(self) -> Any:
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(time.perf_counter() - started, 0 if row is None else 1, row is None)
+        return row
+
+    def fetchmany(self, size: int = -1) -> List[Any]:
+        started = time.perf_counter()
+        rows = super().fetchmany(size) if size != -1 else super().fetchmany()
+        self._fetched(time.perf_counter() - started, len(rows), not rows)
+        return rows
+
+    def fetchall(self) -> List[Any]:
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(time.perf_counter() - started, len(rows), True)
+        return rows
+
+    def close(self) -> None:
+        self._finish()
+        super().close()
+
+    def __del__(self) -> None:
+        # Natijasi oxirigacha o'qilmagan kursorlar (masalan, bitta fetchone)
+        self._finish()
+
+    def _finish(self) -> None:
+        """Joriy bajarilishni yakunlash"""
+        if self._stats is not None:
+            profiler.finish(self._stats, self._elapsed, self._rows)
+            self._stats = None
+
+    def _start(self, stats: Optional[StatementStats], elapsed: float) -> None:
+        """Yangi bajarilish: execute vaqti va o'zgartirilgan qatorlar"""
+        self._finish()
+        self._stats = stats
+        self._elapsed = elapsed
+        self._rows = max(self.rowcount, 0)
+        if stats is None:
+            return
+        profiler.record(stats, elapsed, self._rows, call=True)
+        # Natija qaytarmaydigan so'rovlar shu yerda tugaydi
+        if self.description is None:
+            self._finish()
+
+    def _fetched(self, elapsed: float, rows: int, exhausted: bool) -> None:
+        """Fetch vaqti va qaytgan qatorlar; natija tugaganda bajarilish yakunlanadi"""
+        stats = self._stats
+        if stats is None:
+            return
+        self._elapsed += elapsed
+        self._rows += rows
+        profiler.record(stats, elapsed, rows, call=False)
+        if exhausted:
+            self._finish()
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Kursorlari ProfiledCursor bo'lgan sqlite3 ulanishi"""
+
+    def cursor(self, factory: type = ProfiledCursor) -> sqlite3.Cursor:
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -0,0 +1,139 @@
+import calendar
+import datetime
+from typing import Optional, Tuple
+
+# Takrorlanish turlari
+RECURRENCE_KINDS = ("daily", "weekdays", "weekly", "monthly", "hours")
+
+# "Har N soatda" uchun ruxsat etilgan oraliq
+MAX_RECURRENCE_HOURS = 24
+
+# "hours" takrorlanishlari shu sanadan boshlanadigan N soatlik to'rda yotadi
+HOURS_EPOCH = datetime.datetime(2000, 1, 1)
+
+# Qoida matni (tasks.recurrence ustunida saqlanadi):
+#   daily@HH:MM, weekdays@HH:MM, weekly:<hafta kuni 0-6>@HH:MM,
+#   monthly:<oy kuni 1-31>@HH:MM, hours:<N>@<bosqich HH:MM>
+# Vaqt qoidaning o'zida saqlanadi: kechiktirish task_time ni o'zgartirsa ham
+# keyingi takrorlanish asl vaqtda bo'ladi. "hours" uchun @ dan keyin to'rning
+# HOURS_EPOCH dan siljishi (bosqich) turadi; bosqichsiz eski "hours:<N>"
+# qoidalari taskning joriy vaqtidan sanaladi.
+
+
+def make_rule(kind: str, start: datetime.datetime, hours: Optional[int] = None) -> str:
+    """
+    Birinchi takrorlanish vaqtidan qoida matnini yaratish
+
+    Args:
+        kind: Takrorlanish turi (RECURRENCE_KINDS dan)
+        start: Taskning joriy vaqti (hafta kuni, oy kuni va soat shundan olinadi)
+        hours: "hours" turi uchun oraliq (soat)
+
+    Returns:
+        str: Qoida matni
+    """
+    at = start.strftime("%H:%M")
+    if kind in ("daily", "weekdays"):
+        return f"{kind}@{at}"
+    if kind == "weekly":
+        return f"weekly:{start.weekday()}@{at}"
+    if kind == "monthly":
+        return f"monthly:{start.day}@{at}"
+    if kind == "hours":
+        if not hours or not 1 <= hours <= MAX_RECURRENCE_HOURS:
+            raise ValueError(f"Noto'g'ri soat oralig'i: {hours}")
+        phase = (start - HOURS_EPOCH) % datetime.timedelta(hours=hours)
+        return f"hours:{hours}@{(HOURS_EPOCH + phase).strftime('%H:%M')}"
+    raise ValueError(f"Noma'lum takrorlanish turi: {kind}")
+
+
+def parse_rule(rule: str) -> Tuple[str, Optional[int], Optional[datetime.time]]:
+    """
+    Qoida matnini (tur, argument, vaqt) ga ajratish
+
+    Args:
+        rule: Qoida matni
+
+    Returns:
+        Tuple: (tur, argument yoki None, kun vaqti yoki None)
+    """
+    body, _, at = rule.partition("@")
+    kind, _, arg = body.partition(":")
+    if kind not in RECURRENCE_KINDS:
+        raise ValueError(f"Noma'lum takrorlanish qoidasi: {rule}")
+
+    time_of_day = datetime.datetime.strptime(at, "%H:%M").time() if at else None
+    if kind != "hours" and time_of_day is None:
+        raise ValueError(f"Qoidada vaqt ko'rsatilmagan: {rule}")
+    return kind, int(arg) if arg else None, time_of_day
+
+
+def next_occurrence(rule: str, current: datetime.datetime, after: datetime.datetime) -> datetime.datetime:
+    """
+    Qoida bo'yicha `after` dan keyingi birinchi takrorlanish vaqti
+
+    O'tkazib yuborilgan takrorlanishlar tashlab ketiladi: natija doim
+    `after` dan keyin bo'ladi.
+
+    Args:
+        rule: Qoida matni
+        current: Taskning joriy vaqti (bosqichsiz eski "hours" qoidasi uchun sanoq boshi)
+        after: Shu vaqtdan keyingi takrorlanish qidiriladi
+
+    Returns:
+        datetime.datetime: Keyingi takrorlanish vaqti (daqiqagacha aniqlikda)
+    """
+    kind, arg, time_of_day = parse_rule(rule)
+    after = after.replace(second=0, microsecond=0)
+
+    if kind == "hours":
+        step = datetime.timedelta(hours=arg)
+        if time_of_day:
+            # Kechiktirilgan joriy vaqt emas, qoidadagi to'r asos bo'ladi
+            anchor = datetime.datetime.combine(HOURS_EPOCH.date(), time_of_day)
+        elif current > after:
+            return current
+        else:
+            anchor = current
+        # Nechta oraliq o'tib ketganini bitta bo'lish bilan topish
+        missed = (after - anchor) // step + 1
+        return anchor + missed * step
+
+    day = after.date()
+    if kind == "monthly":
+        year, month = day.year, day.month
+        while True:
+            candidate = datetime.datetime.combine(
+                datetime.date(year, month, min(arg, calendar.monthrange(year, month)[1])), time_of_day
+            )
+            if candidate > after:
+                return candidate
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    if kind == "weekly":
+        day += datetime.timedelta(days=(arg - day.weekday()) % 7)
+        step_days = 7
+    else:
+        step_days = 1
+
+    while True:
+        candidate = datetime.datetime.combine(day, time_of_day)
+        if candidate > after and (kind != "weekdays" or day.weekday() < 5):
+            return candidate
+        day += datetime.timedelta(days=step_days)
+
+
+def describe_rule(rule: str) -> str:
+    """Qoidaning foydalanuvchiga ko'rsatiladigan tavsifi"""
+    kind, arg, time_of_day = parse_rule(rule)
+    at = time_of_day.strftime("%H:%M") if time_of_day else ""
+    if kind == "daily":
+        return f"har kuni {at} da"
+    if kind == "weekdays":
+        return f"ish kunlari {at} da"
+    if kind == "weekly":
+        weekdays = ["dushanba", "seshanba", "chorshanba", "payshanba", "juma", "shanba", "yakshanba"]
+        return f"har {weekdays[arg]} {at} da"
+    if kind == "monthly":
+        return f"har oyning {arg}-kuni {at} da"
+    return f"har {arg} soatda"
@@ -1,3 +1,3 @@
-from handlers import task, notification, admin, middleware
+from handlers import task, notification, admin, middleware, transfer, search
 
-__all__ = ['task', 'notification', 'admin', 'middleware'] 
\ No newline at end of file
+__all__ = ['task', 'notification', 'admin', 'middleware', 'transfer', 'search'] 
\ No newline at end of file
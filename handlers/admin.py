@@ -1,8 +1,9 @@
 import logging
-from typing import Union, List, Dict, Any
+from typing import Union, List, Dict, Any, Optional
 from aiogram import Router, Bot, F
-from aiogram.filters import Command
-from aiogram.types import Message, CallbackQuery
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramNotFound, TelegramRetryAfter
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message, CallbackQuery, BufferedInputFile
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
@@ -11,8 +12,14 @@ from database import (
     add_user, set_config, get_config, add_post_channel, 
     get_post_channels, remove_post_channel, get_user_count, 
     get_completed_tasks_count, get_snoozed_tasks_count, get_active_tasks_count,
-    get_tasks_per_user
+    get_tasks_per_user, get_statistics, get_rollups, search_tasks,
+    create_broadcast, get_broadcast, set_broadcast_status,
+    get_sendable_post_channels, record_channel_success, record_channel_failure, resume_post_channel
 )
+from database.profiler import profiler
+from utils import clock
+from utils.batching import EventBatcher
+from utils.broadcast import get_progress_keyboard, start_broadcast
 
 # Router yaratish
 router = Router()
@@ -28,6 +35,9 @@ class AdminFSM(StatesGroup):
     waiting_channel_id = State()
     # Post kanal
     waiting_post_channel = State()
+    # Ommaviy xabar
+    waiting_broadcast_message = State()
+    confirm_broadcast = State()
 
 
 # Adminligini tekshirish uchun funksiya
@@ -42,12 +52,69 @@ def get_admin_keyboard():
     keyboard = InlineKeyboardBuilder()
     keyboard.button(text="📌 Majburiy obuna sozlash", callback_data="admin:force_subscribe")
     keyboard.button(text="📤 Add Post Channel", callback_data="admin:add_post_channel")
+    keyboard.button(text="🩺 Kanallar holati", callback_data="admin:channel_health")
     keyboard.button(text="📊 Statistikani ko'rish", callback_data="admin:statistics")
+    keyboard.button(text="📈 Trendlar", callback_data="admin:trends")
+    keyboard.button(text="📣 Ommaviy xabar", callback_data="admin:broadcast")
     keyboard.button(text="🔙 Orqaga / Exit", callback_data="admin:exit")
     keyboard.adjust(1)  # 1 qatorda 1 ta tugma
     return keyboard.as_markup()
 
 
+def render_channel_health(channels: List[Dict[str, Any]]) -> str:
+    """Post kanallar holati matnini yasash"""
+    if not channels:
+        return "🩺 Kanallar holati\n\nPost kanallar qo'shilmagan."
+    
+    lines = ["🩺 Kanallar holati", ""]
+    for ch in channels:
+        name = f"{ch['channel_name'] or ch['channel_id']} ({ch['channel_id']})"
+        if ch["suspended"]:
+            lines.append(f"⛔ {name} — to'xtatilgan, {ch['fail_count']} ta ketma-ket xato")
+        elif ch["fail_count"]:
+            lines.append(f"⏳ {name} — {ch['fail_count']} ta xato, keyingi urinish {ch['retry_after']}")
+        else:
+            lines.append(f"✅ {name} — ishlayapti (oxirgi tiklanish: {ch['last_success'] or '—'})")
+        if ch["last_error"]:
+            lines.append(f"   Xato: {ch['last_error']}")
+    return "\n".join(lines)
+
+
+# Trendlar uchun sparkline
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+# Trend ko'rinishidagi metrikalar va ularning nomlari
+TREND_LABELS = [
+    ("tasks_created", "🆕 Yaratilgan"),
+    ("tasks_completed", "✅ Bajarilgan"),
+    ("tasks_snoozed", "⏰ Kechiktirilgan"),
+    ("reminders_sent", "🔔 Eslatmalar"),
+    ("new_users", "👥 Yangi userlar"),
+]
+
+
+def render_sparkline(values: List[int]) -> str:
+    """Qiymatlar ro'yxatidan bir qatorli sparkline yasash"""
+    peak = max(values) if values else 0
+    if peak == 0:
+        return SPARK_CHARS[0] * len(values)
+    return "".join(SPARK_CHARS[value * (len(SPARK_CHARS) - 1) // peak] for value in values)
+
+
+def render_trends(daily: Dict[str, List[int]], hourly: Dict[str, List[int]]) -> str:
+    """Kunlik va soatlik yig'indilardan trend matnini yasash"""
+    lines = ["📈 Trendlar", "", f"Oxirgi {len(next(iter(daily.values())))} kun:"]
+    for metric, label in TREND_LABELS:
+        values = daily[metric]
+        lines.append(f"{label}: {render_sparkline(values)} jami {sum(values)}, bugun {values[-1]}")
+    
+    lines += ["", f"Oxirgi {len(next(iter(hourly.values())))} soat:"]
+    for metric, label in TREND_LABELS:
+        values = hourly[metric]
+        lines.append(f"{label}: {render_sparkline(values)} jami {sum(values)}")
+    return "\n".join(lines)
+
+
 # Admin komandasi handler
 @router.message(Command("admin"))
 async def cmd_admin(message: Message, state: FSMContext):
@@ -138,20 +205,16 @@ async def admin_callback_handler(callback: CallbackQuery, state: FSMContext):
     
     # Statistika
     if action == "statistics":
-        # Statistikani olish
-        user_count = await get_user_count()
-        completed_tasks = await get_completed_tasks_count()
-        snoozed_tasks = await get_snoozed_tasks_count()
-        active_tasks = await get_active_tasks_count()
-        tasks_per_user = await get_tasks_per_user()
+        # Statistikani bitta snapshotdan olish (faqat o'qish ulanishi orqali)
+        stats = await get_statistics()
         
         stats_text = (
             "📊 Statistika\n\n"
-            f"👥 Foydalanuvchilar soni: {user_count}\n"
-            f"✅ Bajarilgan tasklar soni: {completed_tasks}\n"
-            f"⏰ Kechiktirilgan tasklar soni: {snoozed_tasks}\n"
-            f"📆 Aktiv tasklar soni: {active_tasks}\n"
-            f"📈 O'rtacha task/user: {tasks_per_user:.2f}"
+            f"👥 Foydalanuvchilar soni: {stats['user_count']}\n"
+            f"✅ Bajarilgan tasklar soni: {stats['completed_tasks']}\n"
+            f"⏰ Kechiktirilgan tasklar soni: {stats['snoozed_tasks']}\n"
+            f"📆 Aktiv tasklar soni: {stats['active_tasks']}\n"
+            f"📈 O'rtacha task/user: {stats['tasks_per_user']:.2f}"
         )
         
         await callback.message.edit_text(
@@ -162,6 +225,55 @@ async def admin_callback_handler(callback: CallbackQuery, state: FSMContext):
         )
         return
     
+    # Trendlar (oldindan yig'ilgan rollup jadvallaridan)
+    if action == "trends":
+        daily = await get_rollups("day", 14)
+        hourly = await get_rollups("hour", 24)
+        
+        await callback.message.edit_text(
+            render_trends(daily, hourly),
+            reply_markup=InlineKeyboardBuilder().button(
+                text="🔙 Orqaga", callback_data="admin:main_menu"
+            ).as_markup()
+        )
+        return
+    
+    # Post kanallar holati
+    if action in ("channel_health", "channel_resume"):
+        if action == "channel_resume" and len(data) > 2:
+            await resume_post_channel(data[2])
+        
+        channels = await get_post_channels()
+        keyboard = InlineKeyboardBuilder()
+        for ch in channels:
+            if ch["suspended"]:
+                keyboard.button(
+                    text=f"▶️ {ch['channel_name'] or ch['channel_id']} ni qayta yoqish",
+                    callback_data=f"admin:channel_resume:{ch['channel_id']}"
+                )
+        keyboard.button(text="🔙 Orqaga", callback_data="admin:main_menu")
+        keyboard.adjust(1)
+        
+        try:
+            await callback.message.edit_text(render_channel_health(channels), reply_markup=keyboard.as_markup())
+        except TelegramBadRequest:
+            # Matn o'zgarmagan
+            pass
+        await callback.answer()
+        return
+    
+    # Ommaviy xabar
+    if action == "broadcast":
+        await state.set_state(AdminFSM.waiting_broadcast_message)
+        await callback.message.edit_text(
+            "📣 Ommaviy xabar\n\nBarcha foydalanuvchilarga yuboriladigan xabarni yuboring "
+            "(matn, rasm, video yoki boshqa turdagi xabar).",
+            reply_markup=InlineKeyboardBuilder().button(
+                text="🔙 Orqaga", callback_data="admin:main_menu"
+            ).as_markup()
+        )
+        return
+    
     await callback.answer()
 
 
@@ -219,16 +331,194 @@ async def process_post_channel(message: Message, state: FSMContext):
         )
 
 
+# Ommaviy xabar matnini qabul qilish
+@router.message(AdminFSM.waiting_broadcast_message)
+async def process_broadcast_message(message: Message, state: FSMContext):
+    """Ommaviy xabarni qabul qilib, tasdiqlashni so'rash"""
+    if not is_admin(message.from_user.id):
+        return
+    
+    await state.set_state(AdminFSM.confirm_broadcast)
+    await state.update_data(broadcast_chat_id=message.chat.id, broadcast_message_id=message.message_id)
+    
+    stats = await get_statistics()
+    keyboard = InlineKeyboardBuilder()
+    keyboard.button(text="✅ Yuborish", callback_data="broadcast:confirm")
+    keyboard.button(text="❌ Bekor qilish", callback_data="admin:main_menu")
+    keyboard.adjust(2)
+    await message.answer(
+        f"Yuqoridagi xabar {stats['user_count']} ta aktiv foydalanuvchiga yuboriladi. Tasdiqlaysizmi?",
+        reply_markup=keyboard.as_markup()
+    )
+
+
+# Ommaviy xabarni boshlash va to'xtatish
+@router.callback_query(F.data.startswith("broadcast:"))
+async def broadcast_callback_handler(callback: CallbackQuery, state: FSMContext):
+    """Ommaviy xabarni tasdiqlash yoki to'xtatish tugmalari"""
+    if not is_admin(callback.from_user.id):
+        await callback.answer("Sizda bu funksiyadan foydalanish huquqi yo'q", show_alert=True)
+        return
+    
+    parts = callback.data.split(":")
+    
+    if parts[1] == "confirm":
+        data = await state.get_data()
+        if await state.get_state() != AdminFSM.confirm_broadcast.state or "broadcast_message_id" not in data:
+            await callback.answer("Xabar topilmadi, qaytadan boshlang", show_alert=True)
+            return
+        
+        await state.clear()
+        progress = await callback.message.edit_text("📣 Ommaviy xabar boshlanmoqda...")
+        broadcast_id = await create_broadcast(
+            callback.from_user.id, data["broadcast_chat_id"], data["broadcast_message_id"],
+            progress.message_id
+        )
+        await callback.message.edit_reply_markup(reply_markup=get_progress_keyboard(broadcast_id))
+        start_broadcast(callback.bot, broadcast_id)
+        await callback.answer("Yuborish boshlandi")
+        return
+    
+    if parts[1] == "cancel" and len(parts) > 2 and parts[2].isdigit():
+        broadcast = await get_broadcast(int(parts[2]))
+        if broadcast and broadcast["status"] == "running":
+            await set_broadcast_status(broadcast["id"], "cancelled")
+            await callback.answer("To'xtatilmoqda...")
+        else:
+            await callback.answer("Ommaviy xabar allaqachon tugagan")
+        return
+    
+    await callback.answer()
+
+
+# Barcha foydalanuvchilar tasklari bo'yicha qidiruv
+ADMIN_SEARCH_LIMIT = 20
+
+
+@router.message(Command("findall"))
+async def cmd_find_all(message: Message, command: CommandObject):
+    """Admin uchun barcha tasklar bo'yicha to'liq matnli qidiruv: /findall <matn>"""
+    if not is_admin(message.from_user.id):
+        await message.answer("Sizda bu funksiyadan foydalanish huquqi yo'q")
+        return
+    
+    query = (command.args or "").strip()
+    if not query:
+        await message.answer("Foydalanish: /findall <matn>")
+        return
+    
+    tasks = await search_tasks(query, None, limit=ADMIN_SEARCH_LIMIT)
+    if not tasks:
+        await message.answer(f"🔍 «{query}» bo'yicha hech narsa topilmadi.")
+        return
+    
+    lines = [f"🔍 «{query}» bo'yicha eng mos {len(tasks)} ta task:", ""]
+    for task in tasks:
+        lines.append(f"👤 {task.user_id} | {task.status} | {task.task_datetime} | {task.task_name}")
+    await message.answer("\n".join(lines))
+
+
+# /queries xabarida ko'rsatiladigan so'rovlar soni
+QUERY_REPORT_LIMIT = 10
+
+
+@router.message(Command("queries"))
+async def cmd_queries(message: Message, command: CommandObject):
+    """Admin uchun SQL profiler hisoboti: /queries, /queries file yoki /queries reset"""
+    if not is_admin(message.from_user.id):
+        await message.answer("Sizda bu funksiyadan foydalanish huquqi yo'q")
+        return
+    
+    if not profiler.enabled:
+        await message.answer("SQL profiler o'chiq. Yoqish uchun .env fayliga SQL_PROFILE=1 qo'shing.")
+        return
+    
+    action = (command.args or "").strip().lower()
+    if action == "reset":
+        profiler.reset()
+        await message.answer("🧹 SQL profiler statistikasi tozalandi")
+        return
+    
+    if action == "file":
+        # To'liq hisobot: barcha so'rovlar to'liq matni va rejalari bilan
+        report = profiler.report(sql_width=None, plans=True)
+        filename = f"sql_profile_{clock.now().strftime('%Y%m%d_%H%M')}.txt"
+        await message.answer_document(
+            BufferedInputFile(report.encode("utf-8"), filename=filename),
+            caption="🐢 SQL profiler hisoboti"
+        )
+        return
+    
+    report = profiler.report(limit=QUERY_REPORT_LIMIT, sql_width=200)
+    if len(report) > 3900:
+        report = report[:3900] + "…"
+    await message.answer(f"{report}\n\n📄 /queries file - to'liq hisobot, /queries reset - tozalash")
+
+
+# Kanal postlari va admin xabarlarini jamlash (main.py dan setup_digests orqali sozlanadi)
+task_post_batcher: Optional[EventBatcher] = None
+new_user_batcher: Optional[EventBatcher] = None
+
+
+def setup_digests(bot: Bot, window: float, max_items: int):
+    """
+    Yangi task postlari va yangi foydalanuvchi xabarlarini jamlashni yoqish
+    
+    Args:
+        bot: Bot obyekti
+        window: Jamlash oynasi (sekund, 0 - jamlamasdan darhol yuborish)
+        max_items: Oyna tugashini kutmasdan yuborish chegarasi
+    """
+    global task_post_batcher, new_user_batcher
+    task_post_batcher = EventBatcher(
+        "Kanal postlari", lambda items: send_task_posts(bot, items), window, max_items
+    )
+    new_user_batcher = EventBatcher(
+        "Yangi foydalanuvchilar", lambda items: send_new_user_alerts(bot, items), window, max_items
+    )
+
+
+async def close_digests():
+    """Yig'ilib turgan jamlanmalarni darhol yuborish (bot to'xtaganda)"""
+    for batcher in (task_post_batcher, new_user_batcher):
+        if batcher is not None:
+            await batcher.close()
+
+
 # Yangi foydalanuvchilar uchun adminga xabar yuborish
 # Bu funksiya boshqa joylarda chaqiriladi
 async def notify_admins_new_user(bot: Bot, user_id: int, username: str, full_name: str):
-    """Adminlarga yangi foydalanuvchi haqida xabar yuborish"""
+    """Adminlarga yangi foydalanuvchi haqida xabar yuborish (jamlash yoqilgan bo'lsa oynaga bir marta)"""
     if not ADMIN_IDS:
         logger.warning("Adminlar ro'yxati bo'sh, xabar yuborilmadi")
         return
     
-    user_mention = f"@{username}" if username else f"{user_id}"
-    message = f"🆕 Yangi foydalanuvchi qo'shildi: {full_name} ({user_mention}) – {user_id}"
+    if new_user_batcher is not None:
+        await new_user_batcher.add((user_id, username, full_name))
+    else:
+        await send_new_user_alerts(bot, [(user_id, username, full_name)])
+
+
+async def send_new_user_alerts(bot: Bot, users: List[tuple]):
+    """
+    Yangi foydalanuvchilar haqida har bir adminga bitta xabar yuborish
+    
+    Args:
+        bot: Bot obyekti
+        users: (user_id, username, full_name) ro'yxati
+    """
+    if len(users) == 1:
+        user_id, username, full_name = users[0]
+        user_mention = f"@{username}" if username else f"{user_id}"
+        message = f"🆕 Yangi foydalanuvchi qo'shildi: {full_name} ({user_mention}) – {user_id}"
+    else:
+        lines = [
+            f"• {full_name} ({f'@{username}' if username else user_id}) – {user_id}"
+            for user_id, username, full_name in users[:DIGEST_MAX_LINES]
+        ]
+        if len(users) > DIGEST_MAX_LINES:
+            lines.append(f"... va yana {len(users) - DIGEST_MAX_LINES} ta")
+        message = f"🆕 {len(users)} ta yangi foydalanuvchi qo'shildi:\n" + "\n".join(lines)
     
     for admin_id in ADMIN_IDS:
         try:
@@ -238,10 +528,21 @@ async def notify_admins_new_user(bot: Bot, user_id: int, username: str, full_nam
 
 
 # Obuna tekshirish funksiyasi 
-async def check_user_subscription(bot: Bot, user_id: int) -> bool:
-    """Foydalanuvchi majburiy kanalga obuna bo'lganmi tekshirish"""
+async def check_user_subscription(bot: Bot, user_id: int, channel_id: Optional[str] = None) -> bool:
+    """
+    Foydalanuvchi majburiy kanalga obuna bo'lganmi tekshirish
+    
+    Args:
+        bot: Bot obyekti
+        user_id: Foydalanuvchi ID
+        channel_id: Oldindan olingan majburiy kanal (berilmasa config dan o'qiladi)
+    
+    Returns:
+        bool: True agar obuna bo'lsa yoki majburiy obuna o'rnatilmagan bo'lsa
+    """
     # Majburiy kanal ID olish
-    channel_id = await get_config("REQUIRED_CHANNEL_ID")
+    if channel_id is None:
+        channel_id = await get_config("REQUIRED_CHANNEL_ID")
     
     if not channel_id:
         # Majburiy obuna o'rnatilmagan
@@ -260,30 +561,112 @@ async def check_user_subscription(bot: Bot, user_id: int) -> bool:
 
 
 # Task yuborilganda kanallarga post yuborish
+def format_user_info(user_id: int, username: str = None, full_name: str = None) -> str:
+    """Kanal postlari uchun foydalanuvchi haqida qisqa ma'lumot"""
+    if username:
+        return f"@{username}"
+    if full_name:
+        return full_name
+    return f"ID: {user_id}"
+
 async def post_new_task(bot: Bot, user_id: int, task_name: str, task_datetime: str, username: str = None, full_name: str = None):
-    """Yangi task yaratilganda post kanallarga yuborish"""
-    # Kanallar ro'yxati
-    channels = await get_post_channels()
-    if not channels:
+    """Yangi task yaratilganda post kanallarga yuborish (jamlash yoqilgan bo'lsa oynaga bir marta)"""
+    await post_new_tasks(bot, user_id, [(task_name, task_datetime)], username, full_name)
+
+# Bitta jamlanma xabarda ko'rsatiladigan qatorlar soni
+DIGEST_MAX_LINES = 20
+
+async def post_new_tasks(bot: Bot, user_id: int, tasks: List[tuple], username: str = None, full_name: str = None):
+    """
+    Bir nechta yangi taskni post kanallarga bitta jamlanma xabar bilan yuborish
+    
+    Args:
+        bot: Bot obyekti
+        user_id: Foydalanuvchi ID
+        tasks: (task nomi, task vaqti "YYYY-MM-DD HH:MM") ro'yxati
+        username: Foydalanuvchi username
+        full_name: Foydalanuvchi to'liq ismi
+    """
+    if not tasks:
         return
     
-    # Foydalanuvchi haqida ma'lumot
-    user_info = ""
-    if username:
-        user_info = f"@{username}"
-    elif full_name:
-        user_info = full_name
+    user_info = format_user_info(user_id, username, full_name)
+    items = [(task_name, task_datetime, user_info) for task_name, task_datetime in tasks]
+    if task_post_batcher is not None:
+        await task_post_batcher.add_many(items)
     else:
-        user_info = f"ID: {user_id}"
+        await send_task_posts(bot, items)
+
+async def send_task_posts(bot: Bot, items: List[tuple]):
+    """
+    Yangi tasklarni har bir post kanalga bitta xabar bilan yuborish
     
-    message_text = (
-        f"🆕 Yangi task: {task_name}\n"
-        f"📅 {task_datetime}\n"
-        f"👤 Foydalanuvchi: {user_info}"
-    )
+    Args:
+        bot: Bot obyekti
+        items: (task nomi, task vaqti, foydalanuvchi) ro'yxati
+    """
+    # To'xtatilgan va kutish vaqtidagi kanallarga API chaqiruvi qilinmaydi
+    channels = await get_sendable_post_channels()
+    if not channels:
+        return
+    
+    authors = {user_info for _, _, user_info in items}
+    if len(items) == 1:
+        task_name, task_datetime, user_info = items[0]
+        message_text = (
+            f"🆕 Yangi task: {task_name}\n"
+            f"📅 {task_datetime}\n"
+            f"👤 Foydalanuvchi: {user_info}"
+        )
+    else:
+        # Bitta foydalanuvchining tasklari bo'lsa, u oxirida bir marta ko'rsatiladi
+        lines = [
+            f"• {task_name} — {task_datetime}" + ("" if len(authors) == 1 else f" ({user_info})")
+            for task_name, task_datetime, user_info in items[:DIGEST_MAX_LINES]
+        ]
+        if len(items) > DIGEST_MAX_LINES:
+            lines.append(f"... va yana {len(items) - DIGEST_MAX_LINES} ta")
+        message_text = f"🆕 {len(items)} ta yangi task:\n" + "\n".join(lines)
+        if len(authors) == 1:
+            message_text += f"\n👤 Foydalanuvchi: {next(iter(authors))}"
     
     for channel in channels:
-        try:
-            await bot.send_message(channel['channel_id'], message_text)
-        except Exception as e:
-            logger.error(f"Kanallarga {channel['channel_id']} xabar yuborishda xatolik: {e}") 
\ No newline at end of file
+        await send_to_channel(bot, channel, message_text)
+
+# Kanal bilan bog'liq doimiy xatolar (xabar matniga emas, kanalga tegishli)
+PERMANENT_CHANNEL_ERRORS = ("chat not found", "not enough rights", "have no rights", "chat_write_forbidden")
+
+async def send_to_channel(bot: Bot, channel: Dict[str, Any], message_text: str) -> bool:
+    """
+    Post kanalga xabar yuborish va natijani kanal holatiga yozish
+    
+    Args:
+        bot: Bot obyekti
+        channel: get_sendable_post_channels dan olingan kanal
+        message_text: Xabar matni
+    
+    Returns:
+        bool: True agar yuborilgan bo'lsa
+    """
+    channel_id = channel['channel_id']
+    try:
+        await bot.send_message(channel_id, message_text)
+    except TelegramRetryAfter as e:
+        await record_channel_failure(channel_id, str(e), permanent=False, retry_seconds=e.retry_after)
+    except (TelegramForbiddenError, TelegramNotFound) as e:
+        logger.error(f"Kanal {channel_id} mavjud emas yoki bot chiqarilgan: {e}")
+        await record_channel_failure(channel_id, str(e), permanent=True)
+    except TelegramBadRequest as e:
+        permanent = any(marker in str(e).lower() for marker in PERMANENT_CHANNEL_ERRORS)
+        logger.error(f"Kanallarga {channel_id} xabar yuborishda xatolik: {e}")
+        if permanent:
+            await record_channel_failure(channel_id, str(e), permanent=True)
+    except Exception as e:
+        logger.error(f"Kanallarga {channel_id} xabar yuborishda xatolik: {e}")
+        await record_channel_failure(channel_id, str(e), permanent=False)
+    else:
+        # Sog' kanal uchun yozuv navbatiga ish qo'shilmaydi - faqat xato holatini tozalash kerak bo'lsa
+        if channel['fail_count'] or channel['retry_after']:
+            await record_channel_success(channel_id)
+        return True
+    return False
@@ -1,5 +1,6 @@
 import logging
-from typing import Callable, Dict, Any, Awaitable
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Awaitable, Optional
 from aiogram import BaseMiddleware
 from aiogram.types import Message, CallbackQuery, TelegramObject
 from aiogram.utils.keyboard import InlineKeyboardBuilder
@@ -8,6 +9,7 @@ from aiogram.exceptions import TelegramBadRequest
 
 from database import get_config
 from handlers.admin import check_user_subscription, is_admin
+from utils import clock
 
 logger = logging.getLogger(__name__)
 
@@ -160,4 +162,100 @@ class SubscriptionMiddleware(BaseMiddleware):
             # Har qanday xatolikda ham olib tashlash
             
         # Qayta ishlashni to'xtatish
-        return 
\ No newline at end of file
+        return
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Har bir foydalanuvchi uchun alohida token bucket bilan so'rovlar tezligini cheklovchi middleware.
+
+    Foydalanuvchi sekundiga o'rtacha `rate` ta, bir zumda ko'pi bilan `burst` ta
+    yangilanish yubora oladi. Chegaradan oshgan yangilanishlar handlerlarga
+    (va obuna tekshiruvi, baza so'rovlariga) yetib bormaydi: har bir "spam"
+    to'lqinida foydalanuvchiga bir marta qisqa ogohlantirish beriladi, qolganlari
+    jimgina tashlab yuboriladi.
+
+    Har bir aktiv foydalanuvchi uchun bitta kichik yozuv saqlanadi. Bucket to'lgan
+    (burst / rate sekund harakatsiz) foydalanuvchining yozuvi yo'q yozuvdan farq
+    qilmaydi, shuning uchun bunday yozuvlar navbat boshidan o'chirib boriladi.
+    """
+    
+    def __init__(self, rate: float, burst: int, notice: Optional[str] = "⏳ Juda tez! Biroz kuting."):
+        """
+        Args:
+            rate: Sekundiga ruxsat etilgan yangilanishlar soni
+            burst: Bir zumda ruxsat etilgan yangilanishlar soni
+            notice: Cheklangan foydalanuvchiga yuboriladigan xabar (None - jimgina tashlash)
+        
+        Raises:
+            ValueError: rate musbat bo'lmasa yoki burst 1 dan kichik bo'lsa
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError(f"Noto'g'ri tezlik chegarasi: rate={rate}, burst={burst}")
+        self.rate = rate
+        self.burst = burst
+        self.notice = notice
+        self.idle_after = burst / rate
+        self.throttled = 0
+        # user_id -> [tokens, oxirgi yangilanish vaqti, ogohlantirilganmi]; eng eskisi boshida
+        self._buckets: "OrderedDict[int, list]" = OrderedDict()
+    
+    def allow(self, user_id: int) -> Optional[bool]:
+        """
+        Foydalanuvchidan yana bitta yangilanish qabul qilish mumkinmi.
+        
+        Returns:
+            Optional[bool]: True - ruxsat, False - cheklangan (birinchi marta, ogohlantirish kerak),
+            None - cheklangan va allaqachon ogohlantirilgan
+        """
+        now = clock.monotonic()
+        
+        # Harakatsiz foydalanuvchilarni chiqarish (bucketlari allaqachon to'lgan)
+        while self._buckets:
+            oldest = next(iter(self._buckets.values()))
+            if now - oldest[1] < self.idle_after:
+                break
+            self._buckets.popitem(last=False)
+        
+        bucket = self._buckets.pop(user_id, None)
+        if bucket is None:
+            bucket = [float(self.burst), now, False]
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        self._buckets[user_id] = bucket
+        
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            bucket[2] = False
+            return True
+        
+        self.throttled += 1
+        if bucket[2]:
+            return None
+        bucket[2] = True
+        return False
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        user = getattr(event, "from_user", None)
+        if user is None or is_admin(user.id):
+            return await handler(event, data)
+        
+        allowed = self.allow(user.id)
+        if allowed:
+            return await handler(event, data)
+        
+        if allowed is False and self.notice:
+            logger.info(f"Foydalanuvchi {user.id} so'rovlari cheklandi")
+            try:
+                # Message uchun qisqa javob, CallbackQuery uchun bildirishnoma
+                if isinstance(event, (Message, CallbackQuery)):
+                    await event.answer(self.notice)
+            except Exception as e:
+                logger.error(f"Cheklov xabarini yuborishda xatolik: {e}")
+        return
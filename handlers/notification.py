@@ -1,16 +1,23 @@
 import logging
-from typing import Dict, Any
+from datetime import datetime
+from html import escape
+from typing import Dict, Any, List
 
 from aiogram import Router, Bot, types
 from aiogram.enums import ParseMode
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 from database import db
-from utils import scheduler
+from database.models import Task
+from utils import clock, scheduler
+from utils.delivery import BulkSender
 
 # Router yaratish
 router = Router()
 
+# Jamlanmada ko'rsatiladigan tasklar soni (Telegram xabar uzunligi chegarasi uchun)
+DIGEST_MAX_TASKS = 30
+
 # Notification uchun inline klaviatura
 def get_notification_keyboard(task_id: int) -> InlineKeyboardMarkup:
     """
@@ -53,6 +60,7 @@ async def send_task_notification(bot: Bot, user_id: int, task_id: int, task_name
             parse_mode=None,  # Markdown formatini o'chirib qo'yamiz
             reply_markup=get_notification_keyboard(task_id)
         )
+        await db.record_reminder_sent()
         
         # Eslatma loopini boshlatish - task id ni ham task_name ga qo'shamiz
         # MUHIM: Task statusini o'zgartirmaymiz - loop to'xtatilsa ham activ bo'lib qoladi
@@ -96,6 +104,7 @@ async def send_reminder_message(user_id: int, task_name: str) -> None:
             parse_mode=None,  # Markdown formatini o'chirib qo'yamiz
             reply_markup=get_notification_keyboard(task_id)
         )
+        await db.record_reminder_sent()
     except Exception as e:
         logging.error(f"Reminder xabarini yuborishda xatolik: {e}, task_name: {task_name}")
 
@@ -145,10 +154,88 @@ async def process_complete(callback_query: types.CallbackQuery) -> None:
     else:
         logging.warning(f"Task ID {task_id} uchun eslatma loopi topilmadi")
     
-    # Taskni bajarilgan deb belgilash
-    await db.mark_task_completed(task_id)
+    # Taskni bajarilgan deb belgilash (takrorlanuvchi task keyingi vaqtga suriladi)
+    next_datetime = await db.mark_task_completed(task_id)
+    
+    if next_datetime:
+        next_str = datetime.strptime(next_datetime, "%Y-%m-%d %H:%M").strftime("%d.%m.%Y %H:%M")
+        await callback_query.answer(f"Bajarildi! Keyingi eslatma: {next_str}")
+        await callback_query.message.edit_text(
+            f"{callback_query.message.text}\n\n✅ Bajarildi! 🔁 Keyingi eslatma: {next_str}",
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="⏹ Takrorlashni to'xtatish", callback_data=f"stoprepeat_{task_id}")]
+            ])
+        )
+        return
     
     await callback_query.answer("Task bajarilgan deb belgilandi!")
     await callback_query.message.edit_text(
         f"{callback_query.message.text}\n\n✅ Bajarilgan deb belgilandi!"
-    ) 
\ No newline at end of file
+    )
+
+# Takrorlashni to'xtatish callback handler
+@router.callback_query(lambda c: c.data.startswith("stoprepeat_"))
+async def process_stop_repeat(callback_query: types.CallbackQuery) -> None:
+    """
+    "⏹ Takrorlashni to'xtatish" tugmasi: takrorlanishni o'chiradi va taskni yopadi.
+    
+    Args:
+        callback_query: Callback query obyekti
+    """
+    user_id = callback_query.from_user.id
+    task_id = int(callback_query.data.split("_")[1])
+    
+    # Joriy takrorlanish allaqachon bajarilgan (va hisoblangan) - keyingisi ham kerak emas
+    if not await db.stop_task_recurrence(task_id, user_id):
+        await callback_query.answer("Task topilmadi")
+        await callback_query.message.edit_reply_markup(reply_markup=None)
+        return
+    
+    await callback_query.answer("Takrorlash to'xtatildi")
+    await callback_query.message.edit_text(
+        f"{callback_query.message.text}\n\n⏹ Takrorlash to'xtatildi."
+    ) 
+
+def render_daily_digest(tasks: List[Task]) -> str:
+    """
+    Ertalabki jamlanma matnini yaratish.
+    
+    Args:
+        tasks: Shu kungi tasklar (vaqt bo'yicha tartiblangan)
+        
+    Returns:
+        str: HTML formatidagi xabar matni
+    """
+    lines = [f"🌅 <b>Xayrli tong! Bugun {len(tasks)} ta taskingiz bor:</b>", ""]
+    for task in tasks[:DIGEST_MAX_TASKS]:
+        icon = "🔁" if task.recurrence else ("💤" if task.status == "snoozed" else "🕒")
+        lines.append(f"{icon} {task.task_datetime[11:16]} — {escape(task.task_name)}")
+    if len(tasks) > DIGEST_MAX_TASKS:
+        lines.append(f"... va yana {len(tasks) - DIGEST_MAX_TASKS} ta")
+    lines.append("")
+    lines.append("Jamlanmani o'chirish: /digest")
+    return "\n".join(lines)
+
+async def send_daily_digest(bot: Bot) -> Dict[str, int]:
+    """
+    Obunachilarga bugungi tasklar jamlanmasini yuboradi.
+    
+    Tasklar bitta guruhlangan o'qish oqimidan olinadi va har bir guruh
+    darhol matnga aylantirilib umumiy tezlik chegarasi ostida yuboriladi,
+    shuning uchun barcha obunachilar xotiraga yig'ilmaydi.
+    
+    Args:
+        bot: Bot obyekti
+        
+    Returns:
+        Dict: sent, failed va blocked soni
+    """
+    today = clock.now().date()
+    async with BulkSender(bot) as sender:
+        async for user_id, tasks in db.iter_digest_groups(today):
+            await sender.send(user_id, render_daily_digest(tasks), parse_mode=ParseMode.HTML)
+    
+    # Botni bloklaganlarga keyingi safar yubormaslik
+    await db.deactivate_users(sender.blocked)
+    logging.info(f"Ertalabki jamlanma yuborildi: {sender.stats}")
+    return sender.stats
@@ -0,0 +1,213 @@
+import logging
+from html import escape
+from typing import List, Optional, Tuple
+
+from aiogram import Router, types, F
+from aiogram.enums import ParseMode
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import (
+    InlineKeyboardMarkup, InlineKeyboardButton, InlineQueryResultArticle, InputTextMessageContent
+)
+
+from database import db
+from database.models import Task
+
+# Router yaratish
+router = Router()
+
+# Bitta sahifadagi natijalar soni
+SEARCH_PAGE_SIZE = 10
+
+# Inline rejimda bitta javobdagi natijalar soni (Telegram chegarasi 50)
+INLINE_PAGE_SIZE = 20
+
+# Natijalardagi status belgilari
+STATUS_ICONS = {"active": "⏳", "snoozed": "🔄", "completed": "✓"}
+
+# Holat mashinalari
+class SearchStates(StatesGroup):
+    waiting_for_query = State()
+
+def format_task_datetime(task: Task) -> str:
+    """Task vaqtini dd.mm.yyyy HH:MM ko'rinishida qaytaradi"""
+    value = task.task_datetime or ""
+    if len(value) < 16:
+        return task.task_time or ""
+    return f"{value[8:10]}.{value[5:7]}.{value[0:4]} {value[11:16]}"
+
+def render_search_results(query: str, tasks: List[Task], offset: int) -> str:
+    """
+    Qidiruv natijalari sahifasi matnini yaratadi.
+
+    Args:
+        query: Qidiruv matni
+        tasks: Joriy sahifadagi tasklar
+        offset: Sahifadagi birinchi natijaning tartib raqami (0 dan)
+
+    Returns:
+        str: HTML formatidagi matn
+    """
+    response = f"🔍 <b>«{escape(query)}» bo'yicha natijalar:</b>\n\n"
+    for number, task in enumerate(tasks, start=offset + 1):
+        icon = STATUS_ICONS.get(task.status, "•")
+        response += f"{number}. {icon} <b>{escape(task.task_name)}</b>\n"
+        response += f"📅 {format_task_datetime(task)}\n\n"
+    return response
+
+def get_search_keyboard(offset: int, has_next: bool) -> Optional[InlineKeyboardMarkup]:
+    """
+    Qidiruv natijalarini sahifalash tugmalari.
+
+    Args:
+        offset: Joriy sahifa boshi
+        has_next: Keyingi sahifa bormi
+    """
+    nav_row = []
+    if offset > 0:
+        nav_row.append(InlineKeyboardButton(
+            text="◀️", callback_data=f"find:{max(0, offset - SEARCH_PAGE_SIZE)}"
+        ))
+    if has_next:
+        nav_row.append(InlineKeyboardButton(text="▶️", callback_data=f"find:{offset + SEARCH_PAGE_SIZE}"))
+    return InlineKeyboardMarkup(inline_keyboard=[nav_row]) if nav_row else None
+
+async def build_search_page(user_id: int, query: str,
+                            offset: int = 0) -> Optional[Tuple[str, Optional[InlineKeyboardMarkup]]]:
+    """
+    Qidiruv natijalarining bitta sahifasini (matn va klaviatura) yaratadi.
+
+    Args:
+        user_id: Foydalanuvchi ID
+        query: Qidiruv matni
+        offset: Sahifa boshi
+
+    Returns:
+        Optional[Tuple]: (matn, klaviatura) yoki natija bo'lmasa None
+    """
+    # Keyingi sahifa borligini bilish uchun bitta ortiqcha natija olinadi
+    tasks = await db.search_tasks(query, user_id, limit=SEARCH_PAGE_SIZE + 1, offset=offset)
+    if not tasks:
+        return None
+
+    has_next = len(tasks) > SEARCH_PAGE_SIZE
+    tasks = tasks[:SEARCH_PAGE_SIZE]
+    return render_search_results(query, tasks, offset), get_search_keyboard(offset, has_next)
+
+async def answer_search(message: types.Message, state: FSMContext, query: str) -> None:
+    """
+    Qidiruvning birinchi sahifasini yuboradi va so'rovni sahifalash uchun saqlaydi.
+
+    Args:
+        message: Xabar obyekti
+        state: FSM holati
+        query: Qidiruv matni
+    """
+    await state.set_state(None)
+    await state.update_data(search_query=query)
+
+    try:
+        page = await build_search_page(message.from_user.id, query)
+    except Exception as e:
+        logging.error(f"User {message.from_user.id} qidiruvida xatolik: {e}")
+        await message.answer("❌ Qidirishda xatolik yuz berdi.")
+        return
+
+    if page is None:
+        await message.answer(f"🔍 «{query}» bo'yicha hech narsa topilmadi.", parse_mode=None)
+        return
+
+    text, keyboard = page
+    await message.answer(text, parse_mode=ParseMode.HTML, reply_markup=keyboard)
+
+# /find komandasi
+@router.message(Command("find"))
+async def cmd_find(message: types.Message, command: CommandObject, state: FSMContext) -> None:
+    """
+    /find <matn> komandasini qayta ishlaydi.
+
+    Args:
+        message: Xabar obyekti
+        command: Komanda argumentlari
+        state: FSM holati
+    """
+    query = (command.args or "").strip()
+    if query:
+        await answer_search(message, state, query)
+        return
+
+    await state.set_state(SearchStates.waiting_for_query)
+    await message.answer("🔍 Qidiriladigan so'zni yozing (masalan: non):")
+
+@router.message(SearchStates.waiting_for_query, F.text)
+async def process_search_query(message: types.Message, state: FSMContext) -> None:
+    """
+    Qidiruv matnini qabul qiladi.
+
+    Args:
+        message: Xabar obyekti
+        state: FSM holati
+    """
+    await answer_search(message, state, message.text.strip())
+
+@router.callback_query(F.data.startswith("find:"))
+async def search_page_callback(callback_query: types.CallbackQuery, state: FSMContext) -> None:
+    """
+    Qidiruv natijalarining boshqa sahifasini ko'rsatadi.
+
+    Args:
+        callback_query: Callback query
+        state: FSM holati
+    """
+    query = (await state.get_data()).get("search_query")
+    if not query:
+        await callback_query.answer("Qidiruv eskirgan, /find bilan qaytadan qidiring", show_alert=True)
+        return
+
+    try:
+        offset = max(0, int(callback_query.data.split(":", 1)[1]))
+    except ValueError:
+        await callback_query.answer("Noto'g'ri sahifa")
+        return
+
+    page = await build_search_page(callback_query.from_user.id, query, offset)
+    if page is None:
+        await callback_query.answer("Boshqa natija yo'q")
+        return
+
+    text, keyboard = page
+    await callback_query.message.edit_text(text, parse_mode=ParseMode.HTML, reply_markup=keyboard)
+    await callback_query.answer()
+
+@router.inline_query()
+async def inline_search(inline_query: types.InlineQuery) -> None:
+    """
+    Inline rejimda (@bot <matn>) foydalanuvchining o'z tasklarini qidiradi.
+
+    Natijalar offset orqali sahifalanadi: Telegram ro'yxat oxiriga yetganda
+    next_offset bilan keyingi sahifani so'raydi.
+
+    Args:
+        inline_query: Inline query
+    """
+    try:
+        offset = max(0, int(inline_query.offset or 0))
+    except ValueError:
+        offset = 0
+
+    tasks = await db.search_tasks(inline_query.query, inline_query.from_user.id,
+                                  limit=INLINE_PAGE_SIZE, offset=offset)
+    results = [
+        InlineQueryResultArticle(
+            id=str(task.id),
+            title=f"{STATUS_ICONS.get(task.status, '•')} {task.task_name}",
+            description=format_task_datetime(task),
+            input_message_content=InputTextMessageContent(
+                message_text=f"📌 {task.task_name}\n📅 {format_task_datetime(task)}"
+            )
+        )
+        for task in tasks
+    ]
+    next_offset = str(offset + INLINE_PAGE_SIZE) if len(tasks) == INLINE_PAGE_SIZE else ""
+    await inline_query.answer(results, cache_time=5, is_personal=True, next_offset=next_offset)
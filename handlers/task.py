@@ -1,21 +1,39 @@
-from datetime import datetime
+import asyncio
+from datetime import datetime, timedelta
+from html import escape
+import re
+from typing import List, Optional, Tuple
 import aiosqlite
 import logging
 from aiogram.exceptions import TelegramBadRequest
 
 from aiogram import Router, types, F, Bot
 from aiogram.enums import ParseMode
-from aiogram.filters import Command, CommandStart
+from aiogram.filters import Command, CommandStart, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup, any_state
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
 
 from database import db, add_user
-from handlers.admin import check_user_subscription, notify_admins_new_user, post_new_task
+from database.cache import task_list_cache, MISSING
+from database.models import Task
+from database.recurrence import describe_rule
+from handlers.admin import check_user_subscription, notify_admins_new_user, post_new_task, post_new_tasks
+from utils import clock
 
 # Router yaratish
 router = Router()
 
+# Fon rejimidagi vazifalar (GC ularni tugashidan oldin yig'ib olmasligi uchun)
+_background_tasks = set()
+
+def run_in_background(coro) -> asyncio.Task:
+    """Korutinani javobni kutdirmasdan fon rejimida ishga tushirish"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
 # Holat mashinalari
 class TaskStates(StatesGroup):
     waiting_for_name = State()
@@ -55,22 +73,26 @@ async def cmd_start(message: types.Message, state: FSMContext) -> None:
     full_name = message.from_user.full_name
     username = message.from_user.username
     
-    # Foydalanuvchini bazaga qo'shish
-    is_new_user = await add_user(user_id, full_name, username)
+    # Foydalanuvchini bazaga qo'shish va obunani tekshirish bir-biriga bog'liq
+    # emas - parallel bajariladi
+    async def check_subscription() -> Tuple[bool, Optional[str]]:
+        # Majburiy kanal bir marta o'qiladi: tekshiruvga ham, tugmaga ham shu qiymat
+        channel_id = await db.get_config("REQUIRED_CHANNEL_ID")
+        if not channel_id or not hasattr(router, 'bot'):
+            return True, channel_id
+        return await check_user_subscription(router.bot, user_id, channel_id), channel_id
     
-    # Yangi foydalanuvchi bo'lsa, adminlarga xabar yuborish
-    if is_new_user and hasattr(router, 'bot'):
-        await notify_admins_new_user(router.bot, user_id, username, full_name)
+    is_new_user, (subscribed, channel_id) = await asyncio.gather(
+        add_user(user_id, full_name, username),
+        check_subscription()
+    )
     
-    # Majburiy obunani tekshirish
-    subscribed = True
-    if hasattr(router, 'bot'):
-        subscribed = await check_user_subscription(router.bot, user_id)
+    # Yangi foydalanuvchi bo'lsa, adminlarga xabar yuborish (javobni kutdirmasdan)
+    if is_new_user and hasattr(router, 'bot'):
+        run_in_background(notify_admins_new_user(router.bot, user_id, username, full_name))
     
     if not subscribed:
         # Majburiy kanal uchun tugma yaratish
-        channel_id = await db.get_config("REQUIRED_CHANNEL_ID")
-        
         # Kanal nomini olish
         channel_name = channel_id
         try:
@@ -105,6 +127,24 @@ async def cmd_start(message: types.Message, state: FSMContext) -> None:
         reply_markup=get_main_keyboard()
     )
 
+# /digest komandasi - ertalabki jamlanmani yoqish/o'chirish
+@router.message(Command("digest"))
+async def cmd_digest(message: types.Message) -> None:
+    """
+    Ertalabki jamlanma obunasini almashtiradi.
+    
+    Args:
+        message: Xabar obyekti
+    """
+    enabled = await db.toggle_digest(message.from_user.id)
+    if enabled:
+        await message.answer(
+            "🌅 Ertalabki jamlanma yoqildi. Har kuni ertalab bugungi tasklaringiz ro'yxatini yuboraman.\n"
+            "O'chirish uchun yana /digest yuboring."
+        )
+    else:
+        await message.answer("🔕 Ertalabki jamlanma o'chirildi. Qayta yoqish uchun /digest yuboring.")
+
 # Menyu tugmalarini bosish uchun umumiy handler - FSM holatidan qat'iy nazar birinchi tekshiriladi
 @router.message(F.text.in_(["➕ Yangi Task yaratish", "⏳ Bajarilmagan Tasklar", "✅ Bajarilgan Tasklar"]), any_state)
 async def handle_menu_buttons_in_any_state(message: types.Message, state: FSMContext) -> None:
@@ -146,7 +186,121 @@ async def create_new_task(message: types.Message, state: FSMContext) -> None:
     
     # Task yaratish holatini belgilash
     await state.set_state(TaskStates.waiting_for_name)
-    await message.answer("Task nomini yozing:")
+    await message.answer(
+        "Task nomini yozing:\n\n"
+        "Bir nechta taskni birdaniga qo'shish uchun har bir qatorga "
+        "<code>KK.OO.YY HH:MM Task nomi</code> ko'rinishida yozing.\n"
+        "Masalan: <code>15.05.25 18:30 Non olish</code>",
+        parse_mode=ParseMode.HTML
+    )
+
+# Bitta xabarda qo'shiladigan tasklar soni chegarasi
+MAX_BULK_TASKS = 100
+
+# Tezkor format qatori: "15.05.25 18:30 Non olish"
+BULK_LINE_RE = re.compile(r"^(\d{1,2})\.(\d{1,2})\.(\d{2}|\d{4})\s+(\d{1,2}):(\d{2})\s+(.+)$")
+
+def is_bulk_input(message: types.Message) -> bool:
+    """Xabarning birinchi qatori tezkor formatdami"""
+    if not message.text:
+        return False
+    first_line = message.text.strip().split("\n", 1)[0].strip()
+    return BULK_LINE_RE.match(first_line) is not None
+
+def parse_bulk_tasks(text: str, now: datetime) -> Tuple[List[Tuple[str, str, str]], List[str]]:
+    """
+    Ko'p qatorli xabarni bir o'tishda tahlil qiladi.
+    
+    Args:
+        text: Xabar matni (har bir qatorda "KK.OO.YY HH:MM Task nomi")
+        now: Hozirgi vaqt (o'tgan vaqtlarni rad etish uchun)
+    
+    Returns:
+        Tuple: ((task nomi, sana YYYY-MM-DD, vaqt HH:MM) ro'yxati, xatoliklar ro'yxati)
+    """
+    tasks = []
+    errors = []
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        
+        match = BULK_LINE_RE.match(line)
+        if not match:
+            errors.append(f"{line_no}-qator: noto'g'ri format")
+            continue
+        
+        day, month, year, hour, minute, task_name = match.groups()
+        year = int(year)
+        full_year = 2000 + year if year < 100 else year
+        try:
+            task_datetime = datetime(full_year, int(month), int(day), int(hour), int(minute))
+        except ValueError:
+            errors.append(f"{line_no}-qator: noto'g'ri sana yoki vaqt")
+            continue
+        
+        if task_datetime < now:
+            errors.append(f"{line_no}-qator: vaqt o'tib ketgan")
+            continue
+        
+        tasks.append((task_name.strip(), task_datetime.strftime("%Y-%m-%d"), task_datetime.strftime("%H:%M")))
+    
+    return tasks, errors
+
+# Tezkor format: bir xabarda bir nechta task
+@router.message(StateFilter(None, TaskStates.waiting_for_name), F.text, is_bulk_input)
+async def process_bulk_tasks(message: types.Message, state: FSMContext) -> None:
+    """
+    Ko'p qatorli xabardagi tasklarni tekshiradi va bitta tranzaksiyada saqlaydi.
+    
+    Birorta qator xato bo'lsa hech narsa saqlanmaydi va xatolar ro'yxati
+    qaytariladi, shuning uchun xabarni tuzatib qayta yuborish mumkin.
+    
+    Args:
+        message: Xabar obyekti
+        state: FSM holati
+    """
+    tasks, errors = parse_bulk_tasks(message.text, clock.now())
+    
+    if len(tasks) + len(errors) > MAX_BULK_TASKS:
+        await message.answer(f"❌ Bitta xabarda ko'pi bilan {MAX_BULK_TASKS} ta task qo'shish mumkin.")
+        return
+    
+    if errors:
+        shown = errors[:10]
+        if len(errors) > len(shown):
+            shown.append(f"... va yana {len(errors) - len(shown)} ta xato")
+        await message.answer(
+            "❌ Tasklar saqlanmadi, quyidagi qatorlarni tuzating:\n" + "\n".join(shown)
+        )
+        return
+    
+    user_id = message.from_user.id
+    await db.add_tasks(user_id, tasks)
+    await state.clear()
+    
+    # Kanallarga bitta jamlanma post
+    if hasattr(router, 'bot'):
+        await post_new_tasks(
+            router.bot,
+            user_id,
+            [(task_name, f"{task_date} {task_time}") for task_name, task_date, task_time in tasks],
+            message.from_user.username,
+            message.from_user.full_name
+        )
+    
+    lines = [
+        f"📝 {escape(task_name)} — {datetime.strptime(task_date, '%Y-%m-%d').strftime('%d.%m.%y')} {task_time}"
+        for task_name, task_date, task_time in tasks[:20]
+    ]
+    if len(tasks) > 20:
+        lines.append(f"... va yana {len(tasks) - 20} ta")
+    
+    await message.answer(
+        f"✅ {len(tasks)} ta task muvaffaqiyatli saqlandi!\n\n" + "\n".join(lines),
+        parse_mode=ParseMode.HTML,
+        reply_markup=get_main_keyboard()
+    )
 
 # Task nomini olish
 @router.message(TaskStates.waiting_for_name)
@@ -200,7 +354,7 @@ async def process_task_date(message: types.Message, state: FSMContext) -> None:
         formatted_date = f"{full_year:04d}-{month:02d}-{day:02d}"
         
         # Joriy sanadan ilgari bo'lsa, xato qaytarish
-        current_date = datetime.now().date()
+        current_date = clock.now().date()
         if task_date_obj.date() < current_date:
             await message.answer(
                 "❌ Kiritilgan sana o'tib ketgan. Iltimos, hozirgi yoki kelajak sanani kiriting "
@@ -258,7 +412,7 @@ async def process_task_time(message: types.Message, state: FSMContext) -> None:
         task_datetime = datetime.strptime(f"{task_date} {task_time}", "%Y-%m-%d %H:%M")
         
         # O'tib ketgan vaqt emasligini tekshirish
-        now = datetime.now()
+        now = clock.now()
         if task_datetime < now:
             await message.answer(
                 "❌ Siz kiritgan sana va vaqt allaqachon o'tib ketgan. "
@@ -270,7 +424,7 @@ async def process_task_time(message: types.Message, state: FSMContext) -> None:
         return
     
     # Taskni databasega qo'shish
-    await db.add_task(user_id, task_name, task_date, task_time)
+    task_id = await db.add_task(user_id, task_name, task_date, task_time)
     
     # Task yaratilgani haqida kanallarga yuborish
     if hasattr(router, 'bot'):
@@ -301,34 +455,126 @@ async def process_task_time(message: types.Message, state: FSMContext) -> None:
         f"⏰ Vaqt: {task_time}\n\n"
         f"<b>Bajarilishi:</b> {user_friendly_date} {task_time}",
         parse_mode=ParseMode.HTML,
-        reply_markup=get_main_keyboard()
+        reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="🔁 Takrorlash", callback_data=f"repeat:{task_id}")]
+        ])
     )
 
-# 'Bajarilmagan Tasklar' tugmasi uchun handler
-async def show_active_tasks(message: types.Message) -> None:
+def get_repeat_keyboard(task_id: int) -> InlineKeyboardMarkup:
     """
-    Bajarilmagan tasklarni ko'rsatadi.
+    Takrorlanish turini tanlash klaviaturasi.
     
     Args:
-        message: Xabar obyekti
+        task_id: Task ID
+    
+    Returns:
+        InlineKeyboardMarkup: Takrorlanish turlari tugmalari
     """
-    user_id = message.from_user.id
-    tasks = await db.get_all_upcoming_tasks(user_id)
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [
+            InlineKeyboardButton(text="Har kuni", callback_data=f"repeat:{task_id}:daily"),
+            InlineKeyboardButton(text="Ish kunlari", callback_data=f"repeat:{task_id}:weekdays")
+        ],
+        [
+            InlineKeyboardButton(text="Har hafta", callback_data=f"repeat:{task_id}:weekly"),
+            InlineKeyboardButton(text="Har oy", callback_data=f"repeat:{task_id}:monthly")
+        ],
+        [
+            InlineKeyboardButton(text=f"Har {hours} soat", callback_data=f"repeat:{task_id}:hours:{hours}")
+            for hours in (2, 4, 6, 12)
+        ],
+        [InlineKeyboardButton(text="❌ Takrorlanmasin", callback_data=f"repeat:{task_id}:off")]
+    ])
+
+# Takrorlash tugmalari
+@router.callback_query(F.data.startswith("repeat:"))
+async def repeat_callback(callback_query: types.CallbackQuery) -> None:
+    """
+    "🔁 Takrorlash" tugmasi va takrorlanish turini tanlash callbacki.
     
-    if not tasks:
-        await message.answer("Sizda hozircha bajarilmagan tasklar yo'q.", reply_markup=get_main_keyboard())
+    Callback formati: repeat:<task_id>[:<tur>[:<soat>]]
+    
+    Args:
+        callback_query: Callback query
+    """
+    parts = callback_query.data.split(":")
+    try:
+        task_id = int(parts[1])
+        hours = int(parts[3]) if len(parts) > 3 else None
+    except (IndexError, ValueError):
+        await callback_query.answer("Xatolik yuz berdi")
+        return
+    
+    # Faqat "🔁 Takrorlash" bosilgan - turlarni ko'rsatish
+    if len(parts) == 2:
+        await callback_query.message.edit_reply_markup(reply_markup=get_repeat_keyboard(task_id))
+        await callback_query.answer()
+        return
+    
+    kind = parts[2]
+    try:
+        rule = await db.set_task_recurrence(task_id, callback_query.from_user.id, None if kind == "off" else kind, hours)
+    except ValueError:
+        await callback_query.answer("Noma'lum takrorlanish turi")
         return
     
+    if rule is None:
+        await callback_query.answer("Task topilmadi yoki allaqachon bajarilgan")
+        await callback_query.message.edit_reply_markup(reply_markup=None)
+        return
+    
+    status_line = f"🔁 Takrorlanadi: {describe_rule(rule)}" if rule else "Takrorlanmaydi"
+    await callback_query.answer(status_line)
+    await callback_query.message.edit_text(
+        f"{callback_query.message.html_text}\n\n{status_line}",
+        parse_mode=ParseMode.HTML,
+        reply_markup=None
+    )
+
+# Sahifa kursorini callback_data ichida saqlash: "2025-05-15 18:30" -> "202505151830"
+def encode_cursor(task: Task) -> str:
+    """Taskdan sahifa kursori (callback_data uchun ixcham ko'rinishda)"""
+    digits = "".join(ch for ch in (task.task_datetime or "") if ch.isdigit())
+    return f"{digits}:{task.id}"
+
+def decode_cursor(digits: str, task_id: str) -> db.PageCursor:
+    """callback_data dagi kursorni (task_datetime, id) ga qaytarish"""
+    task_datetime = f"{digits[0:4]}-{digits[4:6]}-{digits[6:8]} {digits[8:10]}:{digits[10:12]}"
+    return task_datetime, int(task_id)
+
+def get_page_keyboard(view: str, tasks: List[Task], has_prev: bool, has_next: bool,
+                      extra_rows: Optional[List[List[InlineKeyboardButton]]] = None) -> Optional[InlineKeyboardMarkup]:
+    """
+    Sahifalash tugmalari ("◀️ / ▶️") bilan inline klaviatura yaratadi.
+    
+    Args:
+        view: Ro'yxat turi ("u" - bajarilmagan, "c" - bajarilgan)
+        tasks: Joriy sahifadagi tasklar
+        has_prev: Oldingi sahifa bormi
+        has_next: Keyingi sahifa bormi
+        extra_rows: Qo'shimcha tugmalar qatorlari
+    """
+    nav_row = []
+    if has_prev:
+        nav_row.append(InlineKeyboardButton(text="◀️", callback_data=f"tasks:{view}:p:{encode_cursor(tasks[0])}"))
+    if has_next:
+        nav_row.append(InlineKeyboardButton(text="▶️", callback_data=f"tasks:{view}:n:{encode_cursor(tasks[-1])}"))
+    
+    rows = ([nav_row] if nav_row else []) + (extra_rows or [])
+    return InlineKeyboardMarkup(inline_keyboard=rows) if rows else None
+
+def render_upcoming_tasks(tasks: List[Task]) -> str:
+    """Bajarilmagan tasklar sahifasi matnini yaratadi"""
     response = "⏳ <b>Bajarilmagan tasklaringiz:</b>\n\n"
-    current_date = datetime.now().date()
+    current_date = clock.now().date()
     
     for task in tasks:
-        status_icon = "🔄" if task["status"] == "snoozed" else "⏳"
-        task_name = task['task_name']
+        status_icon = "🔄" if task.status == "snoozed" else "⏳"
+        task_name = escape(task.task_name)
         
         # task_datetime ni ajratish va formatlash
-        task_datetime_str = task.get('task_datetime')
-        task_time = task.get('task_time', '')
+        task_datetime_str = task.task_datetime
+        task_time = task.task_time or ''
         
         try:
             if task_datetime_str:
@@ -339,7 +585,7 @@ async def show_active_tasks(message: types.Message) -> None:
                 # Bugungi, ertangi yoki kelajakdagi sana ekanligini aniqlash
                 if task_date == current_date:
                     date_str = "Bugun"
-                elif task_date == current_date + datetime.timedelta(days=1):
+                elif task_date == current_date + timedelta(days=1):
                     date_str = "Ertaga"
                 else:
                     date_str = task_dt.strftime("%d.%m.%Y")
@@ -348,7 +594,10 @@ async def show_active_tasks(message: types.Message) -> None:
                 time_str = task_dt.strftime("%H:%M")
                 
                 response += f"{status_icon} <b>{task_name}</b>\n"
-                response += f"📅 {date_str}, 🕒 {time_str}\n\n"
+                response += f"📅 {date_str}, 🕒 {time_str}\n"
+                if task.recurrence:
+                    response += f"🔁 {describe_rule(task.recurrence)}\n"
+                response += "\n"
             else:
                 # task_datetime mavjud bo'lmasa, faqat task_time ni ko'rsatish
                 response += f"{status_icon} <b>{task_name}</b>\n"
@@ -358,41 +607,15 @@ async def show_active_tasks(message: types.Message) -> None:
             response += f"{status_icon} <b>{task_name}</b>\n"
             response += f"⏰ {task_time}\n\n"
     
-    await message.answer(response, parse_mode=ParseMode.HTML, reply_markup=get_main_keyboard())
+    return response
 
-# 'Bajarilgan Tasklar' tugmasi uchun handler
-async def show_completed_tasks(message: types.Message) -> None:
-    """
-    Bajarilgan tasklarni ko'rsatadi va o'chirish imkoniyatini beradi.
-    
-    Args:
-        message: Xabar obyekti
-    """
-    user_id = message.from_user.id
-    
-    async with aiosqlite.connect(db.DATABASE_NAME) as conn:
-        conn.row_factory = aiosqlite.Row
-        async with conn.execute(
-            "SELECT * FROM tasks WHERE user_id = ? AND status = 'completed' ORDER BY task_datetime DESC",
-            (user_id,)
-        ) as cursor:
-            tasks = await cursor.fetchall()
-            completed_tasks = [dict(row) for row in tasks]
-    
-    if not completed_tasks:
-        await message.answer("Sizda bajarilgan tasklar yo'q.", reply_markup=get_main_keyboard())
-        return
-    
-    # O'chirish tugmasini yaratish
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="🗑 Bajarilgan tasklarni o'chirish", callback_data="delete_completed")]
-    ])
-    
+def render_completed_tasks(tasks: List[Task]) -> str:
+    """Bajarilgan tasklar sahifasi matnini yaratadi"""
     response = "✅ <b>Bajarilgan tasklaringiz:</b>\n\n"
     
-    for task in completed_tasks:
-        task_name = task['task_name']
-        task_datetime_str = task.get('task_datetime')
+    for task in tasks:
+        task_name = escape(task.task_name)
+        task_datetime_str = task.task_datetime
         
         try:
             if task_datetime_str:
@@ -405,11 +628,132 @@ async def show_completed_tasks(message: types.Message) -> None:
         except Exception as e:
             response += f"✓ <b>{task_name}</b>\n\n"
     
-    await message.answer(
-        response, 
-        parse_mode=ParseMode.HTML, 
-        reply_markup=keyboard
+    return response
+
+async def build_task_page(view: str, user_id: int, cursor: Optional[db.PageCursor] = None,
+                          backward: bool = False) -> Optional[Tuple[str, Optional[InlineKeyboardMarkup]]]:
+    """
+    Ro'yxatning bitta sahifasini (matn va klaviatura) yaratadi.
+    
+    Args:
+        view: "u" - bajarilmagan, "c" - bajarilgan tasklar
+        user_id: Foydalanuvchi ID
+        cursor: Chegaraviy task (None - birinchi sahifa)
+        backward: Oldingi sahifaga qaytishmi
+    
+    Returns:
+        Tuple yoki None: (matn, klaviatura), tasklar bo'lmasa None
+    """
+    # Tayyor sahifa keshda bo'lsa, DB va formatlashsiz qaytarish
+    cache_key = (view, cursor, backward)
+    page = task_list_cache.get(user_id, cache_key)
+    if page is not MISSING:
+        return page
+    
+    since = task_list_cache.begin()
+    if view == "c":
+        tasks, has_prev, has_next = await db.get_completed_tasks_page(user_id, cursor, backward)
+    else:
+        tasks, has_prev, has_next = await db.get_upcoming_tasks_page(user_id, cursor, backward)
+    
+    if not tasks:
+        page = None
+    elif view == "c":
+        # O'chirish tugmasi
+        delete_row = [InlineKeyboardButton(text="🗑 Bajarilgan tasklarni o'chirish", callback_data="delete_completed")]
+        page = render_completed_tasks(tasks), get_page_keyboard(view, tasks, has_prev, has_next, [delete_row])
+    else:
+        page = render_upcoming_tasks(tasks), get_page_keyboard(view, tasks, has_prev, has_next)
+    
+    task_list_cache.put(
+        user_id, cache_key, page, since,
+        expires_at=get_page_expiry(view, tasks),
+        size=len(page[0].encode()) if page else 0
     )
+    return page
+
+def get_page_expiry(view: str, tasks: List[Task]) -> Optional[float]:
+    """
+    Keshdagi sahifa vaqt o'tishi bilan eskiradigan payt.
+    
+    Bajarilmagan tasklar ro'yxati birinchi task vaqti o'tganda (u ro'yxatdan
+    chiqadi) yoki yarim tunda ("Bugun"/"Ertaga" yorliqlari) o'zgaradi.
+    Bajarilgan tasklar ro'yxati vaqtga bog'liq emas.
+    """
+    if view == "c":
+        return None
+    
+    now = clock.now()
+    expires = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    if tasks and tasks[0].task_datetime:
+        try:
+            expires = min(expires, datetime.strptime(tasks[0].task_datetime, "%Y-%m-%d %H:%M"))
+        except ValueError:
+            expires = now
+    return expires.timestamp()
+
+# 'Bajarilmagan Tasklar' tugmasi uchun handler
+async def show_active_tasks(message: types.Message) -> None:
+    """
+    Bajarilmagan tasklarning birinchi sahifasini ko'rsatadi.
+    
+    Args:
+        message: Xabar obyekti
+    """
+    page = await build_task_page("u", message.from_user.id)
+    
+    if not page:
+        await message.answer("Sizda hozircha bajarilmagan tasklar yo'q.", reply_markup=get_main_keyboard())
+        return
+    
+    text, keyboard = page
+    await message.answer(text, parse_mode=ParseMode.HTML, reply_markup=keyboard or get_main_keyboard())
+
+# 'Bajarilgan Tasklar' tugmasi uchun handler
+async def show_completed_tasks(message: types.Message) -> None:
+    """
+    Bajarilgan tasklarning birinchi sahifasini ko'rsatadi va o'chirish imkoniyatini beradi.
+    
+    Args:
+        message: Xabar obyekti
+    """
+    page = await build_task_page("c", message.from_user.id)
+    
+    if not page:
+        await message.answer("Sizda bajarilgan tasklar yo'q.", reply_markup=get_main_keyboard())
+        return
+    
+    text, keyboard = page
+    await message.answer(text, parse_mode=ParseMode.HTML, reply_markup=keyboard)
+
+# Sahifalash tugmalari bosilganda - mavjud xabar tahrirlanadi
+@router.callback_query(F.data.startswith("tasks:"))
+async def task_page_callback(callback_query: types.CallbackQuery) -> None:
+    """
+    "◀️ / ▶️" tugmalari uchun callback: keyingi yoki oldingi sahifani ko'rsatadi.
+    
+    Args:
+        callback_query: Callback query
+    """
+    try:
+        _, view, direction, digits, task_id = callback_query.data.split(":")
+        cursor = decode_cursor(digits, task_id)
+    except ValueError:
+        await callback_query.answer("Xatolik yuz berdi")
+        return
+    
+    page = await build_task_page(view, callback_query.from_user.id, cursor, backward=(direction == "p"))
+    if not page:
+        await callback_query.answer("Boshqa tasklar yo'q")
+        return
+    
+    text, keyboard = page
+    try:
+        await callback_query.message.edit_text(text, parse_mode=ParseMode.HTML, reply_markup=keyboard)
+    except TelegramBadRequest as e:
+        # Sahifa o'zgarmagan bo'lsa ("message is not modified")
+        logging.warning(f"Sahifani yangilashda xatolik: {e}")
+    await callback_query.answer()
 
 # O'chirish tugmasi bosilganda
 @router.callback_query(lambda c: c.data == "delete_completed")
@@ -420,8 +764,8 @@ async def delete_completed_tasks_callback(callback_query: types.CallbackQuery) -
     Args:
         callback_query: Callback query
     """
-    # Bajarilgan tasklarni o'chirish
-    deleted_count = await db.delete_completed_tasks()
+    # Faqat shu foydalanuvchining bajarilgan tasklarini o'chirish
+    deleted_count = await db.delete_completed_tasks(callback_query.from_user.id)
     
     # Foydalanuvchiga natija haqida xabar berish
     if deleted_count > 0:
@@ -0,0 +1,163 @@
+import logging
+
+from aiogram import Router, types, F
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from utils import clock
+from utils.transfer import (
+    EXPORT_FORMATS, MAX_IMPORT_ROWS, TaskExportFile, import_task_stream, iter_telegram_file
+)
+
+# Router yaratish
+router = Router()
+
+# Telegram Bot API orqali yuklab olinadigan fayllarning maksimal hajmi
+MAX_IMPORT_FILE_SIZE = 20 * 1024 * 1024
+
+# Holat mashinalari
+class ImportStates(StatesGroup):
+    waiting_for_file = State()
+
+def get_export_keyboard() -> InlineKeyboardMarkup:
+    """
+    Eksport formatini tanlash klaviaturasi.
+
+    Returns:
+        InlineKeyboardMarkup: CSV va iCalendar tugmalari
+    """
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [
+            InlineKeyboardButton(text="📄 CSV", callback_data="export:csv"),
+            InlineKeyboardButton(text="📅 iCalendar (.ics)", callback_data="export:ics")
+        ]
+    ])
+
+async def send_export(message: types.Message, user_id: int, fmt: str) -> None:
+    """
+    Foydalanuvchi tasklarini fayl sifatida yuborish (fayl oqim sifatida yuklanadi).
+
+    Args:
+        message: Javob yuboriladigan xabar
+        user_id: Foydalanuvchi ID
+        fmt: Format ("csv" yoki "ics")
+    """
+    filename = f"tasks_{clock.now().strftime('%Y%m%d')}.{fmt}"
+    try:
+        await message.answer_document(
+            TaskExportFile(user_id, fmt, filename=filename),
+            caption="📦 Tasklaringiz eksporti"
+        )
+    except Exception as e:
+        logging.error(f"User {user_id} eksportida xatolik: {e}")
+        await message.answer("❌ Eksport qilishda xatolik yuz berdi. Keyinroq urinib ko'ring.")
+
+# /export komandasi
+@router.message(Command("export"))
+async def cmd_export(message: types.Message, command: CommandObject) -> None:
+    """
+    /export [csv|ics] komandasini qayta ishlaydi.
+
+    Args:
+        message: Xabar obyekti
+        command: Komanda argumentlari
+    """
+    fmt = (command.args or "").strip().lower()
+    if fmt in EXPORT_FORMATS:
+        await send_export(message, message.from_user.id, fmt)
+        return
+
+    await message.answer("Eksport formatini tanlang:", reply_markup=get_export_keyboard())
+
+@router.callback_query(F.data.startswith("export:"))
+async def export_callback(callback_query: types.CallbackQuery) -> None:
+    """
+    Eksport formatini tanlash callbacki.
+
+    Args:
+        callback_query: Callback query
+    """
+    fmt = callback_query.data.split(":", 1)[1]
+    if fmt not in EXPORT_FORMATS:
+        await callback_query.answer("Noma'lum format")
+        return
+
+    await callback_query.answer("Fayl tayyorlanmoqda...")
+    await send_export(callback_query.message, callback_query.from_user.id, fmt)
+
+# /import komandasi
+@router.message(Command("import"))
+async def cmd_import(message: types.Message, state: FSMContext) -> None:
+    """
+    /import komandasini qayta ishlaydi: fayl yuborishni so'raydi.
+
+    Args:
+        message: Xabar obyekti
+        state: FSM holati
+    """
+    await state.set_state(ImportStates.waiting_for_file)
+    await message.answer(
+        "CSV yoki iCalendar (.ics) faylini yuboring.\n\n"
+        "CSV ustunlari: task_name, date, time, status (sana YYYY-MM-DD yoki KK.OO.YY).\n"
+        f"Bitta fayldan ko'pi bilan {MAX_IMPORT_ROWS} ta task import qilinadi."
+    )
+
+@router.message(ImportStates.waiting_for_file, F.document)
+async def process_import_file(message: types.Message, state: FSMContext) -> None:
+    """
+    Yuborilgan faylni oqim sifatida o'qib, tasklarni paketlab saqlaydi.
+
+    Args:
+        message: Xabar obyekti
+        state: FSM holati
+    """
+    document = message.document
+    filename = (document.file_name or "").lower()
+    if filename.endswith(".csv"):
+        fmt = "csv"
+    elif filename.endswith((".ics", ".ical")) or document.mime_type == "text/calendar":
+        fmt = "ics"
+    else:
+        await message.answer("❌ Faqat .csv yoki .ics fayllarni import qilish mumkin.")
+        return
+
+    if document.file_size and document.file_size > MAX_IMPORT_FILE_SIZE:
+        await message.answer("❌ Fayl juda katta (20 MB dan oshmasligi kerak).")
+        return
+
+    await state.clear()
+    progress = await message.answer("⏳ Import qilinmoqda...")
+
+    user_id = message.from_user.id
+    try:
+        file = await message.bot.get_file(document.file_id)
+        result = await import_task_stream(user_id, iter_telegram_file(message.bot, file.file_path), fmt)
+    except Exception as e:
+        logging.error(f"User {user_id} importida xatolik: {e}")
+        await progress.edit_text("❌ Faylni import qilishda xatolik yuz berdi.")
+        return
+
+    lines = [f"✅ Import yakunlandi: {result['imported']} ta task qo'shildi."]
+    if result["duplicates"]:
+        lines.append(f"🔁 Allaqachon mavjud: {result['duplicates']}")
+    if result["skipped"]:
+        lines.append(f"⏭ Vaqti o'tgan aktiv tasklar: {result['skipped']}")
+    if result["failed"]:
+        lines.append(f"❌ Xato qatorlar: {result['failed']}")
+        lines.extend(result["errors"])
+    if result["truncated"]:
+        lines.append(f"⚠️ Faqat birinchi {MAX_IMPORT_ROWS} ta qator o'qildi.")
+
+    await progress.edit_text("\n".join(lines))
+
+@router.message(ImportStates.waiting_for_file)
+async def process_import_not_file(message: types.Message) -> None:
+    """
+    Import holatida fayl o'rniga boshqa xabar kelganda.
+
+    Args:
+        message: Xabar obyekti
+    """
+    await message.answer("Iltimos, .csv yoki .ics faylni hujjat sifatida yuboring.")
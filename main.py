@@ -10,12 +10,15 @@ from dotenv import load_dotenv
 
 from database import (
     init_db, create_users_table, create_config_table, 
-    create_post_channels_table, setup_db
+    create_post_channels_table, setup_db, close_db, db
 )
-from handlers import task, notification, admin
-from handlers.middleware import SubscriptionMiddleware
-from utils import scheduler
-from handlers.notification import send_task_notification
+from database.profiler import profiler
+from handlers import task, notification, admin, transfer, search
+from handlers.middleware import SubscriptionMiddleware, ThrottlingMiddleware
+from utils import scheduler, metrics
+from utils.broadcast import resume_broadcasts
+from utils.delivery import outbound_queue_depth
+from handlers.notification import send_task_notification, send_daily_digest
 
 # .env faylini yuklash
 load_dotenv()
@@ -38,6 +41,27 @@ if admin_ids_str:
 else:
     logging.warning("ADMIN_IDS topilmadi. Admin funksiyalarini ishlatish uchun .env fayliga qo'shing!")
 
+# Ertalabki jamlanma yuboriladigan soat
+DIGEST_HOUR = int(os.getenv("DIGEST_HOUR", "8"))
+
+# Kanal postlari va admin xabarlarini jamlash oynasi (sekund, 0 - o'chiq) va chegarasi
+NOTIFY_BATCH_WINDOW = float(os.getenv("NOTIFY_BATCH_WINDOW", "60"))
+NOTIFY_BATCH_MAX = int(os.getenv("NOTIFY_BATCH_MAX", "20"))
+
+# Bitta foydalanuvchi uchun tezlik chegaralari: sekundiga o'rtacha (0 - o'chiq) va bir zumda
+MESSAGE_RATE_LIMIT = float(os.getenv("MESSAGE_RATE_LIMIT", "1"))
+MESSAGE_BURST = int(os.getenv("MESSAGE_BURST", "5"))
+CALLBACK_RATE_LIMIT = float(os.getenv("CALLBACK_RATE_LIMIT", "2"))
+CALLBACK_BURST = int(os.getenv("CALLBACK_BURST", "8"))
+
+# Prometheus metrikalari uchun lokal HTTP port (bo'sh - o'chiq)
+METRICS_PORT = os.getenv("METRICS_PORT", "")
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+# SQL profiler (1 - yoqilgan) va sekin so'rov chegarasi (millisekund)
+SQL_PROFILE = os.getenv("SQL_PROFILE", "0") == "1"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+
 # Log konfiguratsiyasi
 logging.basicConfig(
     level=logging.INFO,
@@ -63,26 +87,79 @@ async def main() -> None:
     # Admin ruxsatlarini admin moduliga yuborish
     admin.ADMIN_IDS = ADMIN_IDS
     
+    # Yangi task postlari va yangi foydalanuvchi xabarlarini jamlab yuborish;
+    # bot to'xtaganda (sessiya yopilishidan oldin) yig'ilganlari yuboriladi
+    admin.setup_digests(bot, NOTIFY_BATCH_WINDOW, NOTIFY_BATCH_MAX)
+    dp.shutdown.register(admin.close_digests)
+    
+    # Spamdan himoya: cheklangan yangilanishlar filtrlar, obuna tekshiruvi
+    # va bazagacha yetib bormasligi uchun tashqi middleware sifatida
+    if MESSAGE_RATE_LIMIT > 0:
+        dp.message.outer_middleware(ThrottlingMiddleware(MESSAGE_RATE_LIMIT, MESSAGE_BURST))
+    if CALLBACK_RATE_LIMIT > 0:
+        dp.callback_query.outer_middleware(ThrottlingMiddleware(CALLBACK_RATE_LIMIT, CALLBACK_BURST))
+    
     # Majburiy obuna middleware qo'shish
     dp.message.middleware(SubscriptionMiddleware())
     dp.callback_query.middleware(SubscriptionMiddleware())
     
+    # Metrikalar: handlerlar va Bot API so'rovlari vaqtini o'lchash
+    if METRICS_PORT:
+        dp.message.middleware(metrics.HandlerMetricsMiddleware())
+        dp.callback_query.middleware(metrics.HandlerMetricsMiddleware())
+        dp.inline_query.middleware(metrics.HandlerMetricsMiddleware())
+        bot.session.middleware(metrics.TelegramMetricsMiddleware())
+        metrics.register_gauge("dinotasks_active_reminder_loops", "Faol eslatma looplari",
+                               lambda: len(scheduler.active_notification_loops))
+        metrics.register_gauge("dinotasks_outbound_queue_depth", "Ommaviy yuborish navbatidagi xabarlar",
+                               outbound_queue_depth)
+        metrics.register_gauge("dinotasks_db_write_queue_depth", "Yozuvchi navbatidagi amallar",
+                               lambda: db.get_writer().depth)
+    
     # Handlerlarni ro'yxatdan o'tkazish
     dp.include_router(task.router)
+    dp.include_router(transfer.router)
+    dp.include_router(search.router)
     dp.include_router(notification.router)
     dp.include_router(admin.router)
     
+    # SQL profiler ulanishlar ochilishidan oldin sozlanadi
+    profiler.configure(SQL_PROFILE, SLOW_QUERY_MS)
+    
     # Ma'lumotlar bazasini ishga tushirish
     logger.info("Ma'lumotlar bazasini ishga tushirish...")
     await setup_db()
     
+    # Metrikalar endpointi
+    metrics_runner = None
+    if METRICS_PORT:
+        metrics_runner = await metrics.start_metrics_server(METRICS_HOST, int(METRICS_PORT))
+    
+    # Uzilib qolgan ommaviy xabarlarni oxirgi checkpointdan davom ettirish
+    await resume_broadcasts(bot)
+    
     # 30 sekundda tasklarni tekshirish uchun background task yaratish
     logger.info("Task tekshiruvchini ishga tushirish...")
     asyncio.create_task(scheduler.check_due_tasks(bot, send_task_notification))
     
+    # Eski bajarilgan tasklarni har 3 soatda arxivga ko'chirish
+    asyncio.create_task(scheduler.archive_completed_loop())
+    
+    # Statistika hisoblagichlari va yig'indilarga kuniga bir marta xizmat ko'rsatish
+    asyncio.create_task(scheduler.daily_maintenance_loop())
+    
+    # Obunachilarga har kuni ertalab bugungi tasklar jamlanmasini yuborish
+    asyncio.create_task(scheduler.daily_digest_loop(bot, send_daily_digest, DIGEST_HOUR))
+    
     # Bot ishga tushirish
     logger.info("Bot ishga tushirilmoqda...")
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        # Navbatdagi yozuvlarni yakunlash
+        await close_db()
 
 if __name__ == "__main__":
     logging.info("Bot ishga tushirilmoqda...")
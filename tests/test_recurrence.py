@@ -0,0 +1,28 @@
+import datetime
+
+from database.recurrence import make_rule, next_occurrence
+
+
+def test_hours_rule_ignores_snooze():
+    start = datetime.datetime(2030, 3, 14, 10, 17)
+    rule = make_rule("hours", start, 5)
+    assert rule == "hours:5@00:17"
+
+    current = start
+    for _ in range(10):
+        # Har bir eslatma 5 daqiqaga kechiktirilib, keyin bajariladi
+        snoozed = current + datetime.timedelta(minutes=5)
+        current, previous = next_occurrence(rule, snoozed, snoozed), current
+        assert current == previous + datetime.timedelta(hours=5)
+
+
+def test_hours_rule_skips_missed_occurrences():
+    start = datetime.datetime(2030, 3, 14, 10, 0)
+    rule = make_rule("hours", start, 3)
+    after = start + datetime.timedelta(hours=7)
+    assert next_occurrence(rule, start, after) == start + datetime.timedelta(hours=9)
+
+
+def test_legacy_hours_rule_counts_from_current():
+    current = datetime.datetime(2030, 1, 1, 10, 5)
+    assert next_occurrence("hours:3", current, current) == datetime.datetime(2030, 1, 1, 13, 5)
@@ -0,0 +1,70 @@
+import asyncio
+import datetime
+from types import SimpleNamespace
+
+from database import db, setup_db
+from handlers.notification import process_stop_repeat
+from utils import clock
+
+
+class FakeMessage:
+    text = "🔔 Eslatma"
+
+    async def edit_text(self, text, **kwargs):
+        self.text = text
+
+    async def edit_reply_markup(self, **kwargs):
+        pass
+
+
+class FakeCallbackQuery:
+    def __init__(self, user_id: int, data: str):
+        self.from_user = SimpleNamespace(id=user_id)
+        self.data = data
+        self.message = FakeMessage()
+        self.answers = []
+
+    async def answer(self, text=None, **kwargs):
+        self.answers.append(text)
+
+
+async def _completed_today() -> int:
+    rollups = await db.get_rollups("day", 1)
+    return rollups["tasks_completed"][-1]
+
+
+def test_stop_repeat_counts_occurrence_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DATABASE_NAME", str(tmp_path / "tasks.db"))
+    previous = clock.set_clock(clock.VirtualClock(start=datetime.datetime(2030, 1, 1, 9, 5)))
+
+    async def scenario():
+        try:
+            await setup_db()
+            task_id = await db.add_task(1, "Suv ichish", "2030-01-01", "09:00")
+            assert await db.set_task_recurrence(task_id, 1, "daily") == "daily@09:00"
+
+            # "Bajarildi": joriy takrorlanish hisoblanadi, task ertangi kunga suriladi
+            assert await db.mark_task_completed(task_id) == "2030-01-02 09:00"
+            assert await _completed_today() == 1
+
+            callback_query = FakeCallbackQuery(1, f"stoprepeat_{task_id}")
+            await process_stop_repeat(callback_query)
+            assert callback_query.answers == ["Takrorlash to'xtatildi"]
+
+            # Takrorlashni to'xtatish taskni yopadi, lekin qayta hisoblamaydi
+            assert await _completed_today() == 1
+            assert await db.get_completed_tasks_count() == 1
+            assert await db.get_active_tasks_count() == 0
+
+            # Qayta bosilganda task topilmaydi
+            again = FakeCallbackQuery(1, f"stoprepeat_{task_id}")
+            await process_stop_repeat(again)
+            assert again.answers == ["Task topilmadi"]
+            assert await _completed_today() == 1
+        finally:
+            await db.close_db()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        clock.set_clock(previous)
@@ -0,0 +1,70 @@
+import asyncio
+import datetime
+
+from database import db, setup_db
+from utils import clock
+
+
+def run(tmp_path, monkeypatch, scenario):
+    monkeypatch.setattr(db, "DATABASE_NAME", str(tmp_path / "tasks.db"))
+    previous = clock.set_clock(clock.VirtualClock(start=datetime.datetime(2030, 1, 10, 12, 0)))
+
+    async def wrapper():
+        try:
+            await setup_db()
+            await scenario()
+        finally:
+            await db.close_db()
+
+    try:
+        asyncio.run(wrapper())
+    finally:
+        clock.set_clock(previous)
+
+
+async def add_completed(user_id: int, name: str, date: str) -> int:
+    task_id = await db.add_task(user_id, name, date, "09:00")
+    await db.mark_task_completed(task_id)
+    return task_id
+
+
+def test_archived_tasks_stay_searchable(tmp_path, monkeypatch):
+    async def scenario():
+        old_id = await add_completed(1, "Non olish", "2030-01-01")
+        new_id = await db.add_task(1, "Non yopish", "2030-01-11", "09:00")
+        await add_completed(2, "Non sotish", "2030-01-01")
+
+        assert await db.clean_old_completed_tasks(days=3, pause=0) == 2
+
+        found = await db.search_tasks("non", 1)
+        assert [task.id for task in found] == [new_id, old_id]
+        assert found[1].status == "completed"
+        assert found[1].task_time == "09:00"
+        assert len(await db.search_tasks("non")) == 3
+
+        # Arxivdan o'chirilgan task indeksdan ham chiqadi
+        await db.delete_completed_tasks(1)
+        assert [task.id for task in await db.search_tasks("non", 1)] == [new_id]
+
+    run(tmp_path, monkeypatch, scenario)
+
+
+def test_old_index_is_migrated(tmp_path, monkeypatch):
+    async def scenario():
+        task_id = await add_completed(1, "Sut olish", "2030-01-01")
+        await db.clean_old_completed_tasks(days=3, pause=0)
+
+        # Eski sxema: arxivga ko'chirishda indeksdan o'chiruvchi trigger
+        async with db.connect(db.DATABASE_NAME) as conn:
+            await conn.execute("DROP TRIGGER tasks_archive_fts_delete")
+            await conn.execute(
+                "INSERT INTO tasks_fts (tasks_fts, rowid, task_name, owner) VALUES ('delete', ?, 'Sut olish', 'u1')",
+                (task_id,)
+            )
+            await conn.commit()
+        assert await db.search_tasks("sut", 1) == []
+
+        await db.create_search_index()
+        assert [task.id for task in await db.search_tasks("sut", 1)] == [task_id]
+
+    run(tmp_path, monkeypatch, scenario)
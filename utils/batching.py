@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional
+
+from utils import clock
+
+# Loggerga sozlash
+logger = logging.getLogger(__name__)
+
+
+class EventBatcher:
+    """
+    Hodisalarni xotirada yig'ib, oynaga bittadan jamlanma sifatida yuborish.
+
+    Birinchi hodisa kelganda `window` sekundlik taymer boshlanadi; taymer
+    tugaganda yoki yig'ilgan hodisalar `max_items` ga yetganda flush_callback
+    barcha yig'ilganlar bilan bir marta chaqiriladi. close() qolganlarini
+    darhol yuboradi (bot to'xtaganda hodisalar yo'qolmasligi uchun).
+
+    window <= 0 bo'lsa jamlash o'chiq: har bir hodisa darhol alohida yuboriladi.
+    """
+
+    def __init__(self, name: str, flush_callback: Callable[[List[Any]], Awaitable[None]],
+                 window: float = 60.0, max_items: int = 20):
+        """
+        Args:
+            name: Loglar uchun nom
+            flush_callback: Yig'ilgan hodisalarni yuboradigan funksiya
+            window: Jamlash oynasi (sekund)
+            max_items: Oyna tugashini kutmasdan yuborish chegarasi
+        """
+        self.name = name
+        self.flush_callback = flush_callback
+        self.window = window
+        self.max_items = max(1, max_items)
+        self._items: List[Any] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._flushes: List[asyncio.Task] = []
+
+    async def add(self, item: Any) -> None:
+        """Hodisani jamlanmaga qo'shish"""
+        await self.add_many([item])
+
+    async def add_many(self, items: List[Any]) -> None:
+        """Bir nechta hodisani qo'shish (jamlash o'chiq bo'lsa ham bitta jamlanma bo'lib ketadi)"""
+        if self.window <= 0:
+            await self._send(list(items))
+            return
+
+        self._items.extend(items)
+        if len(self._items) >= self.max_items:
+            # Chegara to'ldi: oynani kutmasdan fon rejimida yuborish
+            self._start_flush()
+        elif self._items and self._timer is None:
+            self._timer = asyncio.create_task(self._wait_and_flush())
+
+    async def _wait_and_flush(self) -> None:
+        """Oyna tugashini kutib yuborish"""
+        await clock.sleep(self.window)
+        self._timer = None
+        await self._send(self._take())
+
+    def _take(self) -> List[Any]:
+        """Yig'ilgan hodisalarni olib, buferni bo'shatish"""
+        items, self._items = self._items, []
+        return items
+
+    def _start_flush(self) -> None:
+        """Joriy buferni fon rejimida yuborish"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        task = asyncio.create_task(self._send(self._take()))
+        self._flushes.append(task)
+        task.add_done_callback(self._flushes.remove)
+
+    async def _send(self, items: List[Any]) -> None:
+        """flush_callback ni xatolardan himoyalangan holda chaqirish"""
+        if not items:
+            return
+        try:
+            await self.flush_callback(items)
+        except Exception as e:
+            logger.error(f"{self.name} jamlanmasini yuborishda xatolik ({len(items)} ta hodisa): {e}")
+
+    async def close(self) -> None:
+        """Qolgan hodisalarni darhol yuborish va fon yuborishlarini kutish"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self._send(self._take())
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from database import db
+from utils.delivery import BulkSender
+
+# Loggerga sozlash
+logger = logging.getLogger(__name__)
+
+# Bitta checkpointdagi qabul qiluvchilar soni: qayta ishga tushganda
+# ko'pi bilan shuncha foydalanuvchiga xabar ikkinchi marta borishi mumkin
+BROADCAST_PAGE_SIZE = 100
+
+# Jarayon xabarini yangilash oralig'i (sekund)
+PROGRESS_INTERVAL = 5.0
+
+# Ishlab turgan ommaviy xabarlar: broadcast_id -> asyncio.Task
+_running: Dict[int, asyncio.Task] = {}
+
+
+def format_duration(seconds: float) -> str:
+    """Sekundlarni "1 soat 5 daq" ko'rinishiga keltirish"""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds} s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes} daq {seconds} s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours} soat {minutes} daq"
+
+
+def render_progress(broadcast: Dict[str, Any], rate: Optional[float] = None) -> str:
+    """
+    Ommaviy xabar jarayoni matnini yaratish.
+
+    Args:
+        broadcast: Ommaviy xabar holati (broadcasts jadvali qatori)
+        rate: Joriy yuborish tezligi (foydalanuvchi/sekund)
+
+    Returns:
+        str: Jarayon matni
+    """
+    processed = broadcast["sent"] + broadcast["failed"] + broadcast["blocked"]
+    total = max(broadcast["total"], processed)
+    percent = processed * 100 // total if total else 100
+    titles = {"running": "⏳ Yuborilmoqda", "done": "✅ Yakunlandi", "cancelled": "⏹ To'xtatildi"}
+
+    lines = [
+        f"📣 Ommaviy xabar #{broadcast['id']}: {titles.get(broadcast['status'], broadcast['status'])}",
+        "",
+        f"📊 {processed} / {total} ({percent}%)",
+        f"✅ Yuborildi: {broadcast['sent']}",
+        f"🚫 Botni bloklagan: {broadcast['blocked']}",
+        f"❌ Xato: {broadcast['failed']}",
+    ]
+    if broadcast["status"] == "running" and rate:
+        lines.append(f"⏱ Taxminiy qolgan vaqt: {format_duration(max(total - processed, 0) / rate)}")
+    return "\n".join(lines)
+
+
+def get_progress_keyboard(broadcast_id: int) -> InlineKeyboardMarkup:
+    """Jarayon xabaridagi "To'xtatish" tugmasi"""
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="⏹ To'xtatish", callback_data=f"broadcast:cancel:{broadcast_id}")]
+    ])
+
+
+async def update_progress(bot: Bot, broadcast: Dict[str, Any], rate: Optional[float] = None) -> None:
+    """Admin chatidagi jarayon xabarini joyida yangilash"""
+    if not broadcast["progress_message_id"]:
+        return
+    try:
+        await bot.edit_message_text(
+            render_progress(broadcast, rate),
+            chat_id=broadcast["admin_id"],
+            message_id=broadcast["progress_message_id"],
+            reply_markup=get_progress_keyboard(broadcast["id"]) if broadcast["status"] == "running" else None
+        )
+    except TelegramBadRequest as e:
+        # "message is not modified" yoki xabar o'chirilgan
+        logger.debug(f"Jarayon xabarini yangilab bo'lmadi: {e}")
+    except Exception as e:
+        logger.error(f"Jarayon xabarini yangilashda xatolik: {e}")
+
+
+async def run_broadcast(bot: Bot, broadcast_id: int) -> None:
+    """
+    Ommaviy xabarni oxirgi checkpointdan boshlab yuborish.
+
+    Qabul qiluvchilar users jadvalidan user_id bo'yicha keyset sahifalarda
+    olinadi. Har bir sahifa BulkSender orqali umumiy tezlik chegarasi ostida
+    yuboriladi, to'liq yetkazilgandan keyin checkpoint saqlanadi.
+
+    Args:
+        bot: Bot obyekti
+        broadcast_id: Ommaviy xabar ID
+    """
+    broadcast = await db.get_broadcast(broadcast_id)
+    if not broadcast or broadcast["status"] != "running":
+        return
+
+    logger.info(f"Ommaviy xabar #{broadcast_id} user_id > {broadcast['last_user_id']} dan davom etmoqda")
+    # Haqiqiy yuborish tezligi va Telegram edit chegarasi uchun - utils.clock emas
+    started = time.monotonic()
+    last_update = 0.0
+    status = "running"
+
+    async with BulkSender(bot) as sender:
+        while status == "running":
+            user_ids = await db.get_broadcast_recipients(broadcast["last_user_id"], BROADCAST_PAGE_SIZE)
+            if not user_ids:
+                status = "done"
+                break
+
+            sent, failed, blocked = sender.sent, sender.failed, len(sender.blocked)
+            for user_id in user_ids:
+                await sender.copy(user_id, broadcast["from_chat_id"], broadcast["message_id"])
+            await sender.drain()
+
+            # Sahifa to'liq yetkazildi: checkpoint
+            page_blocked = sender.blocked[blocked:]
+            status = await db.save_broadcast_progress(
+                broadcast_id, user_ids[-1], sender.sent - sent, sender.failed - failed, page_blocked
+            )
+            broadcast["last_user_id"] = user_ids[-1]
+            broadcast["sent"] += sender.sent - sent
+            broadcast["failed"] += sender.failed - failed
+            broadcast["blocked"] += len(page_blocked)
+
+            now = time.monotonic()
+            if status == "running" and now - last_update >= PROGRESS_INTERVAL:
+                last_update = now
+                processed = sender.sent + sender.failed + len(sender.blocked)
+                await update_progress(bot, broadcast, processed / (now - started))
+
+    if status == "done":
+        await db.set_broadcast_status(broadcast_id, "done")
+    broadcast["status"] = status or "cancelled"
+    await update_progress(bot, broadcast)
+    logger.info(f"Ommaviy xabar #{broadcast_id} tugadi: {broadcast['status']}, {sender.stats}")
+
+
+def start_broadcast(bot: Bot, broadcast_id: int) -> asyncio.Task:
+    """Ommaviy xabarni fon rejimida ishga tushirish"""
+    task = asyncio.create_task(run_broadcast(bot, broadcast_id))
+    _running[broadcast_id] = task
+    task.add_done_callback(lambda _: _running.pop(broadcast_id, None))
+    return task
+
+
+async def resume_broadcasts(bot: Bot) -> None:
+    """Bot qayta ishga tushganda tugallanmagan ommaviy xabarlarni davom ettirish"""
+    for broadcast_id in await db.get_running_broadcasts():
+        if broadcast_id not in _running:
+            logger.info(f"Ommaviy xabar #{broadcast_id} qayta ishga tushirilmoqda")
+            start_broadcast(bot, broadcast_id)
@@ -0,0 +1,204 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Coroutine, List, Optional, Set, Tuple, Union
+
+# Loggerga sozlash
+logger = logging.getLogger(__name__)
+
+
+class SystemClock:
+    """Haqiqiy vaqt: datetime.now(), time.monotonic() va asyncio.sleep()"""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def timestamp(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    Soxta (virtual) vaqt: faqat advance() chaqirilganda oldinga yuradi.
+
+    sleep() haqiqiy kutmaydi - vaqt uyg'onish muddatiga yetguncha to'xtab
+    turadi. advance() uxlayotganlarni muddati tartibida uyg'otadi va har
+    birining navbatdagi sleep() gacha (yoki tugaguncha) ishlashini kutadi,
+    shuning uchun bir sutkalik rejalashtirishni bir necha sekundda o'tkazish
+    mumkin, eslatmalar esa aynan o'z vaqtida chiqadi.
+
+    Uyg'otilgan korutina virtual bo'lmagan narsani (masalan, tashqi hodisani)
+    kutib qolsa, advance() settle_timeout haqiqiy sekunddan keyin davom etadi.
+
+    Args:
+        start: Boshlang'ich vaqt
+        settle_timeout: Uyg'otilganlarni kutishning haqiqiy vaqt chegarasi (sekund)
+    """
+
+    def __init__(self, start: Optional[datetime] = None, settle_timeout: float = 5.0):
+        self._now = start or datetime.now()
+        self._monotonic = 0.0
+        self.settle_timeout = settle_timeout
+        # (muddat, tartib raqami, future, task) - eng yaqin muddat boshida
+        self._sleepers: List[Tuple[float, int, asyncio.Future, Optional[asyncio.Task]]] = []
+        self._sequence = itertools.count()
+        # Uyg'otilgan, lekin hali qayta uxlamagan yoki tugamagan tasklar
+        self._running: Set[asyncio.Task] = set()
+        # _running bo'shaganda o'rnatiladi
+        self._idle = asyncio.Event()
+
+    def now(self) -> datetime:
+        return self._now
+
+    def timestamp(self) -> float:
+        return self._now.timestamp()
+
+    def monotonic(self) -> float:
+        return self._monotonic
+
+    @property
+    def sleepers(self) -> int:
+        """Virtual vaqtni kutayotgan korutinalar soni"""
+        return sum(1 for _, _, future, _ in self._sleepers if not future.done())
+
+    async def sleep(self, seconds: float) -> None:
+        task = asyncio.current_task()
+        self._release(task)
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self._monotonic + seconds, next(self._sequence), future, task))
+        await future
+
+    def start(self, coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        """
+        Korutinani task sifatida ishga tushirish; advance() uning birinchi
+        sleep() gacha ishlashini kutadi (masalan, check_due_tasks kabi looplar)
+        """
+        task = asyncio.create_task(coro)
+        self._track(task)
+        return task
+
+    async def advance(self, seconds: float) -> int:
+        """
+        Vaqtni oldinga surish va shu oraliqda uyg'onishi kerak bo'lganlarni ishga tushirish
+
+        Args:
+            seconds: Necha sekund oldinga surish
+
+        Returns:
+            int: Uyg'otilgan korutinalar soni
+        """
+        # Hali birinchi qadamini bajarmagan yangi tasklar sleep() ni joriy vaqtdan hisoblashi uchun
+        await self.settle()
+        target = self._monotonic + seconds
+        woken = 0
+        while self._sleepers and self._sleepers[0][0] <= target:
+            deadline = self._sleepers[0][0]
+            self._set(deadline)
+            # Bir xil muddatdagilar birga uyg'otiladi
+            while self._sleepers and self._sleepers[0][0] == deadline:
+                _, _, future, task = heapq.heappop(self._sleepers)
+                if future.done():
+                    continue
+                future.set_result(None)
+                if task is not None:
+                    self._track(task)
+                woken += 1
+            await self.settle()
+        self._set(target)
+        await self.settle()
+        return woken
+
+    async def settle(self) -> None:
+        """Uyg'otilgan korutinalar yana uxlaguncha yoki tugaguncha kutish"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.settle_timeout
+        while True:
+            # Uyg'otilganlar yaratgan yangi tasklar ham birinchi qadamini
+            # (odatda sleep) bajarib olishi uchun bir necha aylanish
+            for _ in range(3):
+                await asyncio.sleep(0)
+            if not self._running:
+                return
+            self._idle.clear()
+            try:
+                await asyncio.wait_for(self._idle.wait(), max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                logger.warning(f"Virtual soat: {len(self._running)} ta korutina uxlamadi, davom etilmoqda")
+                self._running.clear()
+                return
+
+    def _track(self, task: asyncio.Task) -> None:
+        """Taskni keyingi sleep() gacha yoki tugaguncha kutiladiganlar qatoriga qo'shish"""
+        self._running.add(task)
+        task.add_done_callback(self._release)
+
+    def _release(self, task: Optional[asyncio.Task]) -> None:
+        self._running.discard(task)
+        if not self._running:
+            self._idle.set()
+
+    def _set(self, monotonic: float) -> None:
+        self._now += timedelta(seconds=monotonic - self._monotonic)
+        self._monotonic = monotonic
+
+
+Clock = Union[SystemClock, VirtualClock]
+
+# Joriy soat: kod "hozir" va kutish uchun faqat shu modul funksiyalaridan
+# foydalanadi, testlar va benchmarklar uni set_clock bilan almashtiradi.
+# Istisno - haqiqiy ishni o'lchash va cheklash: Telegram API tezligi
+# (RateLimiter, broadcast), yozuv navbatining jamlash kutishi, SQL profiler va
+# arxivlash bo'laklarining vaqt byudjeti haqiqiy vaqtda qoladi.
+_clock: Clock = SystemClock()
+
+
+def get_clock() -> Clock:
+    """Joriy soatni olish"""
+    return _clock
+
+
+def set_clock(clock: Clock) -> Clock:
+    """
+    Joriy soatni almashtirish
+
+    Args:
+        clock: Yangi soat (SystemClock yoki VirtualClock)
+
+    Returns:
+        Clock: Oldingi soat (qaytarib qo'yish uchun)
+    """
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+
+def now() -> datetime:
+    """Hozirgi mahalliy vaqt (datetime.now() o'rniga)"""
+    return _clock.now()
+
+
+def timestamp() -> float:
+    """Hozirgi Unix vaqti (time.time() o'rniga)"""
+    return _clock.timestamp()
+
+
+def monotonic() -> float:
+    """Oraliqlarni o'lchash uchun vaqt (time.monotonic() o'rniga)"""
+    return _clock.monotonic()
+
+
+async def sleep(seconds: float) -> None:
+    """Joriy soat bo'yicha kutish (asyncio.sleep() o'rniga)"""
+    await _clock.sleep(seconds)
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramNotFound, TelegramRetryAfter
+
+# Loggerga sozlash
+logger = logging.getLogger(__name__)
+
+# Telegram umumiy chegarasi ~30 xabar/sekund; biroz zaxira qoldiramiz
+DEFAULT_RATE = 25.0
+
+
+# Ishlab turgan BulkSender lar (chiquvchi navbat hajmini kuzatish uchun)
+active_senders: "weakref.WeakSet[BulkSender]" = weakref.WeakSet()
+
+
+def outbound_queue_depth() -> int:
+    """Barcha BulkSender larda hali yuborilmagan xabarlar soni"""
+    return sum(sender.pending for sender in active_senders)
+
+
+class RateLimiter:
+    """
+    Token bucket: o'rtacha `rate` ta/sekund, bir zumda ko'pi bilan `burst` ta.
+
+    pause() barcha chaqiruvchilarni berilgan vaqtga to'xtatadi (RetryAfter uchun).
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Args:
+            rate: Sekundiga ruxsat etilgan amallar soni
+            burst: Bir zumda ruxsat etilgan amallar soni
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        # Telegram chegaralari haqiqiy vaqtda o'lchanadi, shuning uchun utils.clock emas
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Bitta token olish (kerak bo'lsa kutish)"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Barcha yuborishlarni `seconds` sekundga to'xtatish"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+
+class BulkSender:
+    """
+    Ko'p foydalanuvchiga xabarlarni umumiy tezlik chegarasi ostida yuborish.
+
+    send()/copy() xabarni chegaralangan navbatga qo'yadi (navbat to'lsa kutadi,
+    shuning uchun chaqiruvchi ro'yxatni oqim sifatida o'qiy oladi). Bir nechta ishchi
+    xabarlarni parallel yuboradi, RetryAfter bo'lsa hammasi to'xtab turadi.
+    Botni bloklagan foydalanuvchilar `blocked` ro'yxatiga yig'iladi.
+
+    Foydalanish:
+        async with BulkSender(bot) as sender:
+            await sender.send(chat_id, text)
+    """
+
+    def __init__(self, bot: Bot, rate: float = DEFAULT_RATE, concurrency: int = 8, max_retries: int = 3):
+        """
+        Args:
+            bot: Bot obyekti
+            rate: Sekundiga yuboriladigan xabarlar soni
+            concurrency: Parallel ishchilar soni
+            max_retries: RetryAfter dan keyin qayta urinishlar soni
+        """
+        self.bot = bot
+        self.limiter = RateLimiter(rate, burst=max(1, int(rate)))
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.sent = 0
+        self.failed = 0
+        self.blocked: List[int] = []
+        # Navbatga qo'yilgan, lekin hali yuborib bo'linmagan xabarlar
+        self.pending = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+        self._workers: List[asyncio.Task] = []
+
+    async def __aenter__(self) -> "BulkSender":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        """Ishchilarni ishga tushirish"""
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+            active_senders.add(self)
+
+    async def send(self, chat_id: int, text: str, **kwargs: Any) -> None:
+        """Matnli xabarni yuborish navbatiga qo'yish"""
+        await self._enqueue(chat_id, lambda: self.bot.send_message(chat_id, text, **kwargs))
+
+    async def copy(self, chat_id: int, from_chat_id: int, message_id: int, **kwargs: Any) -> None:
+        """Mavjud xabarni (matn, rasm, video...) nusxalab yuborish navbatiga qo'yish"""
+        await self._enqueue(chat_id, lambda: self.bot.copy_message(chat_id, from_chat_id, message_id, **kwargs))
+
+    async def _enqueue(self, chat_id: int, call: Callable[[], Awaitable[Any]]) -> None:
+        """Yuborish amalini navbatga qo'yish"""
+        if not self._workers:
+            self.start()
+        self.pending += 1
+        await self._queue.put((chat_id, call))
+
+    async def drain(self) -> None:
+        """Hozirgacha navbatga qo'yilgan barcha xabarlar yuborilishini kutish"""
+        await self._queue.join()
+
+    async def close(self) -> None:
+        """Navbatdagi barcha xabarlar yuborilishini kutish va ishchilarni to'xtatish"""
+        for _ in self._workers:
+            await self._queue.put(None)
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        active_senders.discard(self)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Yuborish natijalari"""
+        return {"sent": self.sent, "failed": self.failed, "blocked": len(self.blocked)}
+
+    async def _worker(self) -> None:
+        """Navbatdan xabarlarni olib yuborish"""
+        while True:
+            item = await self._queue.get()
+            try:
+                if item is None:
+                    return
+                await self._deliver(*item)
+            finally:
+                # _deliver xato yoki bekor qilinish bilan chiqsa ham navbatdan ketdi
+                if item is not None:
+                    self.pending -= 1
+                self._queue.task_done()
+
+    async def _deliver(self, chat_id: int, call: Callable[[], Awaitable[Any]]) -> None:
+        """Bitta xabarni yuborish (RetryAfter bo'lsa qayta urinish)"""
+        for _ in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            try:
+                await call()
+                self.sent += 1
+                return
+            except TelegramRetryAfter as e:
+                logger.warning(f"Telegram chegarasi: {e.retry_after} s kutilmoqda (chat {chat_id})")
+                self.limiter.pause(e.retry_after)
+            except (TelegramForbiddenError, TelegramNotFound):
+                # Foydalanuvchi botni bloklagan yoki hisobi o'chirilgan
+                self.blocked.append(chat_id)
+                return
+            except Exception as e:
+                logger.error(f"Chat {chat_id} ga xabar yuborishda xatolik: {e}")
+                self.failed += 1
+                return
+
+        logger.error(f"Chat {chat_id} ga xabar {self.max_retries} urinishdan keyin ham yuborilmadi")
+        self.failed += 1
@@ -0,0 +1,250 @@
+import functools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+
+from utils import clock
+
+# Loggerga sozlash
+logger = logging.getLogger(__name__)
+
+# Metrikalar yig'iladimi (start_metrics_server yoqadi)
+enabled = False
+
+# Kechikishlar uchun standart oraliqlar (sekund)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Rejalashtiruvchi kechikishi uchun oraliqlar (sekund): tekshiruv har 30 sekundda
+LAG_BUCKETS = (1.0, 5.0, 15.0, 30.0, 45.0, 60.0, 90.0, 120.0, 300.0, 600.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Label qiymatlarini Prometheus formatiga keltirish"""
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    """Faqat o'sadigan hisoblagich (label qiymatlari bo'yicha alohida)"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Gauge:
+    """So'rov paytida funksiyadan o'qiladigan joriy qiymat"""
+
+    def __init__(self, name: str, documentation: str, function: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+
+    def render(self) -> List[str]:
+        try:
+            value = self.function()
+        except Exception as e:
+            logger.error(f"{self.name} metrikasini o'qishda xatolik: {e}")
+            return []
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge", f"{self.name} {value}"]
+
+
+class Histogram:
+    """Qiymatlarning oraliqlar bo'yicha taqsimoti (label qiymatlari bo'yicha alohida)"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [har bir oraliqdagi soni..., +Inf soni, yig'indi]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[i] += 1
+                break
+        else:
+            state[len(self.buckets)] += 1
+        state[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        for labels, state in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), state):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + (bound,))} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {state[-1]}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+# Barcha metrikalar ro'yxatga olingan tartibda
+_registry: List[Any] = []
+
+
+def _register(metric: Any) -> Any:
+    _registry.append(metric)
+    return metric
+
+
+def register_gauge(name: str, documentation: str, function: Callable[[], float]) -> Gauge:
+    """Joriy qiymati funksiyadan o'qiladigan metrika qo'shish"""
+    return _register(Gauge(name, documentation, function))
+
+
+def render() -> str:
+    """Barcha metrikalarni Prometheus text formatida qaytarish"""
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+handler_seconds = _register(Histogram(
+    "dinotasks_handler_seconds", "Handler bajarilish vaqti", ("handler",)
+))
+handler_errors = _register(Counter(
+    "dinotasks_handler_errors_total", "Xatolik bilan tugagan handlerlar", ("handler",)
+))
+db_seconds = _register(Histogram(
+    "dinotasks_db_seconds", "database.db funksiyalarining bajarilish vaqti", ("function",)
+))
+db_errors = _register(Counter(
+    "dinotasks_db_errors_total", "Xatolik bilan tugagan database.db chaqiruvlari", ("function",)
+))
+telegram_requests = _register(Counter(
+    "dinotasks_telegram_requests_total", "Telegram Bot API so'rovlari", ("method",)
+))
+telegram_errors = _register(Counter(
+    "dinotasks_telegram_errors_total", "Xatolik bilan tugagan Bot API so'rovlari", ("method", "error")
+))
+telegram_seconds = _register(Histogram(
+    "dinotasks_telegram_seconds", "Bot API so'rovlarining davomiyligi", ("method",)
+))
+scheduler_lag = _register(Histogram(
+    "dinotasks_scheduler_lag_seconds", "Task vaqtidan eslatma yuborilguncha o'tgan vaqt", buckets=LAG_BUCKETS
+))
+
+
+def timed(function: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """async database funksiyasining vaqtini va xatolarini o'lchaydigan o'ram"""
+    name = function.__name__
+
+    @functools.wraps(function)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not enabled:
+            return await function(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return await function(*args, **kwargs)
+        except Exception:
+            db_errors.inc(name)
+            raise
+        finally:
+            db_seconds.observe(time.perf_counter() - started, name)
+
+    return wrapper
+
+
+def observe_scheduler_lag(task_datetime: Optional[str]) -> None:
+    """Eslatma yuborilganda task vaqtidan qancha kechikkanini yozish"""
+    if not enabled or not task_datetime:
+        return
+    try:
+        due = time.mktime(time.strptime(task_datetime[:16], "%Y-%m-%d %H:%M"))
+    except ValueError:
+        return
+    scheduler_lag.observe(max(0.0, clock.timestamp() - due))
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Har bir handlerning bajarilish vaqtini o'lchaydigan (ichki) aiogram middleware"""
+
+    async def __call__(self, handler: Callable, event: Any, data: Dict[str, Any]) -> Any:
+        handler_object = data.get("handler")
+        callback = getattr(handler_object, "callback", None)
+        if callback is None:
+            return await handler(event, data)
+
+        name = f"{callback.__module__.rsplit('.', 1)[-1]}.{callback.__name__}"
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            handler_errors.inc(name)
+            raise
+        finally:
+            handler_seconds.observe(time.perf_counter() - started, name)
+
+
+class TelegramMetricsMiddleware(BaseRequestMiddleware):
+    """Bot API so'rovlarini metod bo'yicha sanaydigan sessiya middleware"""
+
+    async def __call__(self, make_request: Callable, bot: Any, method: Any) -> Any:
+        name = type(method).__name__
+        telegram_requests.inc(name)
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            telegram_errors.inc(name, type(e).__name__)
+            raise
+        finally:
+            telegram_seconds.observe(time.perf_counter() - started, name)
+
+
+async def start_metrics_server(host: str, port: int) -> Any:
+    """
+    Metrikalarni yig'ishni yoqish va /metrics HTTP endpointini ishga tushirish.
+
+    Args:
+        host: Tinglanadigan manzil (standart holda faqat lokal)
+        port: Port
+
+    Returns:
+        web.AppRunner: To'xtatish uchun runner (runner.cleanup())
+    """
+    # aiohttp aiogram bilan birga o'rnatiladi; faqat endpoint yoqilganda kerak
+    from aiohttp import web
+
+    global enabled
+    enabled = True
+
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(text=render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Metrikalar http://{host}:{port}/metrics manzilida")
+    return runner
@@ -1,10 +1,11 @@
 import asyncio
 import logging
 from typing import Dict, Any, Callable, Coroutine, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from aiogram import Bot
 from database import db
+from utils import clock, metrics
 import aiosqlite
 
 # Faol eslatma looplarini saqlash uchun dictionary
@@ -14,6 +15,47 @@ active_notification_loops: Dict[str, asyncio.Task] = {}
 # Loggerni sozlash
 logger = logging.getLogger(__name__)
 
+async def run_scheduler_tick(bot: Bot, notification_callback: Callable[[Bot, int, int, str], Coroutine[Any, Any, None]]) -> int:
+    """
+    Rejalashtiruvchining bitta tekshiruvi: kechiktirilgan va takrorlanuvchi
+    tasklarni yangilash, vaqti kelganlariga eslatma yuborish.
+    
+    Args:
+        bot: Bot obyekti xabar yuborish uchun
+        notification_callback: Task vaqti kelganda chaqiriladigan funksiya
+        
+    Returns:
+        int: Eslatma yuborilgan tasklar soni
+    """
+    # Kechiktirilgan tasklarni faollashtirish, agar ular vaqti kelgan bo'lsa
+    await db.reactivate_snoozed_tasks()
+    
+    # Javobsiz qolgan takrorlanuvchi tasklarni keyingi takrorlanishga surish
+    await db.rollover_recurring_tasks()
+    
+    # Vaqti kelgan tasklarni olish
+    tasks = await db.get_due_tasks()
+    logger.info(f"Vaqti kelgan {len(tasks)} ta task tekshirilmoqda")
+    
+    notified = 0
+    for task in tasks:
+        # Taskni egasiga eslatma yuborish
+        user_id = task.user_id
+        task_id = task.id
+        task_name = task.task_name
+        
+        # Task hali aktiv ekanligini tekshirish
+        task_current = await db.get_task_by_id(task_id, ("id", "status"))
+        if not task_current or task_current.status != "active":
+            logger.warning(f"Task ID {task_id} aktiv emas, eslatma o'tkazib yuborildi")
+            continue
+        
+        # Callback funksiyasini chaqirish
+        await notification_callback(bot, user_id, task_id, task_name)
+        metrics.observe_scheduler_lag(task.task_datetime)
+        notified += 1
+    return notified
+
 async def check_due_tasks(bot: Bot, notification_callback: Callable[[Bot, int, int, str], Coroutine[Any, Any, None]]) -> None:
     """
     Har daqiqada vaqti kelgan tasklarni tekshiradi va eslatma yuboradi.
@@ -22,45 +64,32 @@ async def check_due_tasks(bot: Bot, notification_callback: Callable[[Bot, int, i
         bot: Bot obyekti xabar yuborish uchun
         notification_callback: Task vaqti kelganda chaqiriladigan funksiya
     """
-    # Tasklar tozalagichni hisoblash uchun counter
-    clean_counter = 0
-    
     while True:
         try:
-            # Kechiktirilgan tasklarni faollashtirish, agar ular vaqti kelgan bo'lsa
-            await db.reactivate_snoozed_tasks()
-            
-            # Vaqti kelgan tasklarni olish
-            tasks = await db.get_due_tasks()
-            logger.info(f"Vaqti kelgan {len(tasks)} ta task tekshirilmoqda")
-            
-            for task in tasks:
-                # Taskni egasiga eslatma yuborish
-                user_id = task["user_id"]
-                task_id = task["id"]
-                task_name = task["task_name"]
-                
-                # Task hali aktiv ekanligini tekshirish
-                task_current = await db.get_task_by_id(task_id)
-                if not task_current or task_current["status"] != "active":
-                    logger.warning(f"Task ID {task_id} aktiv emas, eslatma o'tkazib yuborildi")
-                    continue
-                
-                # Callback funksiyasini chaqirish
-                await notification_callback(bot, user_id, task_id, task_name)
-
-            # Har 3 soatda (360 takrorlashdan so'ng, 30 sekund oralig'ida) bajarilgan tasklarni tozalash
-            clean_counter += 1
-            if clean_counter >= 360:  # 30 sekund * 360 = 10800 sekund = 3 soat
-                logger.info("Bajarilgan tasklarni tozalash boshlanmoqda...")
-                deleted_count = await db.clean_old_completed_tasks(days=3)
-                clean_counter = 0
-                
+            await run_scheduler_tick(bot, notification_callback)
         except Exception as e:
             logger.error(f"Tasklarni tekshirishda xatolik: {e}")
         
         # Har 30 sekundda takrorlash
-        await asyncio.sleep(30)
+        await clock.sleep(30)
+
+async def archive_completed_loop(interval_hours: int = 3) -> None:
+    """
+    Eski bajarilgan tasklarni fon rejimida arxivga ko'chiradi.
+    
+    Eslatmalar loopidan alohida ishlaydi: ko'chirish kichik bo'laklarda
+    bajariladi, shuning uchun eslatmalar kechikmaydi.
+    
+    Args:
+        interval_hours: Arxivlashlar orasidagi vaqt (soat)
+    """
+    while True:
+        await clock.sleep(interval_hours * 3600)
+        try:
+            logger.info("Bajarilgan tasklarni arxivlash boshlanmoqda...")
+            await db.clean_old_completed_tasks(days=3)
+        except Exception as e:
+            logger.error(f"Tasklarni arxivlashda xatolik: {e}")
 
 # Task eslatma loopini boshqarish
 def start_task_reminder_loop(user_id: int, task_id: int, task_name: str, 
@@ -115,7 +144,7 @@ async def _task_reminder_loop(user_id: int, task_id: int, task_name: str,
     try:
         while reminder_count < max_reminders:
             # 30 sekund kutish
-            await asyncio.sleep(30)
+            await clock.sleep(30)
             
             # Agar loop bekor qilingan bo'lsa, chiqib ketish
             if loop_key not in active_notification_loops:
@@ -123,7 +152,7 @@ async def _task_reminder_loop(user_id: int, task_id: int, task_name: str,
                 break
             
             # Task statusini tekshirish - agar status 'snoozed' bo'lsa, eslatmani yubormaslik
-            task_current = await db.get_task_by_id(task_id)
+            task_current = await db.get_task_by_id(task_id, ("id", "status"))
             
             # Agar task o'chirilgan bo'lsa
             if not task_current:
@@ -132,8 +161,8 @@ async def _task_reminder_loop(user_id: int, task_id: int, task_name: str,
                 break
                 
             # Agar task statusini o'zgargan bo'lsa
-            if task_current["status"] != "active":
-                logger.info(f"Task {task_id} statusi '{task_current['status']}', eslatma loopi to'xtatilmoqda")
+            if task_current.status != "active":
+                logger.info(f"Task {task_id} statusi '{task_current.status}', eslatma loopi to'xtatilmoqda")
                 stop_reminder_loop(user_id, task_id)
                 break
                 
@@ -147,8 +176,9 @@ async def _task_reminder_loop(user_id: int, task_id: int, task_name: str,
     except Exception as e:
         logger.error(f"Reminder loop xatolik: {e}")
     finally:
-        # Loop tugaganda, agar hali aktiv bo'lsa, o'chirish
-        if loop_key in active_notification_loops:
+        # Loop tugaganda, agar hali aktiv bo'lsa, o'chirish (shu kalit bilan
+        # ochilgan yangi loop bo'lsa tegmaslik - qayta eslatmada eski loop bekor qilinadi)
+        if active_notification_loops.get(loop_key) is asyncio.current_task():
             logger.info(f"Loop tugatilmoqda: {loop_key}")
             del active_notification_loops[loop_key]
 
@@ -176,4 +206,62 @@ def stop_reminder_loop(user_id: int, task_id: int) -> bool:
             logger.error(f"Loop to'xtatishda xatolik: {e}")
     else:
         logger.info(f"Loop topilmadi: {loop_key}")
-    return False 
\ No newline at end of file
+    return False 
+
+async def daily_maintenance_loop(interval_hours: int = 24) -> None:
+    """
+    Kunlik xizmat: statistika hisoblagichlarini haqiqiy jadvallar bilan
+    tekshiradi va eski soatlik yig'indilarni o'chiradi.
+    
+    Args:
+        interval_hours: Tekshirishlar orasidagi vaqt (soat)
+    """
+    while True:
+        await clock.sleep(interval_hours * 3600)
+        try:
+            drift = await db.reconcile_stats_counters()
+            if not drift:
+                logger.info("Statistika hisoblagichlari to'g'ri")
+            
+            pruned = await db.prune_hourly_rollups(days=30)
+            if pruned:
+                logger.info(f"{pruned} ta eski soatlik yig'indi o'chirildi")
+        except Exception as e:
+            logger.error(f"Kunlik xizmatda xatolik: {e}")
+
+async def daily_digest_loop(bot: Bot, digest_callback: Callable[[Bot], Coroutine[Any, Any, Any]],
+                            hour: int = 8) -> None:
+    """
+    Har kuni belgilangan soatda ertalabki jamlanmani yuboradi.
+    
+    Oxirgi yuborilgan sana config jadvalida saqlanadi: bot shu soatdan keyin
+    qayta ishga tushsa, bugungi jamlanma bir marta yuboriladi, ikki marta emas.
+    
+    Args:
+        bot: Bot obyekti
+        digest_callback: Jamlanmani yuboradigan funksiya
+        hour: Yuborish soati (mahalliy vaqt)
+    """
+    while True:
+        now = clock.now()
+        run_at = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+        today = now.strftime("%Y-%m-%d")
+        
+        try:
+            last_date = await db.get_config("DIGEST_LAST_DATE")
+        except Exception as e:
+            logger.error(f"Jamlanma sanasini o'qishda xatolik: {e}")
+            last_date = None
+        
+        if now >= run_at and last_date != today:
+            try:
+                # Sana yuborishdan oldin yoziladi: uzilish bo'lsa takroriy xabar ketmaydi
+                await db.set_config("DIGEST_LAST_DATE", today)
+                await digest_callback(bot)
+            except Exception as e:
+                logger.error(f"Ertalabki jamlanmani yuborishda xatolik: {e}")
+            continue
+        
+        if now >= run_at:
+            run_at += timedelta(days=1)
+        await clock.sleep((run_at - now).total_seconds())
@@ -0,0 +1,435 @@
+import codecs
+import csv
+import io
+import logging
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.types.input_file import InputFile, DEFAULT_CHUNK_SIZE
+
+from database import db
+from database.models import Task
+from utils import clock
+
+# Loggerga sozlash
+logger = logging.getLogger(__name__)
+
+# Qo'llab-quvvatlanadigan formatlar
+EXPORT_FORMATS = ("csv", "ics")
+
+# CSV sarlavhasi
+CSV_HEADER = ("task_name", "date", "time", "status")
+
+# Bitta tranzaksiyada import qilinadigan qatorlar soni
+IMPORT_BATCH_SIZE = 1000
+
+# Bitta fayldan import qilinadigan maksimal qatorlar soni
+MAX_IMPORT_ROWS = 100000
+
+# Foydalanuvchiga ko'rsatiladigan xatoliklar soni
+MAX_REPORTED_ERRORS = 10
+
+# Import qilingan qator: (task nomi, vaqt HH:MM, "YYYY-MM-DD HH:MM", status)
+ImportRow = Tuple[str, str, str, str]
+
+
+class PastTaskError(ValueError):
+    """Aktiv taskning vaqti o'tib ketgan (qator xato emas, o'tkazib yuboriladi)"""
+
+
+# --- Eksport ---
+
+def csv_rows_text(rows: Iterable[Iterable[Any]]) -> str:
+    """Qatorlarni CSV matniga aylantirish"""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\r\n").writerows(rows)
+    return buffer.getvalue()
+
+
+def ics_escape(text: str) -> str:
+    """iCalendar TEXT qiymatini ekranlash (RFC 5545, 3.3.11)"""
+    return (text.replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def ics_fold(line: str) -> str:
+    """Qatorni 75 oktetdan oshmaydigan bo'laklarga bo'lish (RFC 5545, 3.1)"""
+    if len(line.encode("utf-8")) <= 75:
+        return line + "\r\n"
+
+    parts = []
+    current = ""
+    size = 0
+    for char in line:
+        char_size = len(char.encode("utf-8"))
+        # Davom qatorlari bitta bo'sh joy bilan boshlanadi
+        if size + char_size > (75 if not parts else 74):
+            parts.append(current)
+            current = ""
+            size = 0
+        current += char
+        size += char_size
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def ics_event(task: Task, stamp: str) -> str:
+    """Taskni VEVENT blokiga aylantirish (vaqt mahalliy "floating" ko'rinishda)"""
+    start = task.task_datetime.replace("-", "").replace(":", "").replace(" ", "T") + "00"
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:task-{task.id}@dinotasks",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART:{start}",
+        f"SUMMARY:{ics_escape(task.task_name)}",
+        f"X-DINOTASKS-STATUS:{task.status}",
+        "BEGIN:VALARM",
+        "ACTION:DISPLAY",
+        f"DESCRIPTION:{ics_escape(task.task_name)}",
+        "TRIGGER:PT0M",
+        "END:VALARM",
+        "END:VEVENT",
+    ]
+    return "".join(ics_fold(line) for line in lines)
+
+
+async def export_text_chunks(user_id: int, fmt: str) -> AsyncIterator[str]:
+    """Foydalanuvchi tasklarini tanlangan formatdagi matn bo'laklari sifatida berish"""
+    if fmt == "csv":
+        yield csv_rows_text([CSV_HEADER])
+        async for task in db.iter_user_tasks(user_id):
+            yield csv_rows_text([(task.task_name, task.task_datetime[:10], task.task_time, task.status)])
+    elif fmt == "ics":
+        stamp = clock.now().astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//DinoTasks//Tasks//UZ\r\nCALSCALE:GREGORIAN\r\n"
+        async for task in db.iter_user_tasks(user_id):
+            yield ics_event(task, stamp)
+        yield "END:VCALENDAR\r\n"
+    else:
+        raise ValueError(f"Noma'lum format: {fmt}")
+
+
+class TaskExportFile(InputFile):
+    """
+    Tasklar eksporti uchun yuklanadigan fayl.
+
+    Fayl xotirada to'liq yaratilmaydi: read() ma'lumotlar bazasi kursoridan
+    o'qilgan qatorlarni chunk_size hajmdagi bo'laklar qilib to'g'ridan-to'g'ri
+    Telegramga yuklaydi.
+    """
+
+    def __init__(self, user_id: int, fmt: str, filename: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            user_id: Foydalanuvchi ID
+            fmt: Format ("csv" yoki "ics")
+            filename: Fayl nomi (berilmasa tasks.<fmt>)
+            chunk_size: Yuklanadigan bo'lak hajmi (bayt)
+        """
+        super().__init__(filename=filename or f"tasks.{fmt}", chunk_size=chunk_size)
+        self.user_id = user_id
+        self.fmt = fmt
+
+    async def read(self, bot: Bot) -> AsyncIterator[bytes]:
+        # Excel UTF-8 ni to'g'ri o'qishi uchun CSV BOM bilan boshlanadi
+        buffer = bytearray(codecs.BOM_UTF8 if self.fmt == "csv" else b"")
+        async for text in export_text_chunks(self.user_id, self.fmt):
+            buffer += text.encode("utf-8")
+            if len(buffer) >= self.chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+
+
+# --- Import ---
+
+async def iter_telegram_file(bot: Bot, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Telegram serveridagi faylni diskka yoki xotiraga saqlamasdan bo'laklab o'qish"""
+    if bot.session.api.is_local:
+        with open(bot.session.api.wrap_local_file.to_local(file_path), "rb") as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+        return
+
+    url = bot.session.api.file_url(bot.token, file_path)
+    async for chunk in bot.session.stream_content(url=url, chunk_size=chunk_size, raise_for_status=True):
+        yield chunk
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Bayt bo'laklarini UTF-8 qatorlarga aylantirish (BOM va CRLF hisobga olinadi)"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+def parse_task_fields(task_name: str, date_text: str, time_text: str, status: str, now: datetime) -> ImportRow:
+    """
+    Bitta taskning maydonlarini tekshirish va normallashtirish
+
+    Args:
+        task_name: Task nomi
+        date_text: Sana (YYYY-MM-DD, KK.OO.YY yoki KK.OO.YYYY)
+        time_text: Vaqt (HH:MM yoki HH:MM:SS)
+        status: Status (completed bo'lsa shunday saqlanadi, qolganlari active)
+        now: Hozirgi vaqt (o'tgan aktiv tasklarni rad etish uchun)
+
+    Returns:
+        ImportRow: (task nomi, vaqt HH:MM, "YYYY-MM-DD HH:MM", status)
+    """
+    task_name = task_name.strip()
+    if not task_name:
+        raise ValueError("task nomi bo'sh")
+
+    # strptime/strftime o'rniga butun sonlar: katta fayllarda tahlilning asosiy narxi shu
+    try:
+        date_text = date_text.strip()
+        if "." in date_text:
+            day, month, year = date_text.split(".")
+        else:
+            year, month, day = date_text.split("-")
+        year = int(year)
+        hour, minute = time_text.strip().split(":")[:2]
+        task_datetime = datetime(2000 + year if year < 100 else year, int(month), int(day), int(hour), int(minute))
+    except ValueError:
+        raise ValueError("noto'g'ri sana yoki vaqt")
+
+    status = "completed" if status.strip().lower() == "completed" else "active"
+    if status == "active" and task_datetime < now:
+        raise PastTaskError("vaqt o'tib ketgan")
+
+    task_time = f"{task_datetime.hour:02d}:{task_datetime.minute:02d}"
+    return (task_name, task_time,
+            f"{task_datetime.year:04d}-{task_datetime.month:02d}-{task_datetime.day:02d} {task_time}", status)
+
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, List[str]]]:
+    """
+    CSV yozuvlarini qatorma-qator o'qish
+
+    Qo'shtirnoq ichidagi qator ko'chishlari uchun yozuv qo'shtirnoqlar soni
+    juft bo'lguncha yig'iladi.
+
+    Yields:
+        (yozuv boshlangan qator raqami, maydonlar)
+    """
+    record = []
+    start_line = 0
+    quotes = 0
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not record:
+            start_line = line_no
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+
+        text = "\n".join(record)
+        record = []
+        quotes = 0
+        if text.strip():
+            yield start_line, next(csv.reader([text]))
+
+    if record:
+        yield start_line, next(csv.reader(["\n".join(record)]))
+
+
+async def parse_csv(lines: AsyncIterator[str], now: datetime) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    CSV fayldan tasklarni o'qish (sarlavha ixtiyoriy, ustunlar: task_name, date, time, status)
+
+    Yields:
+        (qator raqami, ImportRow yoki xatolik)
+    """
+    columns = {name: index for index, name in enumerate(CSV_HEADER)}
+    first = True
+    async for line_no, fields in iter_csv_records(lines):
+        if first:
+            first = False
+            header = [field.strip().lower() for field in fields]
+            if "task_name" in header:
+                columns = {name: header.index(name) for name in CSV_HEADER if name in header}
+                continue
+
+        try:
+            yield line_no, parse_task_fields(
+                fields[columns["task_name"]],
+                fields[columns["date"]],
+                fields[columns["time"]],
+                fields[columns["status"]] if "status" in columns and columns["status"] < len(fields) else "",
+                now
+            )
+        except (IndexError, KeyError):
+            yield line_no, ValueError("ustunlar yetarli emas")
+        except ValueError as e:
+            yield line_no, e
+
+
+def ics_unescape(text: str) -> str:
+    """iCalendar TEXT qiymatini ekrandan chiqarish"""
+    result = []
+    chars = iter(text)
+    for char in chars:
+        if char == "\\":
+            char = next(chars, "")
+            result.append("\n" if char in ("n", "N") else char)
+        else:
+            result.append(char)
+    return "".join(result)
+
+
+def parse_ics_datetime(value: str, params: str) -> Tuple[str, str]:
+    """DTSTART/DUE qiymatini (sana, vaqt) ga aylantirish (UTC vaqt mahalliyga o'tkaziladi)"""
+    value = value.strip()
+    if not value[:8].isdigit():
+        raise ValueError("noto'g'ri DTSTART")
+    date_text = f"{value[0:4]}-{value[4:6]}-{value[6:8]}"
+
+    if "VALUE=DATE" in params.upper() and "VALUE=DATE-TIME" not in params.upper():
+        # Faqat sana berilgan bo'lsa eslatma ertalab 09:00 da
+        return date_text, "09:00"
+    if value[8:9] != "T" or not value[9:13].isdigit():
+        raise ValueError("noto'g'ri DTSTART")
+    time_text = f"{value[9:11]}:{value[11:13]}"
+
+    if value.endswith("Z"):
+        try:
+            parsed = datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]),
+                              int(value[9:11]), int(value[11:13]), tzinfo=timezone.utc)
+        except ValueError:
+            raise ValueError("noto'g'ri DTSTART")
+        parsed = parsed.astimezone()
+        return f"{parsed.year:04d}-{parsed.month:02d}-{parsed.day:02d}", f"{parsed.hour:02d}:{parsed.minute:02d}"
+
+    # TZID ko'rsatilgan yoki "floating" vaqt mahalliy vaqt sifatida olinadi
+    return date_text, time_text
+
+
+async def iter_unfolded(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, str]]:
+    """Bo'lingan (folded) iCalendar qatorlarini birlashtirish"""
+    current = None
+    start_line = 0
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield start_line, current
+        current = line
+        start_line = line_no
+    if current is not None:
+        yield start_line, current
+
+
+async def parse_ics(lines: AsyncIterator[str], now: datetime) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    iCalendar fayldan tasklarni o'qish (VEVENT va VTODO)
+
+    Yields:
+        (komponent boshlangan qator raqami, ImportRow yoki xatolik)
+    """
+    component = None
+    fields: Dict[str, Tuple[str, str]] = {}
+    start_line = 0
+    async for line_no, line in iter_unfolded(lines):
+        name, _, value = line.partition(":")
+        name, _, params = name.partition(";")
+        name = name.upper()
+
+        if name == "BEGIN" and value.upper() in ("VEVENT", "VTODO") and component is None:
+            component = value.upper()
+            fields = {}
+            start_line = line_no
+        elif name == "END" and value.upper() == component:
+            component = None
+            try:
+                start = fields.get("DTSTART") or fields.get("DUE")
+                if start is None:
+                    raise ValueError("DTSTART topilmadi")
+                date_text, time_text = parse_ics_datetime(start[0], start[1])
+
+                status = fields.get("X-DINOTASKS-STATUS", ("", ""))[0]
+                if fields.get("STATUS", ("", ""))[0].upper() == "COMPLETED":
+                    status = "completed"
+
+                yield start_line, parse_task_fields(
+                    ics_unescape(fields.get("SUMMARY", ("", ""))[0]), date_text, time_text, status, now
+                )
+            except ValueError as e:
+                yield start_line, e
+        elif component is not None and name not in fields:
+            # Ichki komponentlar (VALARM) maydonlari asosiy maydonlarni almashtirmaydi
+            fields[name] = (value, params)
+
+
+async def import_task_stream(user_id: int, chunks: AsyncIterator[bytes], fmt: str,
+                             now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Fayl bo'laklaridan tasklarni oqim sifatida import qilish
+
+    Qatorlar IMPORT_BATCH_SIZE tadan yig'ilib, har bir paket alohida
+    tranzaksiyada yoziladi. Xotirada faqat bitta paket saqlanadi.
+
+    Args:
+        user_id: Foydalanuvchi ID
+        chunks: Fayl bayt bo'laklari
+        fmt: Format ("csv" yoki "ics")
+        now: Hozirgi vaqt (berilmasa clock.now())
+
+    Returns:
+        Dict[str, Any]: imported, duplicates, skipped, failed, errors, truncated
+    """
+    if now is None:
+        now = clock.now()
+    parser = parse_csv if fmt == "csv" else parse_ics
+
+    result = {"imported": 0, "duplicates": 0, "skipped": 0, "failed": 0, "errors": [], "truncated": False}
+    batch: List[ImportRow] = []
+    rows = 0
+
+    async def flush() -> None:
+        inserted = await db.import_tasks(user_id, batch)
+        result["imported"] += inserted
+        result["duplicates"] += len(batch) - inserted
+        batch.clear()
+
+    async for line_no, item in parser(iter_lines(chunks), now):
+        rows += 1
+        if rows > MAX_IMPORT_ROWS:
+            result["truncated"] = True
+            break
+
+        if isinstance(item, PastTaskError):
+            result["skipped"] += 1
+        elif isinstance(item, Exception):
+            result["failed"] += 1
+            if len(result["errors"]) < MAX_REPORTED_ERRORS:
+                result["errors"].append(f"{line_no}-qator: {item}")
+        else:
+            batch.append(item)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await flush()
+
+    if batch:
+        await flush()
+
+    logger.info(
+        f"User {user_id} import ({fmt}): {result['imported']} qo'shildi, {result['duplicates']} dublikat, "
+        f"{result['skipped']} o'tgan, {result['failed']} xato"
+    )
+    return result